@@ -0,0 +1,193 @@
+'''
+This module provides seeded generators of synthetic preference profiles.
+Every generator takes a random.Random and returns a vote as dict of the form
+accepted by vote.parser.parseVoteFromDict, agents are numbered from 1 and
+choices are named c0, c1, ...
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.parser import parseVoteFromDict, toAssignmentMatrixVote
+import hashlib
+import random
+
+
+def _getChoices(choiceCount):
+    return ["c" + str(index) for index in range(choiceCount)]
+
+
+def _tieOrder(rng, order, tieProbability):
+    '''
+    Splits the given order into classes, every two neighbours are tied with
+    the given probability
+    '''
+    classes = [[order[0]]]
+    for choice in order[1:]:
+        if rng.random() < tieProbability:
+            classes[-1].append(choice)
+        else:
+            classes.append([choice])
+    return [tuple(choiceClass) for choiceClass in classes]
+
+
+def generateImpartialCulture(rng, agentCount, choiceCount, tieProbability=0.3):
+    '''
+    Every agent draws an order uniformly at random, neighbours in the order
+    are tied with the given probability
+
+    :type rng: random.Random
+    :type agentCount: int
+    :type choiceCount: int
+    :type tieProbability: float
+    :rtype: dict(int, list(tuple(str)))
+    '''
+    choices = _getChoices(choiceCount)
+    profile = dict()
+    for agent in range(1, agentCount + 1):
+        order = list(choices)
+        rng.shuffle(order)
+        profile[agent] = _tieOrder(rng, order, tieProbability)
+    return profile
+
+
+def generateMallows(rng, agentCount, choiceCount, dispersion=0.5,
+                    tieProbability=0.3):
+    '''
+    Every agent draws an order from the Mallows model around a common
+    reference order, using the repeated insertion model. A dispersion of 0
+    yields the reference order only, 1 yields impartial culture.
+
+    :type rng: random.Random
+    :type agentCount: int
+    :type choiceCount: int
+    :type dispersion: float
+    :type tieProbability: float
+    :rtype: dict(int, list(tuple(str)))
+    '''
+    if not 0 <= dispersion <= 1:
+        raise ValueError("Dispersion must be between 0 and 1")
+    reference = _getChoices(choiceCount)
+    rng.shuffle(reference)
+    profile = dict()
+    for agent in range(1, agentCount + 1):
+        order = []
+        for index, choice in enumerate(reference):
+            # Inserting at position j from the end costs j inversions
+            weights = [dispersion ** inversions
+                       for inversions in range(index + 1)]
+            value = rng.random() * sum(weights)
+            inversions = 0
+            while value >= weights[inversions] and inversions < index:
+                value -= weights[inversions]
+                inversions += 1
+            order.insert(len(order) - inversions, choice)
+        profile[agent] = _tieOrder(rng, order, tieProbability)
+    return profile
+
+
+def generateDichotomous(rng, agentCount, choiceCount, approvalProbability=0.3):
+    '''
+    Every agent approves every choice with the given probability, but at
+    least one, and is indifferent within approved and disapproved choices
+
+    :type rng: random.Random
+    :type agentCount: int
+    :type choiceCount: int
+    :type approvalProbability: float
+    :rtype: dict(int, list(tuple(str)))
+    '''
+    choices = _getChoices(choiceCount)
+    profile = dict()
+    for agent in range(1, agentCount + 1):
+        approved = [choice for choice in choices
+                    if rng.random() < approvalProbability]
+        if not approved:
+            approved = [rng.choice(choices)]
+        disapproved = [choice for choice in choices if choice not in approved]
+        profile[agent] = [tuple(approved)]
+        if disapproved:
+            profile[agent].append(tuple(disapproved))
+    return profile
+
+
+def generateSinglePeaked(rng, agentCount, choiceCount, tieProbability=0.3):
+    '''
+    Every agent draws an order single-peaked on a common random axis
+    uniformly at random (Walsh): the order is built from its worst choice
+    upwards, each time removing one of the two ends of the remaining axis.
+
+    :type rng: random.Random
+    :type agentCount: int
+    :type choiceCount: int
+    :type tieProbability: float
+    :rtype: dict(int, list(tuple(str)))
+    '''
+    axis = _getChoices(choiceCount)
+    rng.shuffle(axis)
+    profile = dict()
+    for agent in range(1, agentCount + 1):
+        (left, right) = (0, len(axis) - 1)
+        order = []
+        while left < right:
+            if rng.random() < 0.5:
+                order.append(axis[left])
+                left += 1
+            else:
+                order.append(axis[right])
+                right -= 1
+        order.append(axis[left])
+        order.reverse()
+        profile[agent] = _tieOrder(rng, order, tieProbability)
+    return profile
+
+
+def generateAssignment(rng, agentCount, choiceCount, tieProbability=0.3):
+    '''
+    Impartial culture over the objects of an assignment problem, see
+    createVote. Needs at least as many objects as agents.
+
+    :type rng: random.Random
+    :type agentCount: int
+    :type choiceCount: int
+    :type tieProbability: float
+    :rtype: dict(int, list(tuple(str)))
+    '''
+    if choiceCount < agentCount:
+        raise ValueError("Fewer objects than agents")
+    return generateImpartialCulture(rng, agentCount, choiceCount,
+                                    tieProbability)
+
+
+GENERATORS = {
+    "impartial": generateImpartialCulture,
+    "mallows": generateMallows,
+    "dichotomous": generateDichotomous,
+    "single-peaked": generateSinglePeaked,
+    "assignment": generateAssignment,
+}
+
+# Profiles solved as assignment votes over the cells of the matrix
+ASSIGNMENT_PROFILES = frozenset(["assignment"])
+
+
+def createVote(profile, agentCount, choiceCount, seed):
+    '''
+    Returns the vote of the given profile, agent and choice counts and seed.
+    Equal arguments always yield equal votes.
+
+    :type profile: str
+    :type agentCount: int
+    :type choiceCount: int
+    :type seed: int
+    :rtype: vote.society.Vote
+    '''
+    if profile not in GENERATORS:
+        raise ValueError("Unknown profile " + repr(profile))
+    # Independent of hash randomisation and word size
+    rng = random.Random(int(hashlib.sha1(repr(
+        (profile, agentCount, choiceCount, seed))).hexdigest(), 16))
+    vote = parseVoteFromDict(GENERATORS[profile](rng, agentCount, choiceCount))
+    if profile in ASSIGNMENT_PROFILES:
+        vote = toAssignmentMatrixVote(vote)
+    return vote
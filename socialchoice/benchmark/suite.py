@@ -0,0 +1,302 @@
+'''
+This module times all rules on a grid of synthetic profiles, see
+benchmark.profiles, and compares the results to a stored baseline.
+
+Usage: python -m benchmark.suite [options]
+
+The results are written as one JSON object holding the options and a list
+of results, one per profile, agent count, choice count, seed and rule. With
+--baseline, the totals of every profile, agent count, choice count and rule
+are compared to the given results file, slowdowns are reported and the
+process exits with status 1.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from benchmark.profiles import GENERATORS, ASSIGNMENT_PROFILES, createVote
+from vote.solver.batch import RULES
+from vote.solver.settings import SolverSettings, LpBackend, PulpBackend, \
+    ScipyBackend
+from vote.solver.simplex import SimplexBackend
+from vote.solver.profiling import Profiler
+from vote.solver.program import LinearProgram, SENSE_LE
+from vote.solver.util import UnsupportedVoteError
+from pulp.constants import LpStatusOptimal
+from pulp.solvers import PULP_CBC_CMD
+import argparse
+import collections
+import gc
+import json
+import sys
+import time
+
+SOLVERS = {
+    "cbc": lambda: PulpBackend(PULP_CBC_CMD(msg=False)),
+    "scipy": ScipyBackend,
+    "simplex": SimplexBackend,
+}
+
+
+class CountingBackend(LpBackend):
+    '''
+    Backend counting the programs solved by another backend
+    '''
+
+    def __init__(self, backend):
+        '''
+        :type backend: vote.solver.settings.LpBackend
+        '''
+        self.backend = backend
+        self.solves = 0
+
+    def getSolves(self):
+        return self.solves
+
+    def reset(self):
+        self.solves = 0
+
+    def solve(self, program):
+        self.solves += 1
+        return self.backend.solve(program)
+
+    def resolve(self, program):
+        self.solves += 1
+        return self.backend.resolve(program)
+
+    def isExternal(self):
+        return self.backend.isExternal()
+
+    def providesDuals(self):
+        return self.backend.providesDuals()
+
+
+def runBenchmark(profiles, agentCounts, choiceCounts, rules=("ESR", "PSR",
+                                                           "SPSR", "SSR"),
+                 seeds=3, solver="simplex", repeats=3, profiler=None):
+    '''
+    Solves the votes of all combinations of the given profiles, counts and
+    seeds with all given rules and yields one result per vote and rule. A
+    result is a dict holding the profile, the agent and choice count, the
+    seed, the rule, the wall time in seconds and the number of solved linear
+    programs. Every vote is solved repeats times and the shortest wall time
+    is kept, which is least disturbed by other load. If a profiler is given,
+    all solves report to it. Rules which can not express a vote, e.g. SPSR
+    on assignment profiles, yield a result holding the reason under
+    "unsupported" instead, all other failures are raised. Assignment
+    profiles with fewer objects than agents are skipped.
+
+    :type profiles: collections.Iterable(str)
+    :type agentCounts: collections.Iterable(int)
+    :type choiceCounts: collections.Iterable(int)
+    :type rules: collections.Iterable(str)
+    :type seeds: int
+    :type solver: str
+    :type repeats: int
+    :type profiler: vote.solver.profiling.Profiler
+    :rtype: collections.Iterable(dict)
+    :raise ValueError: If the solver fails on a trivial program
+    '''
+    profiles = list(profiles)
+    rules = list(rules)
+    for profile in profiles:
+        if profile not in GENERATORS:
+            raise ValueError("Unknown profile " + repr(profile))
+    for rule in rules:
+        if rule not in RULES:
+            raise ValueError("Unknown rule " + repr(rule))
+    if solver not in SOLVERS:
+        raise ValueError("Unknown solver " + repr(solver))
+    if repeats < 1:
+        raise ValueError("Number of repeats must be positive")
+    backend = SOLVERS[solver]()
+    _checkBackend(backend)
+    return _runGrid(profiles, list(agentCounts), list(choiceCounts), rules,
+                    seeds, CountingBackend(backend), repeats, profiler)
+
+
+def _checkBackend(backend):
+    '''
+    Solves a trivial program with the given backend, so that a broken solver
+    fails before the grid instead of on every vote
+    '''
+    program = LinearProgram()
+    column = program.addVariable(0.0, None)
+    program.addRow({column: 1}, SENSE_LE, 1.0)
+    program.setObjective({column: 1})
+    status = backend.solve(program)
+    if status != LpStatusOptimal or abs(program.getValue(column) - 1) > 1e-6:
+        raise ValueError("Solver " + repr(backend) + " fails on a trivial " +
+                         "program")
+
+
+def _timeRule(rule, vote, settings, backend, repeats):
+    '''
+    Returns the shortest wall time of solving the vote with the rule and the
+    number of programs solved by the last run. Like timeit, garbage
+    collection is disabled while timing, otherwise earlier votes of the grid
+    slow down later ones.
+    '''
+    seconds = []
+    for _ in range(repeats):
+        backend.reset()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.time()
+            RULES[rule](vote, settings)
+            seconds.append(time.time() - start)
+        finally:
+            gc.enable()
+    return (min(seconds), backend.getSolves())
+
+
+def _runGrid(profiles, agentCounts, choiceCounts, rules, seeds, backend,
+             repeats, profiler):
+    settings = SolverSettings(backend, profiler=profiler)
+    for profile in profiles:
+        for agentCount in agentCounts:
+            for choiceCount in choiceCounts:
+                if profile in ASSIGNMENT_PROFILES and choiceCount < agentCount:
+                    continue
+                for seed in range(seeds):
+                    vote = createVote(profile, agentCount, choiceCount, seed)
+                    for rule in rules:
+                        result = {"profile": profile, "agents": agentCount,
+                                  "choices": choiceCount, "seed": seed,
+                                  "rule": rule}
+                        try:
+                            (result["seconds"], result["solves"]) = \
+                                _timeRule(rule, vote, settings, backend,
+                                          repeats)
+                        except UnsupportedVoteError as e:
+                            result["unsupported"] = str(e)
+                        yield result
+
+
+def _indexResults(results):
+    '''
+    Returns the seconds and solves of all timed results, indexed by
+    profile, agent count, choice count, rule and seed
+    '''
+    return {(result["profile"], result["agents"], result["choices"],
+             result["rule"], result["seed"]): (result["seconds"],
+                                               result["solves"])
+            for result in results if "seconds" in result}
+
+
+def compareResults(baseline, results, tolerance=0.25, minimumSeconds=0.05):
+    '''
+    Compares the totals over all seeds of the given results to the
+    baseline and returns all slowdowns as dicts holding the profile, the
+    agent and choice count, the rule, the metric and both values. Wall time
+    is a slowdown if it grew by more than the given fraction and more than
+    minimumSeconds, the number of solved programs if it grew by more than
+    the given fraction. The latter may vary slightly between runs, as some
+    rows are ordered by identity. Only votes supported by the rule in both
+    results are compared.
+
+    :type baseline: list(dict)
+    :type results: list(dict)
+    :type tolerance: float
+    :type minimumSeconds: float
+    :rtype: list(dict)
+    '''
+    baselineResults = _indexResults(baseline)
+    totals = collections.defaultdict(lambda: [0.0, 0.0, 0, 0])
+    for key, (seconds, solves) in _indexResults(results).items():
+        if key not in baselineResults:
+            continue
+        (baselineSeconds, baselineSolves) = baselineResults[key]
+        total = totals[key[:4]]
+        total[0] += baselineSeconds
+        total[1] += seconds
+        total[2] += baselineSolves
+        total[3] += solves
+    slowdowns = []
+    for key, (baselineSeconds, seconds, baselineSolves, solves) \
+            in sorted(totals.items()):
+        comparisons = []
+        if seconds > baselineSeconds * (1 + tolerance) and \
+                seconds - baselineSeconds > minimumSeconds:
+            comparisons.append(("seconds", baselineSeconds, seconds))
+        if solves > baselineSolves * (1 + tolerance):
+            comparisons.append(("solves", baselineSolves, solves))
+        for (metric, baselineValue, value) in comparisons:
+            slowdowns.append({"profile": key[0], "agents": key[1],
+                              "choices": key[2], "rule": key[3],
+                              "metric": metric, "baseline": baselineValue,
+                              "current": value})
+    return slowdowns
+
+
+def _parseCounts(value):
+    return [int(count) for count in value.split(",")]
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Times all rules on a grid of synthetic profiles")
+    parser.add_argument("--profiles", default=",".join(sorted(GENERATORS)),
+                        help="Comma separated profiles out of " +
+                        ",".join(sorted(GENERATORS)))
+    parser.add_argument("--agents", type=_parseCounts, default=[3, 5, 8],
+                        help="Comma separated agent counts")
+    parser.add_argument("--choices", type=_parseCounts, default=[3, 5, 8],
+                        help="Comma separated choice counts")
+    parser.add_argument("--rules", default="ESR,PSR,SPSR,SSR",
+                        help="Comma separated rules out of " +
+                        ",".join(sorted(RULES)))
+    parser.add_argument("--seeds", type=int, default=3,
+                        help="Number of votes per profile and counts")
+    parser.add_argument("--solver", default="simplex",
+                        choices=sorted(SOLVERS))
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Number of timed solves per vote and rule")
+    parser.add_argument("--output", default=None,
+                        help="File of the results, standard output if " +
+                        "not given")
+    parser.add_argument("--stacks", default=None,
+                        help="File of the time spent in every phase of the " +
+                        "solvers, in the collapsed stack format of flame " +
+                        "graph tools")
+    parser.add_argument("--baseline", default=None,
+                        help="Results file to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Fraction of additional wall time and solves " +
+                        "tolerated")
+    parser.add_argument("--minimum-seconds", type=float, default=0.05,
+                        help="Additional wall time always tolerated")
+    options = parser.parse_args(arguments)
+
+    profiler = None if options.stacks is None else Profiler()
+    results = list(runBenchmark(options.profiles.split(","), options.agents,
+                                options.choices, options.rules.split(","),
+                                options.seeds, options.solver,
+                                options.repeats, profiler))
+    document = {"solver": options.solver, "seeds": options.seeds,
+                "repeats": options.repeats, "results": results}
+    if options.output is None:
+        sys.stdout.write(json.dumps(document, sort_keys=True, indent=1) + "\n")
+    else:
+        with open(options.output, "w") as output:
+            json.dump(document, output, sort_keys=True, indent=1)
+    if profiler is not None:
+        with open(options.stacks, "w") as stacks:
+            profiler.writeCollapsedStacks(stacks)
+
+    if options.baseline is not None:
+        with open(options.baseline) as baselineFile:
+            baseline = json.load(baselineFile)
+        slowdowns = compareResults(baseline["results"], results,
+                                   options.tolerance, options.minimum_seconds)
+        for slowdown in slowdowns:
+            sys.stderr.write("{profile} agents={agents} choices={choices} "
+                             "{rule}: {metric} {baseline} -> {current}\n"
+                             .format(**slowdown))
+        if slowdowns:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
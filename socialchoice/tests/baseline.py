@@ -0,0 +1,222 @@
+'''
+Small fixed votes together with the results of the solvers before any
+performance work, which solved every step with CBC. The results are the
+probabilities of the preference classes of every agent, which every rule
+determines uniquely, keyed by agent identifier and class position. For
+assignment votes, they are the probabilities of every agent receiving every
+object, which are compared by class as well.
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.parser import parseVoteFromDict, toAssignmentVote
+from vote.society import Lottery
+from vote.solver.settings import SolverSettings
+from vote.solver.simplex import SimplexBackend
+import collections
+import math
+import unittest
+
+VOTES = {
+    "cycle": {1: ["a", "b", "c"], 2: ["b", "c", "a"], 3: ["c", "a", "b"]},
+    "ties": {1: [("a", "b"), "c"], 2: ["b", ("a", "c")],
+             3: ["c", "a", "b"], 4: [("a", "c"), "b"]},
+    "dichotomous": {1: [("a", "b"), ("c", "d")], 2: [("b", "c"), ("a", "d")],
+                    3: ["d", ("a", "b", "c")], 4: [("a", "b"), ("c", "d")]},
+    "duplicates": {1: ["a", "b", "c"], 2: ["a", "b", "c"], 3: ["c", "b", "a"],
+                   4: [("b", "c"), "a"], 5: ["c", "b", "a"]},
+    "mixed": {1: [("a", "b"), "c", ("d", "e")],
+              2: ["e", ("a", "d"), ("b", "c")],
+              3: ["c", "b", "a", "e", "d"],
+              4: [("b", "d", "e"), ("a", "c")],
+              5: ["d", "c", ("a", "b", "e")]},
+}
+
+# Votes over objects, solved as votes over assignments
+ASSIGNMENT_VOTES = {
+    "strict": {1: ["a", "b", "c"], 2: ["a", "c", "b"], 3: ["b", "a", "c"]},
+    "ties": {1: [("a", "b"), "c"], 2: ["a", ("b", "c")],
+             3: [("a", "b", "c")]},
+}
+
+CLASS_PROBABILITIES = {
+    ('cycle', 'ESR'): {(1, 0): 0.333333, (1, 1): 0.333333, (1, 2): 0.333333,
+        (2, 0): 0.333333, (2, 1): 0.333333, (2, 2): 0.333333, (3, 0): 0.333333,
+        (3, 1): 0.333333, (3, 2): 0.333333},
+    ('cycle', 'PSR'): {(1, 0): 0.333333, (1, 1): 0.333333, (1, 2): 0.333333,
+        (2, 0): 0.333333, (2, 1): 0.333333, (2, 2): 0.333333, (3, 0): 0.333333,
+        (3, 1): 0.333333, (3, 2): 0.333333},
+    ('cycle', 'SPSR'): {(1, 0): 0.333333, (1, 1): 0.333333, (1, 2): 0.333333,
+        (2, 0): 0.333333, (2, 1): 0.333333, (2, 2): 0.333333, (3, 0): 0.333333,
+        (3, 1): 0.333333, (3, 2): 0.333333},
+    ('cycle', 'SSR'): {(1, 0): 0.333333, (1, 1): 0.333333, (1, 2): 0.333333,
+        (2, 0): 0.333333, (2, 1): 0.333333, (2, 2): 0.333333, (3, 0): 0.333333,
+        (3, 1): 0.333333, (3, 2): 0.333333},
+    ('dichotomous', 'ESR'): {(1, 0): 0.5, (1, 1): 0.5, (2, 0): 0.5,
+        (2, 1): 0.5, (3, 0): 0.5, (3, 1): 0.5, (4, 0): 0.5, (4, 1): 0.5},
+    ('dichotomous', 'PSR'): {(1, 0): 0.625, (1, 1): 0.375, (2, 0): 0.625,
+        (2, 1): 0.375, (3, 0): 0.375, (3, 1): 0.625, (4, 0): 0.625,
+        (4, 1): 0.375},
+    ('dichotomous', 'SPSR'): {(1, 0): 0.75, (1, 1): 0.25, (2, 0): 0.75,
+        (2, 1): 0.25, (3, 0): 0.25, (3, 1): 0.75, (4, 0): 0.75, (4, 1): 0.25},
+    ('dichotomous', 'SSR'): {(1, 0): 0.75, (1, 1): 0.25, (2, 0): 0.75,
+        (2, 1): 0.25, (3, 0): 0.25, (3, 1): 0.75, (4, 0): 0.75, (4, 1): 0.25},
+    ('duplicates', 'ESR'): {(1, 0): 0.5, (1, 1): 0.0, (1, 2): 0.5, (2, 0): 0.5,
+        (2, 1): 0.0, (2, 2): 0.5, (3, 0): 0.5, (3, 1): 0.0, (3, 2): 0.5,
+        (4, 0): 0.5, (4, 1): 0.5, (5, 0): 0.5, (5, 1): 0.0, (5, 2): 0.5},
+    ('duplicates', 'PSR'): {(1, 0): 0.4, (1, 1): 0.1, (1, 2): 0.5, (2, 0): 0.4,
+        (2, 1): 0.1, (2, 2): 0.5, (3, 0): 0.5, (3, 1): 0.1, (3, 2): 0.4,
+        (4, 0): 0.6, (4, 1): 0.4, (5, 0): 0.5, (5, 1): 0.1, (5, 2): 0.4},
+    ('duplicates', 'SPSR'): {(1, 0): 0.4, (1, 1): 0.1, (1, 2): 0.5,
+        (2, 0): 0.4, (2, 1): 0.1, (2, 2): 0.5, (3, 0): 0.5, (3, 1): 0.1,
+        (3, 2): 0.4, (4, 0): 0.6, (4, 1): 0.4, (5, 0): 0.5, (5, 1): 0.1,
+        (5, 2): 0.4},
+    ('duplicates', 'SSR'): {(1, 0): 0.4, (1, 1): 0.1, (1, 2): 0.5, (2, 0): 0.4,
+        (2, 1): 0.1, (2, 2): 0.5, (3, 0): 0.5, (3, 1): 0.1, (3, 2): 0.4,
+        (4, 0): 0.6, (4, 1): 0.4, (5, 0): 0.5, (5, 1): 0.1, (5, 2): 0.4},
+    ('mixed', 'ESR'): {(1, 0): 0.25, (1, 1): 0.25, (1, 2): 0.5, (2, 0): 0.25,
+        (2, 1): 0.25, (2, 2): 0.5, (3, 0): 0.25, (3, 1): 0.25, (3, 2): 0.0,
+        (3, 3): 0.25, (3, 4): 0.25, (4, 0): 0.75, (4, 1): 0.25, (5, 0): 0.25,
+        (5, 1): 0.25, (5, 2): 0.5},
+    ('mixed', 'PSR'): {(1, 0): 0.25, (1, 1): 0.25, (1, 2): 0.5, (2, 0): 0.25,
+        (2, 1): 0.25, (2, 2): 0.5, (3, 0): 0.25, (3, 1): 0.25, (3, 2): 0.0,
+        (3, 3): 0.25, (3, 4): 0.25, (4, 0): 0.75, (4, 1): 0.25, (5, 0): 0.25,
+        (5, 1): 0.25, (5, 2): 0.5},
+    ('mixed', 'SPSR'): {(1, 0): 0.266667, (1, 1): 0.2, (1, 2): 0.533333,
+        (2, 0): 0.266667, (2, 1): 0.266667, (2, 2): 0.466667, (3, 0): 0.2,
+        (3, 1): 0.266667, (3, 2): 0.0, (3, 3): 0.266667, (3, 4): 0.266667,
+        (4, 0): 0.8, (4, 1): 0.2, (5, 0): 0.266667, (5, 1): 0.2,
+        (5, 2): 0.533333},
+    ('mixed', 'SSR'): {(1, 0): 0.3, (1, 1): 0.2, (1, 2): 0.5, (2, 0): 0.25,
+        (2, 1): 0.25, (2, 2): 0.5, (3, 0): 0.2, (3, 1): 0.3, (3, 2): 0.0,
+        (3, 3): 0.25, (3, 4): 0.25, (4, 0): 0.8, (4, 1): 0.2, (5, 0): 0.25,
+        (5, 1): 0.2, (5, 2): 0.55},
+    ('ties', 'ESR'): {(1, 0): 0.5, (1, 1): 0.5, (2, 0): 0.5, (2, 1): 0.5,
+        (3, 0): 0.5, (3, 1): 0.0, (3, 2): 0.5, (4, 0): 0.5, (4, 1): 0.5},
+    ('ties', 'PSR'): {(1, 0): 0.625, (1, 1): 0.375, (2, 0): 0.375,
+        (2, 1): 0.625, (3, 0): 0.375, (3, 1): 0.25, (3, 2): 0.375,
+        (4, 0): 0.625, (4, 1): 0.375},
+    ('ties', 'SPSR'): {(1, 0): 0.625, (1, 1): 0.375, (2, 0): 0.375,
+        (2, 1): 0.625, (3, 0): 0.375, (3, 1): 0.25, (3, 2): 0.375,
+        (4, 0): 0.625, (4, 1): 0.375},
+    ('ties', 'SSR'): {(1, 0): 0.666667, (1, 1): 0.333333, (2, 0): 0.333333,
+        (2, 1): 0.666667, (3, 0): 0.333333, (3, 1): 0.333333, (3, 2): 0.333333,
+        (4, 0): 0.666667, (4, 1): 0.333333},
+}
+
+ASSIGNMENT_PROBABILITIES = {
+    ('strict', 'ESR'): {(1, 'a'): 0.5, (1, 'b'): 0.25, (1, 'c'): 0.25,
+        (2, 'a'): 0.5, (2, 'c'): 0.5, (3, 'b'): 0.75, (3, 'c'): 0.25},
+    ('strict', 'PSR'): {(1, 'a'): 0.5, (1, 'b'): 0.25, (1, 'c'): 0.25,
+        (2, 'a'): 0.5, (2, 'c'): 0.5, (3, 'b'): 0.75, (3, 'c'): 0.25},
+    ('strict', 'SSR'): {(1, 'a'): 0.5, (1, 'c'): 0.5, (2, 'a'): 0.5,
+        (2, 'c'): 0.5, (3, 'b'): 1.0},
+    ('ties', 'ESR'): {(1, 'b'): 1.0, (2, 'a'): 1.0, (3, 'c'): 1.0},
+    ('ties', 'PSR'): {(1, 'b'): 1.0, (2, 'a'): 1.0, (3, 'c'): 1.0},
+    ('ties', 'SSR'): {(1, 'b'): 1.0, (2, 'a'): 1.0, (3, 'c'): 1.0},
+}
+
+
+def createVote(name):
+    '''
+    :type name: str
+    :rtype: vote.society.Vote
+    '''
+    return parseVoteFromDict(VOTES[name])
+
+
+def createAssignmentVote(name):
+    '''
+    Returns the vote over all assignments of the given assignment vote
+
+    :type name: str
+    :rtype: vote.society.Vote
+    '''
+    return toAssignmentVote(parseVoteFromDict(ASSIGNMENT_VOTES[name]))
+
+
+def createSettings(**options):
+    '''
+    Returns settings solving with the in-process simplex backend, which is
+    much faster than CBC on these small votes
+    '''
+    return SolverSettings(SimplexBackend(), **options)
+
+
+def getClassProbabilities(vote, lottery):
+    '''
+    :type vote: vote.society.Vote
+    :type lottery: vote.society.Lottery
+    :rtype: dict(tuple(object, int), float)
+    '''
+    distribution = dict(lottery.getDistribution())
+    return {(agent.getIdentifier(), position):
+            math.fsum(distribution.get(choice.getObject(), 0.0)
+                      for choice in choiceClass)
+            for agent in vote.getAgents()
+            for position, choiceClass in enumerate(agent.getChoiceClasses())}
+
+
+def getAgentObjectProbabilities(lottery):
+    '''
+    :type lottery: vote.society.Lottery|vote.society.AssignmentLottery
+    :rtype: dict(tuple(object, object), float)
+    '''
+    probabilities = collections.defaultdict(float)
+    if isinstance(lottery, Lottery):
+        for assignment, value in lottery.getDistribution():
+            for agent, obj in assignment.getAgentObjectPairs():
+                probabilities[(agent.getIdentifier(), obj)] += value
+        return probabilities
+    for agent in lottery.getAgents():
+        for obj, value in lottery.getAgentDistribution(agent):
+            probabilities[(agent.getIdentifier(), obj)] += value
+    return probabilities
+
+
+def getAssignmentClassProbabilities(vote, agentObjectProbabilities):
+    '''
+    Returns the probabilities of the preference classes of every agent of
+    the given vote over objects. Unlike the probabilities of single objects,
+    they are determined uniquely by every rule.
+
+    :type vote: vote.society.Vote
+    :type agentObjectProbabilities: dict(tuple(object, object), float)
+    :rtype: dict(tuple(object, int), float)
+    '''
+    return {(agent.getIdentifier(), position):
+            math.fsum(agentObjectProbabilities.get(
+                (agent.getIdentifier(), choice.getObject()), 0.0)
+                for choice in choiceClass)
+            for agent in vote.getAgents()
+            for position, choiceClass in enumerate(agent.getChoiceClasses())}
+
+
+class BaselineTestCase(unittest.TestCase):
+    '''
+    Test case comparing lotteries to the ones of the baseline solver
+    '''
+
+    def assertProbabilitiesEqual(self, expected, actual):
+        for key in set(expected.keys()) | set(actual.keys()):
+            self.assertAlmostEqual(expected.get(key, 0.0),
+                                   actual.get(key, 0.0), places=4,
+                                   msg="Probability of " + repr(key))
+
+    def assertMatchesBaseline(self, name, rule, lottery):
+        '''
+        Asserts that the lottery of the given rule on the vote of the given
+        name yields the same class probabilities as the baseline solver
+        '''
+        self.assertProbabilitiesEqual(
+            CLASS_PROBABILITIES[(name, rule)],
+            getClassProbabilities(createVote(name), lottery))
+
+    def assertMatchesAssignmentBaseline(self, name, rule, lottery):
+        vote = parseVoteFromDict(ASSIGNMENT_VOTES[name])
+        self.assertProbabilitiesEqual(
+            getAssignmentClassProbabilities(
+                vote, ASSIGNMENT_PROBABILITIES[(name, rule)]),
+            getAssignmentClassProbabilities(
+                vote, getAgentObjectProbabilities(lottery)))
@@ -0,0 +1,65 @@
+'''
+Tests of assignment votes, see vote.society.AssignmentVote
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, ASSIGNMENT_VOTES, createSettings
+from vote.parser import parseVoteFromDict, toAssignmentMatrixVote
+from vote.solver.batch import RULES
+from vote.solver.util import UnsupportedVoteError
+import unittest
+
+
+def createMatrixVote(name):
+    return toAssignmentMatrixVote(parseVoteFromDict(ASSIGNMENT_VOTES[name]))
+
+
+class AssignmentMatrixTest(BaselineTestCase):
+
+    def testRulesMatchBaseline(self):
+        settings = createSettings()
+        for name in sorted(ASSIGNMENT_VOTES):
+            for rule in ["ESR", "PSR"]:
+                self.assertMatchesAssignmentBaseline(
+                    name, rule, RULES[rule](createMatrixVote(name), settings))
+
+    def testTowersAcrossAgentsAreNotSupported(self):
+        for rule in ["SPSR", "SSR"]:
+            self.assertRaises(UnsupportedVoteError, RULES[rule],
+                              createMatrixVote("ties"), createSettings())
+
+    def testDistributions(self):
+        vote = createMatrixVote("strict")
+        self.assertEqual(vote.getChoiceCount(), 9)
+        # One row per agent and one column per object
+        distributions = vote.getDistributions()
+        self.assertEqual(len(distributions), 6)
+        for distribution in distributions:
+            self.assertEqual(len(distribution), 3)
+        self.assertEqual(set().union(*distributions), vote.getChoices())
+
+    def testSubclasses(self):
+        vote = createMatrixVote("ties")
+        classes = {(agent.getIdentifier(), position): choiceClass
+                   for agent in vote.getAgents()
+                   for position, choiceClass
+                   in enumerate(agent.getChoiceClasses())}
+        self.assertTrue(vote.isSubclass(classes[(1, 0)], classes[(1, 0)]))
+        self.assertFalse(vote.isSubclass(classes[(1, 0)], classes[(2, 0)]))
+        # Agent 2 receiving b or c leaves a, b or c to agent 1
+        self.assertFalse(vote.isSubclass(classes[(2, 1)], classes[(1, 0)]))
+        # Agent 1 receiving c leaves a or b to agent 2
+        self.assertFalse(vote.isSubclass(classes[(1, 1)], classes[(2, 0)]))
+        # Agent 3 receives some object in any case
+        self.assertTrue(vote.isSubclass(classes[(1, 1)], classes[(3, 0)]))
+
+    def testFewerObjectsThanAgents(self):
+        self.assertRaises(ValueError, toAssignmentMatrixVote,
+                          parseVoteFromDict({1: ["a", "b"], 2: ["b", "a"],
+                                             3: ["a", "b"]}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+'''
+Tests of the backends solving linear programs, see
+vote.solver.settings.LpBackend
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote
+from vote.solver.batch import RULES
+from vote.solver.pricing import EnumerationPricer
+from vote.solver.program import LinearProgram, SENSE_LE, SENSE_GE, SENSE_EQ
+from vote.solver.settings import SolverSettings, PulpBackend, ScipyBackend
+from vote.solver.simplex import SimplexBackend
+from pulp.constants import LpStatusOptimal, LpStatusInfeasible, \
+    LpStatusUnbounded
+from pulp.solvers import PULP_CBC_CMD
+import unittest
+
+
+def createBackends():
+    return [PulpBackend(PULP_CBC_CMD(msg=False)), ScipyBackend(),
+            SimplexBackend()]
+
+
+class BackendTest(unittest.TestCase):
+
+    def testOptimalProgram(self):
+        for backend in createBackends():
+            program = LinearProgram()
+            x = program.addVariable()
+            y = program.addVariable()
+            z = program.addVariable(0.0, None)
+            program.addRow({x: 1, y: 1}, SENSE_LE, 4.0)
+            program.addRow({x: 1, y: -1}, SENSE_GE, -2.0)
+            program.addRow({z: 1}, SENSE_EQ, 1.0)
+            program.setObjective({x: 1, y: 2})
+            self.assertEqual(backend.solve(program), LpStatusOptimal)
+            self.assertAlmostEqual(program.getObjectiveValue(), 7.0)
+            self.assertAlmostEqual(program.getValue(x), 1.0)
+            self.assertAlmostEqual(program.getValue(y), 3.0)
+            self.assertAlmostEqual(program.getValue(z), 1.0)
+            if backend.providesDuals():
+                self.assertAlmostEqual(program.getDual(0), 1.5)
+                self.assertAlmostEqual(program.getDual(1), -0.5)
+                self.assertAlmostEqual(program.getDual(2), 0.0)
+            else:
+                self.assertIsNone(program.getDual(0))
+
+            # Free columns may move in either direction
+            for (objective, value) in [(1, 5.0), (-1, -5.0)]:
+                program = LinearProgram()
+                x = program.addVariable(None, None)
+                program.addRow({x: 1}, SENSE_LE, 5.0)
+                program.addRow({x: 1}, SENSE_GE, -5.0)
+                program.setObjective({x: objective})
+                self.assertEqual(backend.solve(program), LpStatusOptimal)
+                self.assertAlmostEqual(program.getValue(x), value)
+
+    def testInfeasibleProgram(self):
+        for backend in createBackends():
+            program = LinearProgram()
+            x = program.addVariable()
+            program.addRow({x: 1}, SENSE_GE, 2.0)
+            program.addRow({x: 1}, SENSE_LE, 1.0)
+            program.setObjective({x: 1})
+            self.assertEqual(backend.solve(program), LpStatusInfeasible)
+
+    def testUnboundedProgram(self):
+        for backend in createBackends():
+            program = LinearProgram()
+            x = program.addVariable()
+            y = program.addVariable()
+            program.addRow({x: 1, y: -1}, SENSE_LE, 1.0)
+            program.setObjective({x: 1})
+            self.assertEqual(backend.solve(program), LpStatusUnbounded)
+
+
+class ScipyBackendTest(BaselineTestCase):
+
+    def testRulesMatchBaseline(self):
+        settings = SolverSettings(ScipyBackend())
+        for name in sorted(VOTES):
+            for rule in sorted(RULES):
+                self.assertMatchesBaseline(
+                    name, rule, RULES[rule](createVote(name), settings))
+
+    def testUnknownMethod(self):
+        self.assertRaises(ValueError, ScipyBackend, "unknown")
+
+    def testColumnGenerationNeedsDuals(self):
+        backend = ScipyBackend()
+        if backend.providesDuals():
+            return
+        settings = SolverSettings(backend, pricer=EnumerationPricer())
+        self.assertRaises(ValueError, RULES["ESR"], createVote("mixed"),
+                          settings)
+
+
+if __name__ == '__main__':
+    unittest.main()
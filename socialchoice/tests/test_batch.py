@@ -0,0 +1,102 @@
+'''
+Tests of solving many votes on a pool of processes, see vote.solver.batch
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createSettings
+from vote.solver.batch import RULES, solveBatch, readVotes
+from vote.solver.parallel import SubproblemExecutor
+import json
+import multiprocessing
+import os
+import unittest
+
+
+def createExecutorSettings():
+    return createSettings(executor=SubproblemExecutor(1))
+
+
+def getSolverProcesses():
+    '''
+    Returns the ids of all CBC processes, including defunct ones
+    '''
+    processes = set()
+    for pid in os.listdir("/proc"):
+        try:
+            with open(os.path.join("/proc", pid, "comm")) as comm:
+                if comm.read().strip() == "cbc":
+                    processes.add(int(pid))
+        except (IOError, ValueError):
+            pass
+    return processes
+
+
+class BatchTest(BaselineTestCase):
+
+    def testResultsMatchBaseline(self):
+        names = sorted(VOTES)
+        rules = sorted(RULES)
+        results = list(solveBatch([(name, VOTES[name]) for name in names],
+                                  rules, processes=2, chunkSize=3,
+                                  settingsFactory=createSettings))
+        self.assertEqual([(result.getName(), result.getRule())
+                          for result in results],
+                         [(name, rule) for name in names for rule in rules])
+        for result in results:
+            self.assertTrue(result.isSuccessful(), result.getError())
+            self.assertEqual(result.getIndex(), names.index(result.getName()))
+            self.assertMatchesBaseline(result.getName(), result.getRule(),
+                                       result.getLottery())
+
+    def testUnorderedResults(self):
+        results = solveBatch([VOTES[name] for name in sorted(VOTES)],
+                             processes=2, ordered=False,
+                             settingsFactory=createSettings)
+        self.assertEqual(sorted(result.getIndex() for result in results),
+                         range(len(VOTES)))
+
+    def testErrorsDoNotStopTheBatch(self):
+        results = list(solveBatch([("broken", 17), ("cycle", VOTES["cycle"])],
+                                  processes=1, settingsFactory=createSettings))
+        self.assertFalse(results[0].isSuccessful())
+        self.assertIsNone(results[0].getLottery())
+        self.assertIn("error", results[0].toDict())
+        self.assertTrue(results[1].isSuccessful())
+        self.assertMatchesBaseline("cycle", "ESR", results[1].getLottery())
+        self.assertEqual(len(results[1].toDict()["lottery"]), 3)
+
+    def testTimeoutNeedsInProcessSolver(self):
+        self.assertRaises(ValueError, solveBatch, [VOTES["cycle"]],
+                          timeout=1.0)
+        self.assertRaises(ValueError, solveBatch, [VOTES["cycle"]],
+                          timeout=1.0, settingsFactory=createExecutorSettings)
+
+    def testTimeoutLeavesNoSolverProcesses(self):
+        solverProcesses = getSolverProcesses()
+        results = list(solveBatch([VOTES["mixed"]] * 4, ["SSR"],
+                                  processes=2, timeout=0.001,
+                                  settingsFactory=createSettings))
+        self.assertEqual(len(results), 4)
+        for result in results:
+            if not result.isSuccessful():
+                self.assertTrue(result.getError().startswith("Timeout"))
+        self.assertFalse(any(result.isSuccessful() for result in results))
+        self.assertEqual(multiprocessing.active_children(), [])
+        self.assertEqual(getSolverProcesses() - solverProcesses, set())
+
+    def testInvalidArguments(self):
+        self.assertRaises(ValueError, solveBatch, [], ["unknown"])
+        self.assertRaises(ValueError, solveBatch, [], chunkSize=0)
+
+    def testReadVotes(self):
+        lines = [json.dumps(VOTES["cycle"]), "",
+                 json.dumps({"name": "ties", "vote": VOTES["ties"]})]
+        votes = list(readVotes(lines))
+        self.assertEqual([name for (name, _) in votes], [0, "ties"])
+        self.assertRaises(ValueError, list, readVotes(["[1, 2]"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+'''
+Tests of the benchmark suite, see benchmark.suite and benchmark.profiles
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from benchmark.profiles import GENERATORS, createVote, generateMallows, \
+    generateSinglePeaked, generateAssignment
+from benchmark.suite import runBenchmark, compareResults, main, \
+    _checkBackend
+from vote.parser import toPreferenceMatrix
+from vote.society import AssignmentVote
+from vote.solver.settings import LpBackend
+from vote.solver.simplex import SimplexBackend
+from pulp.constants import LpStatusInfeasible
+from itertools import permutations
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+
+class InfeasibleBackend(LpBackend):
+
+    def solve(self, program):
+        program.setSolution(LpStatusInfeasible)
+        return LpStatusInfeasible
+
+
+def createResult(profile, rule, seed, seconds, solves):
+    return {"profile": profile, "agents": 3, "choices": 3, "seed": seed,
+            "rule": rule, "seconds": seconds, "solves": solves}
+
+
+class ProfilesTest(unittest.TestCase):
+
+    def testVotesAreDeterministic(self):
+        for profile in sorted(GENERATORS):
+            matrix = toPreferenceMatrix(createVote(profile, 5, 6, 1))
+            again = toPreferenceMatrix(createVote(profile, 5, 6, 1))
+            self.assertEqual(matrix.getRanks().tolist(),
+                             again.getRanks().tolist())
+        self.assertNotEqual(
+            toPreferenceMatrix(createVote("impartial", 5, 6, 1)).getRanks()
+            .tolist(),
+            toPreferenceMatrix(createVote("impartial", 5, 6, 2)).getRanks()
+            .tolist())
+
+    def testProfiles(self):
+        rng = random.Random(1)
+        # Without dispersion, all agents share the reference order
+        orders = generateMallows(rng, 4, 5, 0.0, 0.0).values()
+        self.assertEqual([orders[0]] * 4, orders)
+        self.assertIsInstance(createVote("assignment", 3, 3, 0),
+                              AssignmentVote)
+        self.assertRaises(ValueError, generateAssignment, rng, 4, 3)
+        self.assertRaises(ValueError, generateMallows, rng, 4, 3, 2.0)
+        self.assertRaises(ValueError, createVote, "unknown", 3, 3, 0)
+
+    def testSinglePeaked(self):
+        profile = generateSinglePeaked(random.Random(2), 8, 5, 0.0)
+        orders = [[choiceClass[0] for choiceClass in order]
+                  for order in profile.values()]
+
+        def isSinglePeaked(axis):
+            # Every prefix of every order is an interval of the axis
+            positions = {choice: position
+                         for position, choice in enumerate(axis)}
+            for order in orders:
+                for length in range(1, len(order) + 1):
+                    prefix = [positions[choice] for choice in order[:length]]
+                    if max(prefix) - min(prefix) != length - 1:
+                        return False
+            return True
+        self.assertTrue(any(isSinglePeaked(axis)
+                            for axis in permutations(orders[0])))
+
+
+class SuiteTest(unittest.TestCase):
+
+    def testRunBenchmark(self):
+        results = list(runBenchmark(["impartial", "assignment"], [3], [3, 4],
+                                    ["ESR", "SPSR"], seeds=1, repeats=1))
+        self.assertEqual(len(results), 8)
+        for result in results:
+            if result["profile"] == "assignment" and result["rule"] == "SPSR":
+                self.assertIn("unsupported", result)
+                self.assertNotIn("seconds", result)
+            else:
+                self.assertGreaterEqual(result["seconds"], 0)
+                self.assertGreaterEqual(result["solves"], 0)
+
+    def testInvalidArguments(self):
+        self.assertRaises(ValueError, runBenchmark, ["unknown"], [3], [3])
+        self.assertRaises(ValueError, runBenchmark, ["impartial"], [3], [3],
+                          ["XSR"])
+        self.assertRaises(ValueError, runBenchmark, ["impartial"], [3], [3],
+                          solver="unknown")
+        self.assertRaises(ValueError, runBenchmark, ["impartial"], [3], [3],
+                          repeats=0)
+
+    def testCheckBackend(self):
+        _checkBackend(SimplexBackend())
+        self.assertRaises(ValueError, _checkBackend, InfeasibleBackend())
+
+    def testCompareResults(self):
+        baseline = [createResult("impartial", "ESR", 0, 1.0, 10),
+                    createResult("impartial", "ESR", 1, 1.0, 10),
+                    createResult("impartial", "PSR", 0, 1.0, 10),
+                    createResult("mallows", "ESR", 0, 0.01, 10)]
+        results = [createResult("impartial", "ESR", 0, 1.5, 10),
+                   createResult("impartial", "ESR", 1, 1.0, 10),
+                   createResult("impartial", "PSR", 0, 1.0, 20),
+                   createResult("mallows", "ESR", 0, 0.05, 10),
+                   {"profile": "assignment", "agents": 3, "choices": 3,
+                    "seed": 0, "rule": "SPSR", "unsupported": "Matrix"}]
+        slowdowns = compareResults(baseline, results)
+        # ESR totals grew by a quarter only, the mallows votes are too fast
+        self.assertEqual(slowdowns, [{"profile": "impartial", "agents": 3,
+                                      "choices": 3, "rule": "PSR",
+                                      "metric": "solves", "baseline": 10,
+                                      "current": 20}])
+        self.assertEqual(len(compareResults(baseline, results, 0.2)), 2)
+
+    def testMain(self):
+        directory = tempfile.mkdtemp()
+        try:
+            output = os.path.join(directory, "results.json")
+            stacks = os.path.join(directory, "stacks.txt")
+            arguments = ["--profiles", "impartial", "--agents", "3",
+                         "--choices", "3", "--seeds", "1", "--repeats", "1",
+                         "--rules", "ESR,PSR", "--output", output]
+            main(arguments + ["--stacks", stacks])
+            with open(output) as results:
+                document = json.load(results)
+            self.assertEqual(document["solver"], "simplex")
+            self.assertEqual(len(document["results"]), 2)
+            with open(stacks) as lines:
+                self.assertTrue(lines.read().startswith("ESR"))
+            # Comparing the results to themselves finds no slowdown
+            main(arguments + ["--baseline", output,
+                              "--minimum-seconds", "60"])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
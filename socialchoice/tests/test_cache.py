@@ -0,0 +1,131 @@
+'''
+Tests of the cache of lotteries by canonical form, see vote.solver.cache
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, CLASS_PROBABILITIES, \
+    createVote, createAssignmentVote, createSettings, getClassProbabilities
+from vote.parser import parseVoteFromDict
+from vote.solver.batch import RULES
+from vote.solver.cache import LotteryCache, getCanonicalForm
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+
+def relabel(preferences, rng, agents=True):
+    '''
+    Returns the given vote dict with choices renamed and, optionally, the
+    preferences moved to other agents and listed in another order
+    '''
+    choices = sorted(set(choice for preference in preferences.values()
+                         for choiceClass in preference
+                         for choice in (choiceClass if isinstance(
+                             choiceClass, tuple) else (choiceClass,))))
+    names = ["x" + str(index) for index in range(len(choices))]
+    rng.shuffle(names)
+    names = dict(zip(choices, names))
+
+    def rename(choiceClass):
+        if isinstance(choiceClass, tuple):
+            return tuple(names[choice] for choice in reversed(choiceClass))
+        return names[choiceClass]
+
+    identifiers = sorted(preferences)
+    if agents:
+        rng.shuffle(identifiers)
+    return {identifier: [rename(choiceClass) for choiceClass in preference]
+            for identifier, preference
+            in zip(identifiers, [preferences[agent]
+                                 for agent in sorted(preferences)])}
+
+
+class CanonicalFormTest(unittest.TestCase):
+
+    def testInvariantUnderRelabelling(self):
+        rng = random.Random(5)
+        for name in sorted(VOTES):
+            (form, order) = getCanonicalForm(createVote(name))
+            self.assertEqual(len(order), len(createVote(name).getChoices()))
+            for _ in range(5):
+                vote = parseVoteFromDict(relabel(VOTES[name], rng))
+                self.assertEqual(getCanonicalForm(vote)[0], form)
+
+    def testDistinctVotesHaveDistinctForms(self):
+        forms = set(getCanonicalForm(createVote(name))[0]
+                    for name in VOTES)
+        self.assertEqual(len(forms), len(VOTES))
+        # Moving a single choice within one preference changes the form
+        self.assertNotEqual(
+            getCanonicalForm(parseVoteFromDict({1: ["a", "b", "c"],
+                                                2: ["b", "a", "c"]}))[0],
+            getCanonicalForm(parseVoteFromDict({1: ["a", "b", "c"],
+                                                2: ["b", "c", "a"]}))[0])
+
+    def testUnsupportedVotes(self):
+        self.assertIsNone(getCanonicalForm(createAssignmentVote("strict")))
+        # The three rotations of the cycle need more leaves
+        self.assertIsNone(getCanonicalForm(createVote("cycle"), 1))
+
+
+class LotteryCacheTest(BaselineTestCase):
+
+    def testCachedLotteriesMatchBaseline(self):
+        rng = random.Random(11)
+        settings = createSettings()
+        cache = LotteryCache()
+        for name in sorted(VOTES):
+            for rule in sorted(RULES):
+                self.assertMatchesBaseline(
+                    name, rule,
+                    cache.solve(RULES[rule], createVote(name), settings))
+                # Only the choices are renamed, so the classes of every
+                # agent stay the same
+                vote = parseVoteFromDict(relabel(VOTES[name], rng, False))
+                lottery = cache.solve(RULES[rule], vote, settings)
+                self.assertProbabilitiesEqual(
+                    CLASS_PROBABILITIES[(name, rule)],
+                    getClassProbabilities(vote, lottery))
+        self.assertEqual(cache.getMisses(), len(VOTES) * len(RULES))
+        self.assertEqual(cache.getHits(), len(VOTES) * len(RULES))
+
+    def testCapacity(self):
+        settings = createSettings()
+        cache = LotteryCache(capacity=1)
+        for name in ["cycle", "ties", "cycle"]:
+            cache.solve(RULES["ESR"], createVote(name), settings)
+        self.assertEqual((cache.getHits(), cache.getMisses()), (0, 3))
+        self.assertRaises(ValueError, LotteryCache, 0)
+
+    def testStoreOutlivesCache(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "lotteries")
+            settings = createSettings()
+            cache = LotteryCache(path=path)
+            cache.solve(RULES["PSR"], createVote("mixed"), settings)
+            cache.close()
+            cache = LotteryCache(path=path)
+            try:
+                self.assertMatchesBaseline(
+                    "mixed", "PSR",
+                    cache.solve(RULES["PSR"], createVote("mixed"), settings))
+                self.assertEqual(cache.getHits(), 1)
+            finally:
+                cache.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def testUnsupportedVotesAreSolved(self):
+        cache = LotteryCache()
+        cache.solve(RULES["ESR"], createAssignmentVote("strict"),
+                    createSettings())
+        self.assertEqual((cache.getHits(), cache.getMisses()), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
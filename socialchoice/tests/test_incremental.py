@@ -0,0 +1,72 @@
+'''
+Tests of ESR on edited votes, see vote.solver.incremental
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote, \
+    createSettings, getClassProbabilities
+from vote.parser import parseVoteFromDict
+from vote.society import ChoiceClass, Preference
+from vote.solver.incremental import IncrementalESR
+from vote.solver.sr import solveVoteESR
+import unittest
+
+
+def createPreference(vote, choiceClasses):
+    '''
+    Returns the preference over the choices of the given vote with the given
+    classes of objects
+    '''
+    choices = {choice.getObject(): choice for choice in vote.getChoices()}
+    return Preference([ChoiceClass([choices[obj] for obj in (
+        choiceClass if isinstance(choiceClass, tuple) else (choiceClass,))])
+        for choiceClass in choiceClasses])
+
+
+class IncrementalESRTest(BaselineTestCase):
+
+    def testInitialLotteryMatchesBaseline(self):
+        for name in sorted(VOTES):
+            incremental = IncrementalESR(createVote(name), createSettings())
+            self.assertMatchesBaseline(name, "ESR", incremental.getLottery())
+            self.assertEqual(incremental.getResumedEvent(), 0)
+
+    def testEditsMatchFreshSolves(self):
+        settings = createSettings()
+        resumed = 0
+        for name in sorted(VOTES):
+            preferences = dict(VOTES[name])
+            incremental = IncrementalESR(createVote(name), settings)
+            # Swap the two least preferred classes of every agent, one agent
+            # after another
+            for identifier in sorted(preferences):
+                preference = list(preferences[identifier])
+                preferences[identifier] = preference[:-2] + \
+                    [preference[-1], preference[-2]]
+                lottery = incremental.setPreference(identifier,
+                                                    createPreference(
+                                                        incremental.getVote(),
+                                                        preferences[identifier]))
+                resumed += incremental.getResumedEvent() > 0
+                vote = parseVoteFromDict(preferences)
+                self.assertProbabilitiesEqual(
+                    getClassProbabilities(vote, solveVoteESR(vote, settings)),
+                    getClassProbabilities(vote, lottery))
+        # Some edits only change late classes of their agent
+        self.assertGreater(resumed, 0)
+
+    def testInvalidEdits(self):
+        incremental = IncrementalESR(createVote("cycle"), createSettings())
+        preference = createPreference(incremental.getVote(), ["a", "b", "c"])
+        self.assertRaises(ValueError, incremental.setPreference, 17,
+                          preference)
+        self.assertRaises(TypeError, incremental.setPreference, 1,
+                          ["a", "b", "c"])
+        self.assertRaises(TypeError, IncrementalESR, createVote("cycle"),
+                          None)
+
+
+if __name__ == '__main__':
+    unittest.main()
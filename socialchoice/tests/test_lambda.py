@@ -0,0 +1,151 @@
+'''
+Tests of the persistent lambda problem, see vote.solver.util.LambdaProblem
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote, createSettings
+from vote.society import ChoiceClass
+from vote.solver.settings import SolverSettings, DETECTION_MODES, \
+    DETECTION_BATCHED, DETECTION_INDIVIDUAL
+from vote.solver.sr import solveVoteESR, solveVotePSR
+from vote.solver.util import LambdaProblem
+from pulp.solvers import PULP_CBC_CMD
+import unittest
+
+
+class LambdaProblemTest(unittest.TestCase):
+
+    def setUp(self):
+        self.vote = createVote("ties")
+        self.settings = createSettings()
+        self.choices = {choice.getObject(): choice
+                        for choice in self.vote.getChoices()}
+
+    def createClass(self, *objects):
+        return ChoiceClass([self.choices[obj] for obj in objects])
+
+    def createProblem(self):
+        return LambdaProblem(self.vote.getChoices(), self.settings)
+
+    def testUpdatedProblemMatchesNewProblem(self):
+        problem = self.createProblem()
+        problem.setRow(1, self.createClass("a", "b"), 0.2, 1)
+        problem.setRow(2, self.createClass("c"), 0.1, 1)
+        problem.maximiseLambda()
+        problem.setRow(1, self.createClass("a"), 0.3, 2)
+        problem.removeRow(2)
+        problem.setRow(3, self.createClass("b", "c"), 0.0, 1)
+
+        newProblem = self.createProblem()
+        newProblem.setRow(1, self.createClass("a"), 0.3, 2)
+        newProblem.setRow(3, self.createClass("b", "c"), 0.0, 1)
+        # 0.3 + 2l + l <= 1
+        self.assertAlmostEqual(problem.maximiseLambda(), 0.7 / 3)
+        self.assertAlmostEqual(newProblem.maximiseLambda(), 0.7 / 3)
+        self.assertEqual(set(problem.getRowKeys()), set([1, 3]))
+
+    def testMaximumTime(self):
+        problem = self.createProblem()
+        problem.setRow(1, self.createClass("a"), 0.0, 1)
+        problem.setMaximumTime(0.5)
+        self.assertAlmostEqual(problem.maximiseLambda(), 0.5)
+        problem.setMaximumTime(2.0)
+        self.assertAlmostEqual(problem.maximiseLambda(), 1.0)
+
+    def testMaximiseSlack(self):
+        problem = self.createProblem()
+        problem.setRow(1, self.createClass("a"), 0.3, 2)
+        problem.setRow(2, self.createClass("b", "c"), 0.0, 1)
+        problem.maximiseLambda()
+        self.assertAlmostEqual(problem.maximiseSlack(1, 0.1), 0.4)
+        self.assertAlmostEqual(problem.maximiseSlack(2, 0.1), 0.4)
+        # The objective is restored afterwards
+        self.assertAlmostEqual(problem.maximiseLambda(), 0.7 / 3)
+
+
+class TightRowsTest(unittest.TestCase):
+
+    def findTightRows(self, detectionMode):
+        vote = createVote("mixed")
+        choices = {choice.getObject(): choice for choice in vote.getChoices()}
+        problem = LambdaProblem(vote.getChoices(),
+                                createSettings(detectionMode=detectionMode))
+        problem.setRow(1, ChoiceClass([choices["a"], choices["b"]]), 0.1, 1)
+        problem.setRow(2, ChoiceClass([choices["a"]]), 0.0, 1)
+        problem.setRow(3, ChoiceClass([choices["c"], choices["d"]]), 0.2, 1)
+        problem.setRow(4, ChoiceClass([choices["e"]]), 0.0, 0)
+        lambdaValue = problem.maximiseLambda()
+        return (lambdaValue, sorted(problem.findTightRows([1, 2, 3, 4],
+                                                          lambdaValue)))
+
+    def testBatchedDetectionMatchesIndividualDetection(self):
+        # a + b >= 0.1 + l, a >= l, c + d >= 0.2 + l and a sum of at most 1
+        # yield l = 0.35, at which a + b, c + d and e, which gets nothing,
+        # are tight, while a may take all of a + b
+        (lambdaValue, tightRows) = self.findTightRows(DETECTION_INDIVIDUAL)
+        self.assertAlmostEqual(lambdaValue, 0.35)
+        self.assertEqual(tightRows, [1, 3, 4])
+        self.assertEqual(self.findTightRows(DETECTION_BATCHED),
+                         (lambdaValue, tightRows))
+
+
+class TightnessCertificateTest(unittest.TestCase):
+
+    def setUp(self):
+        vote = createVote("mixed")
+        self.choices = {choice.getObject(): choice
+                        for choice in vote.getChoices()}
+        self.settings = createSettings()
+        self.problem = LambdaProblem(vote.getChoices(), self.settings)
+        self.problem.setRow(1, self.createClass("a", "b"), 0.1, 1)
+        self.problem.setRow(2, self.createClass("a"), 0.0, 1)
+        self.problem.setRow(3, self.createClass("c", "d"), 0.2, 1)
+        self.lambdaValue = self.problem.maximiseLambda()
+        self.tightRows = self.problem.findTightRows([1, 2, 3],
+                                                    self.lambdaValue)
+
+    def createClass(self, *objects):
+        return ChoiceClass([self.choices[obj] for obj in objects])
+
+    def testCertificateOfBatchedDetection(self):
+        certificate = self.problem.getCertificate()
+        self.assertEqual(certificate.getTightRows(), frozenset([1, 3]))
+        self.assertTrue(certificate.isComplete())
+        certificate.verify(self.settings)
+
+    def testInvalidCertificatesAreRejected(self):
+        certificate = self.problem.getCertificate()
+        certificate.setTightRows([1, 2, 3])
+        self.assertRaises(ValueError, certificate.verify, self.settings)
+        certificate.setTightRows([1, 3])
+        certificate.addWitness(3, {self.choices["e"]: 1.0})
+        self.assertRaises(ValueError, certificate.verify, self.settings)
+
+
+class DetectionModeTest(BaselineTestCase):
+
+    def testRulesMatchBaselineInAllModes(self):
+        for mode in DETECTION_MODES:
+            settings = createSettings(detectionMode=mode)
+            for name in sorted(VOTES):
+                self.assertMatchesBaseline(
+                    name, "ESR", solveVoteESR(createVote(name), settings))
+                self.assertMatchesBaseline(
+                    name, "PSR", solveVotePSR(createVote(name), settings))
+
+
+class PersistentRunTest(BaselineTestCase):
+
+    def testRulesMatchBaselineWithCbc(self):
+        settings = SolverSettings(PULP_CBC_CMD(msg=False))
+        for name in sorted(VOTES):
+            self.assertMatchesBaseline(
+                name, "ESR", solveVoteESR(createVote(name), settings))
+            self.assertMatchesBaseline(
+                name, "PSR", solveVotePSR(createVote(name), settings))
+
+
+if __name__ == '__main__':
+    unittest.main()
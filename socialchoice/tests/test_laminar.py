@@ -0,0 +1,71 @@
+'''
+Tests of the combinatorial lambda problem on laminar classes, see
+vote.solver.laminar
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote, \
+    createSettings, getClassProbabilities
+from vote.parser import parseVoteFromDict
+from vote.solver import sr
+from vote.solver.batch import RULES
+from vote.solver.laminar import LaminarProblem, isLaminar, \
+    createLaminarProblem
+import unittest
+
+# Dichotomous and strict preferences over nested approval sets
+NESTED_VOTE = {1: [("a", "b"), ("c", "d")], 2: [("c", "d"), ("a", "b")],
+               3: ["a", "b", ("c", "d")], 4: ["d", "c", ("a", "b")]}
+
+
+class LaminarTest(BaselineTestCase):
+
+    def testIsLaminar(self):
+        self.assertTrue(isLaminar([]))
+        self.assertTrue(isLaminar([0b0011, 0b1100, 0b0001, 0b1111]))
+        self.assertTrue(isLaminar([0b0011, 0b0011]))
+        self.assertFalse(isLaminar([0b0011, 0b0110]))
+
+    def testCreateLaminarProblem(self):
+        settings = createSettings()
+        self.assertIsInstance(createLaminarProblem(createVote("cycle"),
+                                                   settings), LaminarProblem)
+        self.assertIsInstance(createLaminarProblem(
+            parseVoteFromDict(NESTED_VOTE), settings), LaminarProblem)
+        for name in ["ties", "dichotomous", "mixed"]:
+            self.assertIsNone(createLaminarProblem(createVote(name),
+                                                   settings))
+
+    def testStateUsesLaminarProblem(self):
+        state = sr.ArraySRState(parseVoteFromDict(NESTED_VOTE),
+                                createSettings())
+        self.assertIsInstance(state.getLambdaProblem(), LaminarProblem)
+
+    def testRulesMatchBaseline(self):
+        settings = createSettings()
+        for name in sorted(VOTES):
+            for rule in ["ESR", "PSR"]:
+                self.assertMatchesBaseline(
+                    name, rule, RULES[rule](createVote(name), settings))
+
+    def testRulesMatchLinearPrograms(self):
+        settings = createSettings()
+        for rule in ["ESR", "PSR", "SPSR"]:
+            vote = parseVoteFromDict(NESTED_VOTE)
+            laminar = getClassProbabilities(vote, RULES[rule](vote, settings))
+            # Force the lambda problem solved by linear programs
+            createLaminar = sr.createLaminarProblem
+            sr.createLaminarProblem = lambda *arguments: None
+            try:
+                vote = parseVoteFromDict(NESTED_VOTE)
+                programs = getClassProbabilities(vote,
+                                                 RULES[rule](vote, settings))
+            finally:
+                sr.createLaminarProblem = createLaminar
+            self.assertProbabilitiesEqual(programs, laminar)
+
+
+if __name__ == '__main__':
+    unittest.main()
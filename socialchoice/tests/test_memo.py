@@ -0,0 +1,88 @@
+'''
+Tests of the memo of solved programs, see vote.solver.memo
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from benchmark.suite import CountingBackend
+from tests.baseline import BaselineTestCase, VOTES, createVote
+from tests.test_program import createProgram
+from vote.solver.batch import RULES
+from vote.solver.memo import ProgramMemo
+from vote.solver.profiling import Profiler
+from vote.solver.settings import SolverSettings, DETECTION_BATCHED, \
+    DETECTION_INDIVIDUAL
+from vote.solver.simplex import SimplexBackend
+from pulp.constants import LpStatusOptimal
+import unittest
+
+
+class ProgramMemoTest(unittest.TestCase):
+
+    def testLookupAndStore(self):
+        memo = ProgramMemo()
+        program = createProgram()
+        (status, fingerprint) = memo.lookup(program)
+        self.assertIsNone(status)
+        SimplexBackend().solve(program)
+        memo.store(program, fingerprint)
+        # An equal program gets the solution without being solved
+        copy = createProgram()
+        self.assertEqual(memo.lookup(copy)[0], LpStatusOptimal)
+        self.assertAlmostEqual(copy.getObjectiveValue(), 8.5)
+        copy.setRightHandSide(0, 3.0)
+        self.assertIsNone(memo.lookup(copy)[0])
+        self.assertEqual((memo.getHits(), memo.getMisses()), (1, 2))
+        memo.clear()
+        self.assertEqual((memo.getHits(), memo.getMisses()), (0, 0))
+        self.assertIsNone(memo.lookup(createProgram())[0])
+
+    def testCapacity(self):
+        memo = ProgramMemo(capacity=1)
+        backend = CountingBackend(SimplexBackend())
+        first = createProgram()
+        second = createProgram()
+        second.setRightHandSide(0, 3.0)
+        settings = SolverSettings(backend, memo=memo)
+        for program in [first, second, first.copy(), first.copy()]:
+            settings.solveProgram(program)
+        self.assertEqual(backend.getSolves(), 3)
+        self.assertEqual(memo.getHits(), 1)
+        self.assertRaises(ValueError, ProgramMemo, 0)
+
+
+class MemoisedRulesTest(BaselineTestCase):
+
+    def testRulesMatchBaseline(self):
+        for detectionMode in [DETECTION_BATCHED, DETECTION_INDIVIDUAL]:
+            memo = ProgramMemo()
+            settings = SolverSettings(SimplexBackend(), memo=memo,
+                                      detectionMode=detectionMode)
+            for name in sorted(VOTES):
+                for rule in sorted(RULES):
+                    self.assertMatchesBaseline(
+                        name, rule, RULES[rule](createVote(name), settings))
+
+    def testSolvesAreCountedOnMisses(self):
+        backend = CountingBackend(SimplexBackend())
+        memo = ProgramMemo()
+        profiler = Profiler()
+        settings = SolverSettings(backend, memo=memo, profiler=profiler,
+                                  detectionMode=DETECTION_INDIVIDUAL)
+        RULES["SSR"](createVote("mixed"), settings)
+        counters = profiler.getCounters()
+        self.assertEqual(counters.get("solves", 0), backend.getSolves())
+        self.assertEqual(counters.get("memo hits", 0), memo.getHits())
+        self.assertGreater(backend.getSolves(), 0)
+        # Solving the same vote again only hits the memo
+        backend.reset()
+        profiler.reset()
+        RULES["SSR"](createVote("mixed"), settings)
+        self.assertEqual(backend.getSolves(), 0)
+        self.assertEqual(profiler.getCounters().get("solves", 0), 0)
+        self.assertGreater(profiler.getCounters()["memo hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
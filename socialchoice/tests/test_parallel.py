@@ -0,0 +1,76 @@
+'''
+Tests of solving independent programs concurrently, see
+vote.solver.parallel
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote, \
+    createSettings
+from tests.test_simplex import createRandomProgram
+from vote.solver.batch import RULES
+from vote.solver.parallel import SubproblemExecutor, WORKERS_THREADS, \
+    WORKERS_PROCESSES, WORKERS_AUTOMATIC
+from vote.solver.settings import DETECTION_INDIVIDUAL
+from vote.solver.simplex import SimplexBackend
+import pickle
+import random
+import unittest
+
+
+class SubproblemExecutorTest(BaselineTestCase):
+
+    def testSolveProgramsInOrder(self):
+        rng = random.Random(3)
+        programs = [createRandomProgram(rng, 4, 3) for _ in range(6)]
+        expected = [program.copy() for program in programs]
+        backend = SimplexBackend()
+        for program in expected:
+            backend.solve(program)
+        for kind in [WORKERS_THREADS, WORKERS_PROCESSES]:
+            executor = SubproblemExecutor(2, kind)
+            try:
+                statuses = executor.solvePrograms(programs, backend)
+            finally:
+                executor.close()
+            self.assertEqual(statuses, [program.getStatus()
+                                        for program in expected])
+            for program, solved in zip(programs, expected):
+                self.assertAlmostEqual(program.getObjectiveValue(),
+                                       solved.getObjectiveValue())
+
+    def testRulesMatchBaseline(self):
+        for kind in [WORKERS_AUTOMATIC, WORKERS_THREADS]:
+            executor = SubproblemExecutor(2, kind)
+            settings = createSettings(detectionMode=DETECTION_INDIVIDUAL,
+                                      executor=executor)
+            try:
+                for name in sorted(VOTES):
+                    for rule in sorted(RULES):
+                        self.assertMatchesBaseline(
+                            name, rule,
+                            RULES[rule](createVote(name), settings))
+            finally:
+                executor.close()
+
+    def testInvalidArguments(self):
+        self.assertRaises(ValueError, SubproblemExecutor, 0)
+        self.assertRaises(ValueError, SubproblemExecutor, 2, "fibers")
+        self.assertRaises(ValueError, createSettings, executor=object())
+
+    def testPickleForgetsPools(self):
+        executor = SubproblemExecutor(2, WORKERS_THREADS)
+        try:
+            executor.solvePrograms([createRandomProgram(random.Random(1), 2, 2)
+                                    for _ in range(2)], SimplexBackend())
+            copy = pickle.loads(pickle.dumps(executor))
+        finally:
+            executor.close()
+        self.assertEqual(copy.getWorkers(), 2)
+        self.assertEqual(copy.getKind(), WORKERS_THREADS)
+        self.assertEqual(copy.pools, dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+'''
+Tests of column generation, see vote.solver.pricing
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, ASSIGNMENT_VOTES, \
+    createVote, createAssignmentVote, createSettings, \
+    getAgentObjectProbabilities, getAssignmentClassProbabilities
+from vote.parser import parseVoteFromDict, toAssignmentVote, \
+    toAssignmentMatrixVote
+from vote.society import Choice, ChoiceClass
+from vote.solver.batch import RULES
+from vote.solver.pricing import EnumerationPricer, AssignmentPricer, \
+    maximumWeightAssignment
+from itertools import permutations
+import numpy
+import random
+import unittest
+
+
+class MaximumWeightAssignmentTest(unittest.TestCase):
+
+    def testMatchesAllPermutations(self):
+        rng = random.Random(1)
+        for size in range(1, 6):
+            for _ in range(10):
+                weights = numpy.array([[rng.choice([0.0, 0.5, 1.0, 2.0])
+                                        for _ in range(size)]
+                                       for _ in range(size)])
+                columns = maximumWeightAssignment(weights)
+                self.assertEqual(sorted(columns), range(size))
+                self.assertAlmostEqual(
+                    sum(weights[row, column]
+                        for row, column in enumerate(columns)),
+                    max(sum(weights[row, column]
+                            for row, column in enumerate(permutation))
+                        for permutation in permutations(range(size))))
+
+
+class EnumerationPricerTest(unittest.TestCase):
+
+    def testPrice(self):
+        choices = {name: Choice(name) for name in "abc"}
+        weights = {ChoiceClass([choices["a"], choices["b"]]): 0.5,
+                   ChoiceClass([choices["b"]]): 0.25,
+                   ChoiceClass([choices["c"]]): 0.5,
+                   ChoiceClass([choices["a"]]): -1.0}
+        self.assertEqual(EnumerationPricer().price(choices.values(), weights),
+                         (choices["b"], 0.75))
+
+
+class ColumnGenerationTest(BaselineTestCase):
+
+    def testRulesMatchBaseline(self):
+        settings = createSettings(pricer=EnumerationPricer())
+        for name in sorted(VOTES):
+            for rule in ["ESR", "PSR", "SSR"]:
+                self.assertMatchesBaseline(
+                    name, rule, RULES[rule](createVote(name), settings))
+
+    def testAssignmentPricerMatchesBaseline(self):
+        for name in sorted(ASSIGNMENT_VOTES):
+            settings = createSettings(pricer=AssignmentPricer(
+                toAssignmentMatrixVote(parseVoteFromDict(
+                    ASSIGNMENT_VOTES[name]))))
+            for rule in ["ESR", "PSR"]:
+                self.assertMatchesAssignmentBaseline(
+                    name, rule, RULES[rule](createAssignmentVote(name),
+                                            settings))
+
+    def testAssignmentPricerWithMoreObjects(self):
+        vote = parseVoteFromDict({1: ["a", ("b", "c"), "d"],
+                                  2: [("a", "b"), "c", "d"],
+                                  3: ["b", "a", ("c", "d")]})
+        assignmentVote = toAssignmentVote(vote)
+        settings = createSettings()
+        pricedSettings = createSettings(
+            pricer=AssignmentPricer(toAssignmentMatrixVote(vote)))
+        for rule in ["ESR", "PSR"]:
+            self.assertProbabilitiesEqual(
+                getAssignmentClassProbabilities(
+                    vote, getAgentObjectProbabilities(
+                        RULES[rule](assignmentVote, settings))),
+                getAssignmentClassProbabilities(
+                    vote, getAgentObjectProbabilities(
+                        RULES[rule](assignmentVote, pricedSettings))))
+
+    def testAssignmentPricerNeedsAssignmentVote(self):
+        self.assertRaises(TypeError, AssignmentPricer, createVote("cycle"))
+
+
+if __name__ == '__main__':
+    unittest.main()
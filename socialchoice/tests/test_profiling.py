@@ -0,0 +1,132 @@
+'''
+Tests of the profiler of the solvers, see vote.solver.profiling
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from benchmark.suite import CountingBackend
+from tests.baseline import createVote
+from vote.solver.memo import ProgramMemo
+from vote.solver.profiling import Profiler, NULL_PHASE
+from vote.solver.settings import SolverSettings
+from vote.solver.simplex import SimplexBackend
+from vote.solver.sr import solveVoteESR
+from StringIO import StringIO
+import unittest
+
+
+class Clock(object):
+    '''
+    Clock advanced by hand
+    '''
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.profiler = Profiler(self.clock)
+
+    def runSolve(self):
+        with self.profiler.measure("solve"):
+            self.clock.time += 1
+            with self.profiler.measure("lp"):
+                self.clock.time += 2
+                self.profiler.count("solves")
+            with self.profiler.measure("advance"):
+                self.clock.time += 0.5
+            self.clock.time += 0.5
+
+    def testNestedPhases(self):
+        self.runSolve()
+        self.runSolve()
+        self.assertEqual(self.profiler.getTimes(),
+                         {"solve": 3.0, "solve;lp": 4.0, "solve;advance": 1.0})
+        self.assertEqual(self.profiler.getCounters(), {"solves": 2})
+        self.assertEqual(self.profiler.getSummaries(), [
+            {"name": "solve", "seconds": 4.0,
+             "phases": {"solve": 1.5, "solve;lp": 2.0, "solve;advance": 0.5},
+             "counters": {"solves": 1}}] * 2)
+
+    def testCountersOutsideOfSolves(self):
+        self.profiler.count("votes", 3)
+        self.runSolve()
+        self.assertEqual(self.profiler.getCounters(), {"votes": 3,
+                                                       "solves": 1})
+        self.assertEqual(self.profiler.getSummaries()[0]["counters"],
+                         {"solves": 1})
+
+    def testCollapsedStacks(self):
+        self.runSolve()
+        stream = StringIO()
+        self.profiler.writeCollapsedStacks(stream, 0.5)
+        self.assertEqual(stream.getvalue(), "solve 3\nsolve;advance 1\n" +
+                         "solve;lp 4\n")
+
+    def testEventsAndReset(self):
+        states = []
+        self.profiler.addEventListener(states.append)
+        self.profiler.reportEvent("first")
+        self.runSolve()
+        self.profiler.reset()
+        self.assertEqual((self.profiler.getTimes(),
+                          self.profiler.getCounters(),
+                          self.profiler.getSummaries()), ({}, {}, []))
+        self.profiler.reportEvent("second")
+        self.profiler.removeEventListener(states.append)
+        self.profiler.reportEvent("third")
+        self.assertEqual(states, ["first", "second"])
+        self.assertEqual(self.profiler.getCounters(), {"events": 2})
+
+
+class SolverProfilingTest(unittest.TestCase):
+
+    def testSettingsWithoutProfiler(self):
+        settings = SolverSettings(SimplexBackend())
+        self.assertIs(settings.measure("ESR"), NULL_PHASE)
+        settings.count("solves")
+
+    def testSolverPhasesAndCounters(self):
+        profiler = Profiler()
+        backend = CountingBackend(SimplexBackend())
+        states = []
+        profiler.addEventListener(states.append)
+        solveVoteESR(createVote("mixed"), SolverSettings(backend,
+                                                         profiler=profiler))
+        (summary,) = profiler.getSummaries()
+        self.assertEqual(summary["name"], "ESR")
+        self.assertIn("ESR;setup", summary["phases"])
+        self.assertTrue(any(phase.endswith(";lp")
+                            for phase in summary["phases"]))
+        self.assertEqual(summary["counters"]["events"], len(states))
+        self.assertEqual(summary["counters"].get("solves", 0),
+                         backend.getSolves())
+
+    def testMemoPhase(self):
+        profiler = Profiler()
+        settings = SolverSettings(SimplexBackend(), memo=ProgramMemo(),
+                                  profiler=profiler)
+        solveVoteESR(createVote("mixed"), settings)
+        solveVoteESR(createVote("mixed"), settings)
+        (first, second) = profiler.getSummaries()
+        for summary in [first, second]:
+            self.assertTrue(any(phase.endswith(";memo")
+                                for phase in summary["phases"]))
+        # The second run is answered by the memo only
+        self.assertFalse(any(phase.endswith(";lp")
+                             for phase in second["phases"]))
+        self.assertNotIn("solves", second["counters"])
+        self.assertEqual(second["counters"]["memo hits"],
+                         first["counters"]["solves"] +
+                         first["counters"].get("memo hits", 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
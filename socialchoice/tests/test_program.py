@@ -0,0 +1,86 @@
+'''
+Tests of the sparse linear programs, see vote.solver.program
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.solver.program import LinearProgram, SENSE_LE, SENSE_GE, SENSE_EQ
+from vote.solver.settings import PulpBackend, ScipyBackend
+from vote.solver.simplex import SimplexBackend
+from pulp.constants import LpStatusOptimal
+from pulp.solvers import PULP_CBC_CMD
+import unittest
+
+
+def createProgram():
+    '''
+    Returns max 3x + 1.5y + z s.t. x + y + z <= 4, x + 3y >= 2, x - z == 1,
+    x <= 2, which is solved by x = 2, y = 1, z = 1
+    '''
+    program = LinearProgram()
+    x = program.addVariable(0.0, 2.0)
+    y = program.addVariable()
+    z = program.addVariable()
+    program.addRow({x: 1, y: 1, z: 1}, SENSE_LE, 4.0)
+    program.addRow({x: 1, y: 3}, SENSE_GE, 2.0)
+    program.addRow({x: 1, z: -1}, SENSE_EQ, 1.0)
+    program.setObjective({x: 3, y: 1.5, z: 1})
+    return program
+
+
+class LinearProgramTest(unittest.TestCase):
+
+    def testInvalidSense(self):
+        program = LinearProgram()
+        column = program.addVariable()
+        self.assertRaises(ValueError, program.addRow, {column: 1}, 17, 1.0)
+        self.assertEqual(program.getRowCount(), 0)
+
+    def testCopyIsIndependent(self):
+        program = createProgram()
+        copy = program.copy()
+        self.assertEqual(copy.getFingerprint(), program.getFingerprint())
+        copy.setCoefficient(0, 1, 5.0)
+        copy.setRightHandSide(1, 3.0)
+        copy.setBounds(0, 0.0, None)
+        copy.setObjectiveCoefficient(2, 0)
+        self.assertNotEqual(copy.getFingerprint(), program.getFingerprint())
+        self.assertEqual(program.getCoefficient(0, 1), 1)
+        self.assertEqual(program.getRightHandSide(1), 2.0)
+        self.assertEqual(program.getBounds(0), (0.0, 2.0))
+        self.assertEqual(program.getObjective(), {0: 3, 1: 1.5, 2: 1})
+        self.assertEqual(copy.getObjective(), {0: 3, 1: 1.5})
+
+    def testZeroCoefficientsAreRemoved(self):
+        program = createProgram()
+        program.setCoefficient(0, 1, 0)
+        self.assertEqual(program.getRow(0), {0: 1, 2: 1})
+        copy = createProgram()
+        copy.setCoefficient(0, 1, 0)
+        self.assertEqual(copy.getFingerprint(), program.getFingerprint())
+
+    def testCoordinates(self):
+        program = createProgram()
+        (rowIndices, columnIndices, coefficients) = program.getCoordinates()
+        entries = sorted(zip(rowIndices.tolist(), columnIndices.tolist(),
+                             coefficients.tolist()))
+        self.assertEqual(entries, [(0, 0, 1.0), (0, 1, 1.0), (0, 2, 1.0),
+                                   (1, 0, 1.0), (1, 1, 3.0), (2, 0, 1.0),
+                                   (2, 2, -1.0)])
+        self.assertEqual(program.getObjectiveVector().tolist(),
+                         [3.0, 1.5, 1.0])
+
+    def testBackendsAgree(self):
+        for backend in [PulpBackend(PULP_CBC_CMD(msg=False)), ScipyBackend(),
+                        SimplexBackend()]:
+            program = createProgram()
+            self.assertEqual(backend.solve(program), LpStatusOptimal)
+            self.assertEqual(program.getStatus(), LpStatusOptimal)
+            self.assertAlmostEqual(program.getObjectiveValue(), 8.5)
+            for column, value in enumerate([2.0, 1.0, 1.0]):
+                self.assertAlmostEqual(program.getValue(column), value)
+
+
+if __name__ == '__main__':
+    unittest.main()
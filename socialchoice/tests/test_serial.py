@@ -0,0 +1,71 @@
+'''
+Tests of the probabilistic serial fast path, see vote.solver.serial
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, ASSIGNMENT_VOTES, \
+    createAssignmentVote, createSettings, getAgentObjectProbabilities
+from vote.parser import parseVoteFromDict, toAssignmentMatrixVote
+from vote.solver.serial import eatObjects, solveStrictAssignmentVote
+from vote.solver.sr import ArraySRState, walkTrajectory, solveVoteESR
+import unittest
+
+
+class EatingTest(unittest.TestCase):
+
+    def testEatObjects(self):
+        amounts = eatObjects({1: ["a", "b", "c"], 2: ["a", "c", "b"],
+                              3: ["b", "a", "c"]}, ["a", "b", "c"],
+                             createSettings())
+        expected = {1: {"a": 0.5, "b": 0.25, "c": 0.25},
+                    2: {"a": 0.5, "b": 0.0, "c": 0.5},
+                    3: {"a": 0.0, "b": 0.75, "c": 0.25}}
+        for agent, objects in expected.items():
+            for obj, value in objects.items():
+                self.assertAlmostEqual(amounts[agent][obj], value)
+
+    def testMoreObjectsThanAgents(self):
+        amounts = eatObjects({1: ["a", "b", "c"], 2: ["a", "b", "c"]},
+                             ["a", "b", "c"], createSettings())
+        self.assertAlmostEqual(amounts[1]["a"], 0.5)
+        self.assertAlmostEqual(amounts[1]["b"], 0.5)
+        self.assertAlmostEqual(amounts[2]["c"], 0.0)
+
+
+class FastPathTest(BaselineTestCase):
+
+    def testMatchesBaseline(self):
+        settings = createSettings()
+        vote = parseVoteFromDict(ASSIGNMENT_VOTES["strict"])
+        for strictVote in [createAssignmentVote("strict"),
+                           toAssignmentMatrixVote(vote)]:
+            lottery = solveStrictAssignmentVote(strictVote, settings)
+            self.assertIsNotNone(lottery)
+            self.assertMatchesAssignmentBaseline("strict", "ESR", lottery)
+
+    def testMatchesTrajectory(self):
+        settings = createSettings()
+        vote = createAssignmentVote("strict")
+        state = ArraySRState(vote, settings)
+        walkTrajectory(state)
+        self.assertProbabilitiesEqual(
+            getAgentObjectProbabilities(state.findLottery()),
+            getAgentObjectProbabilities(solveVoteESR(vote, settings)))
+
+    def testTiesAreNotSupported(self):
+        settings = createSettings()
+        vote = parseVoteFromDict(ASSIGNMENT_VOTES["ties"])
+        self.assertIsNone(solveStrictAssignmentVote(
+            createAssignmentVote("ties"), settings))
+        self.assertIsNone(solveStrictAssignmentVote(
+            toAssignmentMatrixVote(vote), settings))
+
+    def testOtherVotesAreNotSupported(self):
+        vote = parseVoteFromDict({1: ["a", "b"], 2: ["b", "a"]})
+        self.assertIsNone(solveStrictAssignmentVote(vote, createSettings()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+'''
+Tests of the in-process simplex method, see vote.solver.simplex
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote
+from tests.test_program import createProgram
+from vote.solver.batch import RULES
+from vote.solver.program import LinearProgram, SENSE_LE, SENSE_GE
+from vote.solver.settings import SolverSettings, PulpBackend
+from vote.solver.simplex import SimplexBackend
+from pulp.constants import LpStatusOptimal
+from pulp.solvers import PULP_CBC_CMD
+import pickle
+import random
+import unittest
+
+
+def createRandomProgram(rng, columnCount, rowCount):
+    '''
+    Returns a program over the unit box which is feasible at the origin
+    '''
+    program = LinearProgram()
+    for _ in range(columnCount):
+        program.addVariable(0.0, 1.0)
+    for _ in range(rowCount):
+        program.addRow({column: rng.uniform(-1, 2)
+                        for column in range(columnCount)},
+                       SENSE_LE, rng.uniform(0, 2))
+    program.setObjective({column: rng.uniform(-1, 3)
+                          for column in range(columnCount)})
+    return program
+
+
+class SimplexTest(BaselineTestCase):
+
+    def assertSameSolve(self, program, backend):
+        '''
+        Asserts that the backend solves the program like CBC does
+        '''
+        expected = program.copy()
+        status = PulpBackend(PULP_CBC_CMD(msg=False)).solve(expected)
+        self.assertEqual(backend.solve(program), status)
+        if status == LpStatusOptimal:
+            self.assertAlmostEqual(program.getObjectiveValue(),
+                                   expected.getObjectiveValue(), places=6)
+
+    def testResolveMatchesCbc(self):
+        rng = random.Random(7)
+        for _ in range(5):
+            backend = SimplexBackend(refactorInterval=3)
+            program = createRandomProgram(rng, 5, 4)
+            self.assertSameSolve(program, backend)
+            # Every later solve starts from the previous basis
+            for _ in range(3):
+                row = rng.randrange(program.getRowCount())
+                program.setRightHandSide(row, rng.uniform(0, 2))
+                self.assertSameSolve(program, backend)
+            program.addRow({0: 1, 1: 1}, SENSE_GE, 0.5)
+            self.assertSameSolve(program, backend)
+            column = program.addVariable(0.0, 1.0)
+            program.setCoefficient(0, column, 1.0)
+            program.setObjectiveCoefficient(column, 2.0)
+            self.assertSameSolve(program, backend)
+
+    def testDuals(self):
+        program = createProgram()
+        SimplexBackend().solve(program)
+        expected = createProgram()
+        PulpBackend(PULP_CBC_CMD(msg=False)).solve(expected)
+        for row in range(program.getRowCount()):
+            self.assertAlmostEqual(program.getDual(row),
+                                   expected.getDual(row))
+
+    def testPickleForgetsBases(self):
+        backend = SimplexBackend(tolerance=10 ** -8)
+        backend.solve(createProgram())
+        copy = pickle.loads(pickle.dumps(backend))
+        self.assertEqual(copy.tolerance, 10 ** -8)
+        self.assertEqual(len(copy.bases), 0)
+
+    def testRulesMatchBaseline(self):
+        settings = SolverSettings(SimplexBackend(refactorInterval=1))
+        for name in sorted(VOTES):
+            for rule in sorted(RULES):
+                self.assertMatchesBaseline(
+                    name, rule, RULES[rule](createVote(name), settings))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,239 @@
+'''
+Tests of the core objects of votes, see vote.society
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote, \
+    createAssignmentVote, createSettings
+from vote.parser import toPreferenceMatrix, parseVoteFromMatrix
+from vote.society import Agent, Assignment, Choice, ChoiceClass, \
+    ChoiceIndex, Interner, Preference, Vote, PreferenceMatrix
+from vote.solver.batch import RULES
+from vote.solver import sr, ssr
+from vote.solver.sr import ArraySRState, solveVoteSPSR
+import pickle
+import unittest
+
+
+def getPreferences(vote):
+    '''
+    Returns the preference of every agent as list of sets of objects
+    '''
+    return {agent.getIdentifier(): [frozenset(choice.getObject()
+                                              for choice in choiceClass)
+                                    for choiceClass in agent.getChoiceClasses()]
+            for agent in vote.getAgents()}
+
+
+class ChoiceIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.choices = {name: Choice(name) for name in "abcd"}
+        self.index = ChoiceIndex(self.choices.values())
+
+    def createClass(self, names, index=None):
+        return ChoiceClass([self.choices[name] for name in names], index)
+
+    def testMasks(self):
+        self.assertEqual(self.index.getFullMask(), 15)
+        self.assertEqual(self.index.getMask([self.choices["a"],
+                                             self.choices["c"]]), 5)
+        self.assertEqual(self.index.getMaskChoices(5),
+                         [self.choices["a"], self.choices["c"]])
+        self.assertRaises(ValueError, self.index.getMask, [Choice("e")])
+        choiceClass = self.index.createClass(6)
+        self.assertEqual(choiceClass, self.createClass("bc"))
+        self.assertIs(choiceClass.getIndex(), self.index)
+        self.assertEqual(choiceClass.getMask(), 6)
+
+    def testClassMasks(self):
+        choiceClass = self.createClass("bd")
+        self.assertIsNone(choiceClass.getIndex())
+        self.assertEqual(self.index.getClassMask(choiceClass), 10)
+        self.assertEqual(self.index.getClassMask(self.createClass("bd")), 10)
+        self.assertIsNone(choiceClass.getMask())
+
+    def testSubsetsAgreeWithSets(self):
+        names = ["a", "ab", "bc", "abc", "d", "abcd"]
+        for name in names:
+            for other in names:
+                expected = set(name).issubset(other)
+                self.assertEqual(
+                    self.createClass(name, self.index).isSubsetOf(
+                        self.createClass(other, self.index)), expected)
+                self.assertEqual(self.createClass(name).isSubsetOf(
+                    self.createClass(other, self.index)), expected)
+                self.assertEqual(
+                    self.createClass(name, self.index) ==
+                    self.createClass(other), name == other)
+
+
+class SharedClassTest(BaselineTestCase):
+
+    def testVotesDoNotChangeSharedClasses(self):
+        vote = createVote("duplicates")
+        index = vote.getChoiceIndex()
+        # A second vote with an additional choice, which is encoded by the
+        # lowest bit, over the very same class objects
+        extra = ChoiceClass([Choice("0")])
+        Vote([Agent(agent.getIdentifier(),
+                    Preference(list(agent.getChoiceClasses()) + [extra]))
+              for agent in vote.getAgents()])
+        for agent in vote.getAgents():
+            for choiceClass in agent.getChoiceClasses():
+                self.assertIsNone(choiceClass.getIndex())
+                self.assertEqual(index.getClassMask(choiceClass),
+                                 index.getMask(choiceClass.getChoices()))
+        self.assertMatchesBaseline("duplicates", "SPSR",
+                                   solveVoteSPSR(vote, createSettings()))
+
+    def testSubclasses(self):
+        vote = createVote("ties")
+        classes = {frozenset(choice.getObject() for choice in choiceClass):
+                   choiceClass
+                   for agent in vote.getAgents()
+                   for choiceClass in agent.getChoiceClasses()}
+        containment = vote.getClassContainment()
+        for choices, choiceClass in classes.items():
+            self.assertEqual(
+                containment[choiceClass],
+                frozenset(subclass for subchoices, subclass in classes.items()
+                          if subchoices.issubset(choices)))
+
+
+class PreferenceMatrixTest(BaselineTestCase):
+
+    def testRoundTrip(self):
+        for name in sorted(VOTES):
+            vote = createVote(name)
+            matrix = toPreferenceMatrix(vote)
+            self.assertEqual(matrix.getAgentCount(), vote.getAgentCount())
+            self.assertEqual(matrix.getChoiceCount(), vote.getChoiceCount())
+            self.assertEqual(getPreferences(matrix.toVote()),
+                             getPreferences(vote))
+
+    def testRanks(self):
+        matrix = toPreferenceMatrix(createVote("ties"))
+        self.assertEqual(matrix.getAgentIdentifiers(), (1, 2, 3, 4))
+        self.assertEqual(matrix.getChoiceObjects(), ("a", "b", "c"))
+        self.assertEqual(matrix.getRanks().tolist(),
+                         [[0, 0, 1], [1, 0, 1], [1, 2, 0], [0, 1, 0]])
+
+    def testParse(self):
+        matrix = parseVoteFromMatrix([[3, 0, 3], [1, 1, 1]], ["x", "y"],
+                                     ["a", "b", "c"])
+        self.assertEqual(getPreferences(matrix.toVote()),
+                         {"x": [frozenset("b"), frozenset("ac")],
+                          "y": [frozenset("abc")]})
+        self.assertRaises(ValueError, PreferenceMatrix, [[0, -1]])
+        self.assertRaises(ValueError, PreferenceMatrix, [0, 1])
+        self.assertRaises(ValueError, PreferenceMatrix, [[0], [1]], [1, 1])
+        self.assertRaises(ValueError, PreferenceMatrix, [[0, 1]], None,
+                          ["a", "b", "c"])
+
+    def testRulesSolveMatrices(self):
+        settings = createSettings()
+        for name in sorted(VOTES):
+            matrix = toPreferenceMatrix(createVote(name))
+            for rule in sorted(RULES):
+                self.assertMatchesBaseline(name, rule,
+                                           RULES[rule](matrix, settings))
+
+
+class AgentMultiplicityTest(BaselineTestCase):
+
+    def testGroups(self):
+        multiplicities = createVote("duplicates").getAgentMultiplicities()
+        self.assertEqual({agent.getIdentifier(): multiplicity for
+                          agent, multiplicity in multiplicities.items()},
+                         {1: 2, 3: 2, 4: 1})
+
+    def testDistinctAgents(self):
+        multiplicities = createVote("mixed").getAgentMultiplicities()
+        self.assertEqual(sorted(multiplicities.values()), [1] * 5)
+
+    def testStateKeepsRepresentatives(self):
+        state = ArraySRState(createVote("duplicates"), createSettings())
+        self.assertEqual(sorted(agent.getIdentifier()
+                                for agent in state.getAgents()), [1, 3, 4])
+        self.assertEqual(sorted(state.getAgentMultiplicity(agent)
+                                for agent in state.getAgents()), [1, 2, 2])
+
+    def testRulesMatchBaseline(self):
+        settings = createSettings()
+        for rule in sorted(RULES):
+            self.assertMatchesBaseline(
+                "duplicates", rule,
+                RULES[rule](createVote("duplicates"), settings))
+
+
+class InternerTest(BaselineTestCase):
+
+    def testSharedInstances(self):
+        interner = Interner()
+        (a, b) = (interner.getChoice("a"), interner.getChoice("b"))
+        self.assertIs(interner.getChoice("a"), a)
+        self.assertIs(interner.getClass([Choice("b"), a]),
+                      interner.getClass([b, a]))
+        # Equal choices passed to getClass are replaced by shared ones
+        self.assertIs(interner.getClass([Choice("c")]), interner.getClass(
+            [interner.getChoice("c")]))
+        self.assertEqual(len(interner), 5)
+
+    def testVotesShareClasses(self):
+        vote = createVote("duplicates")
+        agents = {agent.getIdentifier(): agent for agent in vote.getAgents()}
+        for (first, second) in zip(agents[1].getChoiceClasses(),
+                                   agents[2].getChoiceClasses()):
+            self.assertIs(first, second)
+        choices = {}
+        for agent in vote.getAgents():
+            for choiceClass in agent.getChoiceClasses():
+                for choice in choiceClass:
+                    self.assertIs(choices.setdefault(choice.getObject(),
+                                                     choice), choice)
+
+    def testSlots(self):
+        vote = createAssignmentVote("strict")
+        agent = next(iter(vote.getAgents()))
+        choiceClass = agent.getChoiceClasses()[0]
+        choice = next(iter(choiceClass))
+        for instance in [agent, choiceClass, choice, choice.getObject(),
+                         sr.Tower(choiceClass), sr.AgentData(agent),
+                         ssr.Tower(choiceClass), ssr.AgentData(agent)]:
+            self.assertFalse(hasattr(instance, "__dict__"), repr(instance))
+
+    def testPickledHashesAreRecomputed(self):
+        vote = createAssignmentVote("strict")
+        copy = pickle.loads(pickle.dumps(vote, pickle.HIGHEST_PROTOCOL))
+        for choice in copy.getChoices():
+            assignment = choice.getObject()
+            # Agents are hashed by identity, so hashes differ after
+            # unpickling and must not be carried over
+            equal = Assignment({agent: assignment.getAssignment(agent)
+                                for agent in assignment.getAgents()})
+            self.assertEqual(hash(assignment), hash(equal))
+            self.assertEqual(hash(choice), hash(Choice(equal)))
+        for agent in copy.getAgents():
+            for choiceClass in agent.getChoiceClasses():
+                self.assertEqual(hash(choiceClass),
+                                 hash(ChoiceClass(choiceClass.getChoices())))
+
+    def testPickledVotesMatchBaseline(self):
+        settings = createSettings()
+        for name in sorted(VOTES):
+            vote = pickle.loads(pickle.dumps(createVote(name),
+                                             pickle.HIGHEST_PROTOCOL))
+            for rule in sorted(RULES):
+                self.assertMatchesBaseline(name, rule,
+                                           RULES[rule](vote, settings))
+        vote = pickle.loads(pickle.dumps(createAssignmentVote("ties"),
+                                         pickle.HIGHEST_PROTOCOL))
+        self.assertMatchesAssignmentBaseline("ties", "PSR",
+                                             RULES["PSR"](vote, settings))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+'''
+Tests of the states of the SR rules, see vote.solver.sr
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote, \
+    createSettings, getClassProbabilities
+from vote.solver.profiling import Profiler
+from vote.solver.sr import SRState, ArraySRState, walkTrajectory, \
+    solveVoteSPSR
+import unittest
+
+
+def getSnapshot(state):
+    '''
+    Returns the time, the heights of all classes and the class index, height
+    and speed of every agent, indexed by identifier
+    '''
+    return (state.getTime(),
+            {tuple(sorted(choice.getObject() for choice in choiceClass)):
+             height for choiceClass, height
+             in state.getCurrentClassHeights().items()},
+            {agent.getIdentifier(): (state.getAgentClassIndex(agent),
+                                     state.getAgentHeight(agent),
+                                     state.getAgentSpeed(agent))
+             for agent in state.getAgents()})
+
+
+class ArraySRStateTest(BaselineTestCase):
+
+    def assertSnapshotsEqual(self, expected, actual):
+        (expectedTime, expectedHeights, expectedAgents) = expected
+        (time, heights, agents) = actual
+        self.assertAlmostEqual(expectedTime, time)
+        self.assertProbabilitiesEqual(expectedHeights, heights)
+        self.assertEqual(sorted(expectedAgents), sorted(agents))
+        for identifier, (classIndex, height, speed) in expectedAgents.items():
+            self.assertEqual(agents[identifier][0], classIndex)
+            self.assertAlmostEqual(agents[identifier][1], height)
+            self.assertAlmostEqual(agents[identifier][2], speed)
+
+    def walk(self, state, speeds):
+        for agent in state.getAgents():
+            state.setAgentSpeed(agent, speeds(agent))
+        snapshots = []
+        walkTrajectory(state, lambda current: snapshots.append(
+            getSnapshot(current)))
+        snapshots.append(getSnapshot(state))
+        return (snapshots, state.findLottery())
+
+    def testTrajectoriesAgree(self):
+        settings = createSettings()
+        for name in sorted(VOTES):
+            for speeds in [lambda agent: 1,
+                           lambda agent: 1 + agent.getIdentifier() / 4.0]:
+                (expected, expectedLottery) = self.walk(
+                    SRState(createVote(name), settings), speeds)
+                (actual, lottery) = self.walk(
+                    ArraySRState(createVote(name), settings), speeds)
+                self.assertEqual(len(expected), len(actual))
+                for snapshot, arraySnapshot in zip(expected, actual):
+                    self.assertSnapshotsEqual(snapshot, arraySnapshot)
+                vote = createVote(name)
+                self.assertProbabilitiesEqual(
+                    getClassProbabilities(vote, expectedLottery),
+                    getClassProbabilities(vote, lottery))
+
+    def testToSRState(self):
+        settings = createSettings()
+        state = ArraySRState(createVote("mixed"), settings)
+        snapshots = []
+        walkTrajectory(state, lambda current: snapshots.append(
+            (getSnapshot(current), getSnapshot(current.toSRState()))))
+        self.assertGreater(len(snapshots), 1)
+        for (snapshot, copySnapshot) in snapshots:
+            self.assertSnapshotsEqual(snapshot, copySnapshot)
+
+    def testLotteriesMatchBaseline(self):
+        settings = createSettings()
+        for name in sorted(VOTES):
+            state = ArraySRState(createVote(name), settings)
+            walkTrajectory(state)
+            self.assertMatchesBaseline(name, "ESR", state.findLottery())
+
+
+class SPSRTest(BaselineTestCase):
+
+    def testInitialHeights(self):
+        for name in sorted(VOTES):
+            vote = createVote(name)
+            heights = []
+            profiler = Profiler()
+            profiler.addEventListener(lambda state: heights.append(
+                state.getCurrentClassHeights()))
+            solveVoteSPSR(vote, createSettings(profiler=profiler))
+            self.assertTrue(heights[0])
+            # Every class starts at the share of agents whose first class it
+            # contains
+            for choiceClass, height in heights[0].items():
+                self.assertAlmostEqual(height, float(sum(
+                    1 for agent in vote.getAgents()
+                    if agent.getChoiceClasses()[0].getChoices().issubset(
+                        choiceClass.getChoices()))) / vote.getAgentCount())
+
+    def testLotteriesMatchBaseline(self):
+        settings = createSettings()
+        for name in sorted(VOTES):
+            self.assertMatchesBaseline(name, "SPSR",
+                                       solveVoteSPSR(createVote(name),
+                                                     settings))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+'''
+Tests of SSR, see vote.solver.ssr
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, createVote, createSettings
+from vote.solver.settings import DETECTION_MODES
+from vote.solver.ssr import solveVoteSSR, TowerLattice
+from itertools import combinations
+import unittest
+
+
+def getConnectedUnions(seeds, atoms):
+    '''
+    Returns the unions of every seed with all families of atoms connected to
+    it by overlapping sets, by enumerating all families
+    '''
+    unions = set()
+    for seed in seeds:
+        for size in range(len(atoms) + 1):
+            for family in combinations(atoms, size):
+                reached = seed
+                pending = list(family)
+                while pending:
+                    overlapping = [atom for atom in pending
+                                   if not atom.isdisjoint(reached)]
+                    if not overlapping:
+                        break
+                    for atom in overlapping:
+                        reached = reached.union(atom)
+                        pending.remove(atom)
+                if not pending:
+                    unions.add(reached)
+    return unions
+
+
+class TowerLatticeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.atoms = [frozenset(atom) for atom
+                      in ["ab", "bc", "d", "de", "f", "af"]]
+        self.lattice = TowerLattice("abcdefg")
+
+    def testUnionsOfConnectedAtoms(self):
+        added = []
+        for atom in self.atoms:
+            added.extend(self.lattice.addAtom(atom))
+            self.assertEqual(self.lattice.addAtom(atom), [])
+        self.assertEqual(len(added), len(set(added)))
+        self.assertEqual(set(added),
+                         getConnectedUnions(self.atoms, self.atoms))
+        self.assertTrue(self.lattice.isAtom(frozenset("de")))
+        self.assertFalse(self.lattice.isAtom(frozenset("abc")))
+
+    def testBrokenSetsAreExtendedBySingleChoices(self):
+        added = set()
+        for atom in self.atoms:
+            added.update(self.lattice.addAtom(atom))
+        broken = frozenset("abc")
+        added.update(self.lattice.breakSet(broken))
+        self.assertTrue(self.lattice.isBroken(broken))
+        self.assertEqual(self.lattice.breakSet(broken), [])
+        extensions = [broken.union(choice) for choice in "defg"]
+        self.assertEqual(added,
+                         getConnectedUnions(self.atoms, self.atoms) |
+                         getConnectedUnions(extensions, self.atoms))
+
+
+class FreezeDetectionTest(BaselineTestCase):
+
+    def testSSRMatchesBaselineInAllModes(self):
+        for mode in DETECTION_MODES:
+            settings = createSettings(detectionMode=mode)
+            for name in sorted(VOTES):
+                self.assertMatchesBaseline(
+                    name, "SSR", solveVoteSSR(createVote(name), settings))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+'''
+Tests of the helpers of the solvers, see vote.solver.util
+
+Created on 17 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from tests.baseline import BaselineTestCase, VOTES, ASSIGNMENT_VOTES, \
+    createVote, createAssignmentVote, createSettings
+from vote.society import ChoiceClass
+from vote.solver.batch import RULES
+from vote.solver.profiling import Profiler
+from vote.solver.settings import LOTTERY_MODES, LOTTERY_REUSE, \
+    LOTTERY_SPARSE, LOTTERY_SOLVE
+from vote.solver.util import getConnectedUnionWeights, findLottery
+from itertools import combinations
+import random
+import unittest
+
+
+def isConnected(family):
+    reached = family[0]
+    pending = list(family[1:])
+    while pending:
+        overlapping = [mask for mask in pending if mask & reached]
+        if not overlapping:
+            return False
+        for mask in overlapping:
+            reached |= mask
+            pending.remove(mask)
+    return True
+
+
+class ConnectedUnionWeightsTest(unittest.TestCase):
+
+    def testMatchesEnumeration(self):
+        rng = random.Random(13)
+        for _ in range(30):
+            weights = {rng.randrange(1, 1 << 6): rng.choice([0.0, 0.25, 1.0])
+                       for _ in range(rng.randint(1, 7))}
+            masks = [mask for mask, weight in weights.items() if weight]
+            expected = dict()
+            for size in range(1, len(masks) + 1):
+                for family in combinations(masks, size):
+                    if isConnected(family):
+                        union = reduce(lambda left, right: left | right,
+                                       family)
+                        expected[union] = sum(
+                            weight for mask, weight in weights.items()
+                            if mask | union == union)
+            actual = getConnectedUnionWeights(weights)
+            self.assertEqual(sorted(actual), sorted(expected))
+            for union, weight in expected.items():
+                self.assertAlmostEqual(actual[union], weight)
+
+    def testDisjointSets(self):
+        self.assertEqual(getConnectedUnionWeights({0b01: 1.0, 0b10: 2.0,
+                                                   0b100: 0.0}),
+                         {0b01: 1.0, 0b10: 2.0})
+        self.assertEqual(getConnectedUnionWeights({0b011: 1.0, 0b110: 2.0,
+                                                   0b010: 0.5}),
+                         {0b011: 1.5, 0b110: 2.5, 0b010: 0.5, 0b111: 3.5})
+
+
+class LotteryModeTest(BaselineTestCase):
+
+    def testModesMatchBaseline(self):
+        for mode in LOTTERY_MODES:
+            settings = createSettings(lotteryMode=mode)
+            for name in sorted(VOTES):
+                for rule in sorted(RULES):
+                    self.assertMatchesBaseline(
+                        name, rule, RULES[rule](createVote(name), settings))
+            for name in sorted(ASSIGNMENT_VOTES):
+                for rule in ["ESR", "PSR"]:
+                    self.assertMatchesAssignmentBaseline(
+                        name, rule,
+                        RULES[rule](createAssignmentVote(name), settings))
+
+    def testSparseSupport(self):
+        for name in sorted(VOTES):
+            for rule in sorted(RULES):
+                supports = dict()
+                for mode in LOTTERY_MODES:
+                    lottery = RULES[rule](createVote(name),
+                                          createSettings(lotteryMode=mode))
+                    supports[mode] = sum(1 for _, value
+                                         in lottery.getDistribution()
+                                         if value > 10 ** -9)
+                self.assertLessEqual(supports[LOTTERY_SPARSE],
+                                     supports[LOTTERY_REUSE])
+
+    def testReuseSavesLotterySolves(self):
+        lotterySolves = dict()
+        for mode in [LOTTERY_REUSE, LOTTERY_SOLVE]:
+            profiler = Profiler()
+            settings = createSettings(lotteryMode=mode, profiler=profiler)
+            for name in sorted(VOTES):
+                RULES["PSR"](createVote(name), settings)
+            lotterySolves[mode] = profiler.getCounters().get("lottery solves",
+                                                             0)
+        self.assertEqual(lotterySolves[LOTTERY_SOLVE], len(VOTES))
+        self.assertLess(lotterySolves[LOTTERY_REUSE], len(VOTES))
+
+    def testUnsatisfiableHeights(self):
+        vote = createVote("cycle")
+        choices = {choice.getObject(): choice for choice in vote.getChoices()}
+        classHeights = {ChoiceClass([choices["a"]]): 0.6,
+                        ChoiceClass([choices["b"]]): 0.6}
+        for mode in LOTTERY_MODES:
+            settings = createSettings(lotteryMode=mode)
+            self.assertRaises(ValueError, findLottery, vote, classHeights,
+                              settings)
+            # Solutions violating the heights are not reused
+            self.assertRaises(ValueError, findLottery, vote, classHeights,
+                              settings, {choices["a"]: 0.5,
+                                         choices["b"]: 0.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,15 +4,19 @@ Created on 8 Sep 2015
 @author: Tobias Meggendorfer
 '''
 from vote.society import Choice, ChoiceClass, Agent, Preference, Vote,\
-    Assignment
+    Assignment, PreferenceMatrix, toVote, AssignmentVote, Interner
 from itertools import permutations
+import numpy
 
 
 def toAssignmentVote(vote):
+    vote = toVote(vote)
     objects = set(map(lambda choice: choice.getObject(),
                       vote.getChoices()))
     agents = list(vote.getAgents())
 
+    # Every assignment occurs in the preference of every agent
+    interner = Interner()
     assigmentAgents = []
     for i in range(len(agents)):
         agent = agents[i]
@@ -24,16 +28,41 @@ def toAssignmentVote(vote):
             for permutation in permutations(objects):
                 if permutation[i] not in objectsInClass:
                     continue
-                assigment = Choice(Assignment({agents[j]: permutation[j]
-                                               for j in range(len(agents))}))
+                assigment = interner.getChoice(Assignment(
+                    {agents[j]: permutation[j] for j in range(len(agents))}))
                 assignmentClass.append(assigment)
-            assignmentClasses.append(ChoiceClass(assignmentClass))
+            assignmentClasses.append(interner.getClass(assignmentClass))
         assigmentAgents.append(Agent(agent.getIdentifier(),
                                      Preference(assignmentClasses),
                                      agent.getName()))
     return Vote(assigmentAgents)
 
 
+def toAssignmentMatrixVote(vote):
+    '''
+    Converts the given vote into an assignment vote over the cells of the
+    fractional assignment matrix, see AssignmentVote. The size of the result
+    is polynomial in the number of agents.
+
+    :type vote: Vote|PreferenceMatrix
+    :rtype: AssignmentVote
+    '''
+    vote = toVote(vote)
+    objects = [choice.getObject() for choice in vote.getChoices()]
+
+    cellAgents = []
+    for agent in vote.getAgents():
+        cellClasses = []
+        for choiceClass in agent.getChoiceClasses():
+            cellClasses.append(ChoiceClass(
+                [Choice((agent.getIdentifier(), choice.getObject()),
+                        agent.getName() + ":" + choice.getName())
+                 for choice in choiceClass]))
+        cellAgents.append(Agent(agent.getIdentifier(),
+                                Preference(cellClasses), agent.getName()))
+    return AssignmentVote(cellAgents, vote.getAgents(), objects)
+
+
 def parseVoteFromDict(choiceDict,
                       addMissingChoices=True,
                       removeDuplicateChoices=True):
@@ -80,11 +109,12 @@ def parseVoteFromDict(choiceDict,
 
     agents = set()
 
+    interner = Interner()
     for agent, choiceClasses in saneChoiceDict.items():
         parsedChoiceClasses = []
         for choiceClass in choiceClasses:
-            choiceClass = ChoiceClass(
-                [Choice(choice) for choice in choiceClass])
+            choiceClass = interner.getClass(
+                [interner.getChoice(choice) for choice in choiceClass])
             parsedChoiceClasses.append(choiceClass)
         preference = Preference(parsedChoiceClasses)
         agent = Agent(agent, preference)
@@ -92,3 +122,40 @@ def parseVoteFromDict(choiceDict,
 
     vote = Vote(agents)
     return vote
+
+
+def toPreferenceMatrix(vote):
+    '''
+    Converts the given vote into its compact matrix form. Agents are ordered
+    by name, choices by their natural order.
+
+    :type vote: Vote|PreferenceMatrix
+    :rtype: PreferenceMatrix
+    '''
+    if isinstance(vote, PreferenceMatrix):
+        return vote
+    choices = sorted(vote.getChoices())
+    columns = {choice: column for column, choice in enumerate(choices)}
+    agents = sorted(vote.getAgents(), key=lambda agent: agent.getName())
+    ranks = numpy.zeros((len(agents), len(choices)), dtype=numpy.int16)
+    for row, agent in enumerate(agents):
+        for rank, choiceClass in enumerate(agent.getChoiceClasses()):
+            for choice in choiceClass:
+                ranks[row, columns[choice]] = rank
+    return PreferenceMatrix(ranks,
+                            [agent.getIdentifier() for agent in agents],
+                            [choice.getObject() for choice in choices])
+
+
+def parseVoteFromMatrix(ranks, agentIdentifiers=None, choiceObjects=None):
+    '''
+    Parses a vote from a matrix of the form ranks[agent][choice], where rank
+    0 denotes the most preferred choices and ties share their rank
+
+    :type ranks: numpy.ndarray|list(list(int))
+    :type agentIdentifiers: list(collections.Hashable)
+    :type choiceObjects: list(collections.Hashable)
+    :rtype: PreferenceMatrix
+    '''
+    return PreferenceMatrix(numpy.asarray(ranks), agentIdentifiers,
+                            choiceObjects)
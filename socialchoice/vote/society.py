@@ -7,14 +7,17 @@ Created on 8 Sep 2015
 '''
 import collections
 import math
+import numpy
 from functools import total_ordering
+from itertools import chain
 
 
 @total_ordering
 class Choice(object):
     '''
-    Wrapper class for choice objects
+    Immutable wrapper class for choice objects
     '''
+    __slots__ = ("choiceObject", "name", "hash")
 
     def __init__(self, choiceObject, name=None):
         '''
@@ -29,6 +32,7 @@ class Choice(object):
             self.name = str(name)
         else:
             self.name = str(choiceObject)
+        self.hash = hash(choiceObject)
 
     def getObject(self):
         '''
@@ -56,25 +60,39 @@ class Choice(object):
         return self.getObject() < o.getObject()
 
     def __hash__(self):
-        return hash(self.getObject())
+        return self.hash
+
+    def __getstate__(self):
+        # Cached hashes may depend on identities of the pickling process
+        return (self.choiceObject, self.name)
+
+    def __setstate__(self, state):
+        (self.choiceObject, self.name) = state
+        self.hash = hash(self.choiceObject)
 
 
 @total_ordering
 class ChoiceClass(object):
     '''
-    Class containing multiple choices
+    Immutable class containing multiple choices, optionally encoded by a
+    choice index. Classes are shared between votes, see Interner, so the
+    encoding of a vote is kept by its index instead, see
+    ChoiceIndex.getClassMask.
     '''
+    __slots__ = ("choices", "hash", "index", "mask")
 
-    def __init__(self, choices):
+    def __init__(self, choices, index=None):
         '''
         Constructor
 
         :param choices: A set of all choices in this class
+        :param index: Optional choice index to encode this class with
 
         :type choices: Choice|list(Choice)
+        :type index: ChoiceIndex
         '''
         if isinstance(choices, Choice):
-            self.choices = frozenset(choices)
+            self.choices = frozenset([choices])
         elif isinstance(choices, collections.Iterable):
             for choice in choices:
                 if not isinstance(choice, Choice):
@@ -82,7 +100,10 @@ class ChoiceClass(object):
                                     " is not a Choice")
             self.choices = frozenset(choices)
         else:
-            raise TypeError("Can't handle " + repr(choice))
+            raise TypeError("Can't handle " + repr(choices))
+        self.hash = hash(self.choices)
+        self.index = index
+        self.mask = None if index is None else index.getMask(self.choices)
 
     def getChoices(self):
         '''
@@ -92,6 +113,15 @@ class ChoiceClass(object):
         '''
         return self.choices
 
+    def getIndex(self):
+        return self.index
+
+    def getMask(self):
+        return self.mask
+
+    def _sharesIndex(self, other):
+        return self.index is not None and self.index is other.index
+
     def __str__(self):
         return "(" + ",".join(map(str, sorted(self.getChoices()))) + ")"
 
@@ -119,13 +149,25 @@ class ChoiceClass(object):
         return False
 
     def __hash__(self):
-        return hash(self.choices)
+        return self.hash
+
+    def __getstate__(self):
+        return (self.choices, self.index, self.mask)
+
+    def __setstate__(self, state):
+        (self.choices, self.index, self.mask) = state
+        self.hash = hash(self.choices)
 
     def __eq__(self, other):
         if isinstance(other, ChoiceClass):
+            if self._sharesIndex(other):
+                return self.mask == other.mask
             return self.getChoices() == other.getChoices()
         return False
 
+    def __ne__(self, other):
+        return not self == other
+
     def __contains__(self, item):
         return item in self.getChoices()
 
@@ -138,6 +180,8 @@ class ChoiceClass(object):
         :rtype: bool
         '''
         if isinstance(other, ChoiceClass):
+            if self._sharesIndex(other):
+                return self.mask | other.mask == other.mask
             return self.getChoices().issubset(other.getChoices())
         elif isinstance(other, collections.Set):
             return self.getChoices().issubset(other)
@@ -149,6 +193,86 @@ class ChoiceClass(object):
         raise ValueError("Can't handle " + repr(other))
 
 
+class ChoiceIndex(object):
+    '''
+    Assigns a bit to every choice of a vote, so that choice classes can be
+    encoded as integer bitmasks. Subset tests and equality of classes
+    encoded by the same index are single integer operations.
+    '''
+
+    def __init__(self, choices):
+        '''
+        Constructor
+
+        :type choices: collections.Iterable(Choice)
+        '''
+        self.choices = tuple(sorted(choices))
+        self.bits = {choice: 1 << position
+                     for position, choice in enumerate(self.choices)}
+        self.fullMask = (1 << len(self.choices)) - 1
+        self.classMasks = dict()
+
+    def getChoices(self):
+        return self.choices
+
+    def getFullMask(self):
+        return self.fullMask
+
+    def getMask(self, choices):
+        '''
+        Returns the bitmask of the given choices
+
+        :type choices: collections.Iterable(Choice)
+        :rtype: int
+        '''
+        mask = 0
+        for choice in choices:
+            bit = self.bits.get(choice, None)
+            if bit is None:
+                raise ValueError(repr(choice) + " is not indexed")
+            mask |= bit
+        return mask
+
+    def getClassMask(self, choiceClass):
+        '''
+        Returns the bitmask of the given class. Masks of classes not created
+        by this index are computed once and cached.
+
+        :type choiceClass: ChoiceClass
+        :rtype: int
+        '''
+        if choiceClass.getIndex() is self:
+            return choiceClass.getMask()
+        mask = self.classMasks.get(choiceClass, None)
+        if mask is None:
+            mask = self.getMask(choiceClass.getChoices())
+            self.classMasks[choiceClass] = mask
+        return mask
+
+    def getMaskChoices(self, mask):
+        '''
+        Returns the choices encoded by the given bitmask
+
+        :type mask: int
+        :rtype: list(Choice)
+        '''
+        return [choice for choice in self.choices if self.bits[choice] & mask]
+
+    def createClass(self, choices):
+        '''
+        Returns a choice class of the given choices encoded by this index
+
+        :type choices: collections.Iterable(Choice)|int
+        :rtype: ChoiceClass
+        '''
+        if isinstance(choices, (int, long)):
+            choices = self.getMaskChoices(choices)
+        return ChoiceClass(choices, self)
+
+    def __len__(self):
+        return len(self.choices)
+
+
 class Preference(object):
     '''
     This class wraps preferences
@@ -199,6 +323,7 @@ class Agent(object):
     '''
     This class represents an agent of a social choice or assignment problem
     '''
+    __slots__ = ("identifier", "preference", "name")
 
     def __init__(self, identifier, preference, name=None):
         if not isinstance(preference, Preference):
@@ -244,6 +369,51 @@ class Agent(object):
         return False
 
 
+class Interner(object):
+    '''
+    Table returning a single shared instance for all equal choices and for
+    all equal choice classes, so that a vote holds each of them only once
+    '''
+    __slots__ = ("choices", "classes")
+
+    def __init__(self):
+        self.choices = dict()
+        self.classes = dict()
+
+    def getChoice(self, choiceObject, name=None):
+        '''
+        Returns the shared choice of the given object. The name is only used
+        when the choice is created.
+
+        :type choiceObject: collections.Hashable
+        :rtype: Choice
+        '''
+        choice = self.choices.get(choiceObject, None)
+        if choice is None:
+            choice = Choice(choiceObject, name)
+            self.choices[choiceObject] = choice
+        return choice
+
+    def getClass(self, choices):
+        '''
+        Returns the shared class of the given choices, which are interned
+        as well
+
+        :type choices: collections.Iterable(Choice)
+        :rtype: ChoiceClass
+        '''
+        choices = frozenset(self.choices.setdefault(choice.getObject(), choice)
+                            for choice in choices)
+        choiceClass = self.classes.get(choices, None)
+        if choiceClass is None:
+            choiceClass = ChoiceClass(choices)
+            self.classes[choices] = choiceClass
+        return choiceClass
+
+    def __len__(self):
+        return len(self.choices) + len(self.classes)
+
+
 class Vote(object):
     '''
     This class gathers all information needed for a vote, i.e. the set of all choices and all agents with their preferences
@@ -267,6 +437,12 @@ class Vote(object):
                                          + repr(choice) + " is missing)")
         self.choices = choices
         self.agents = frozenset(agents)
+        self.choiceIndex = ChoiceIndex(choices)
+        for agent in self.agents:
+            for choiceClass in agent.getChoiceClasses():
+                self.choiceIndex.getClassMask(choiceClass)
+        self.classContainment = None
+        self.agentMultiplicities = None
 
     def getAgents(self):
         return self.agents
@@ -274,6 +450,96 @@ class Vote(object):
     def getChoices(self):
         return self.choices
 
+    def getAgentMultiplicities(self):
+        '''
+        Groups agents with identical preferences. Returns a dict of the form
+        {agent: multiplicity} containing one agent of every group together
+        with the size of its group. The grouping is computed once and cached.
+
+        :rtype: dict(Agent, int)
+        '''
+        if self.agentMultiplicities is None:
+            representatives = dict()
+            multiplicities = dict()
+            for agent in sorted(self.getAgents(), key=lambda agent: agent.getName()):
+                representative = representatives.setdefault(
+                    agent.getChoiceClasses(), agent)
+                multiplicities[representative] = \
+                    multiplicities.get(representative, 0) + 1
+            self.agentMultiplicities = multiplicities
+        return self.agentMultiplicities
+
+    def getChoiceIndex(self):
+        '''
+        Returns the index encoding all choice classes of this vote as bitmasks
+
+        :rtype: ChoiceIndex
+        '''
+        return self.choiceIndex
+
+    def getClassContainment(self):
+        '''
+        Returns the containment relation of all classes occurring in the
+        agents' preferences as a dict of the form {class: subclasses}. Every
+        class is contained in its own subclasses. The relation is computed
+        once and cached.
+
+        :rtype: dict(ChoiceClass, frozenset(ChoiceClass))
+        '''
+        if self.classContainment is None:
+            classes = set()
+            for agent in self.getAgents():
+                classes.update(agent.getChoiceClasses())
+            classes = list(classes)
+            self.classContainment = {
+                choiceClass: frozenset(subclass for subclass in classes
+                                       if self.isSubclass(subclass, choiceClass))
+                for choiceClass in classes}
+        return self.classContainment
+
+    def isSubclass(self, subclass, choiceClass):
+        '''
+        Determines whether the event of subclass implies the one of choiceClass
+
+        :type subclass: ChoiceClass
+        :type choiceClass: ChoiceClass
+        :rtype: bool
+        '''
+        mask = self.choiceIndex.getClassMask(choiceClass)
+        return self.choiceIndex.getClassMask(subclass) | mask == mask
+
+    def getSubclasses(self, choiceClass):
+        '''
+        Returns all preference classes contained in the given class
+
+        :type choiceClass: ChoiceClass
+        :rtype: frozenset(ChoiceClass)
+        '''
+        subclasses = self.getClassContainment().get(choiceClass, None)
+        if subclasses is None:
+            subclasses = frozenset(
+                subclass for subclass in self.getClassContainment().keys()
+                if self.isSubclass(subclass, choiceClass))
+        return subclasses
+
+    def getDistributions(self):
+        '''
+        Returns the choices of every distribution constraint, i.e. the sets of
+        choices whose probabilities sum up to at most 1
+
+        :rtype: list(frozenset(Choice))
+        '''
+        return [self.getChoices()]
+
+    def createLottery(self, choiceValues, solverSettings):
+        '''
+        Returns the lottery of the given probabilities
+
+        :type choiceValues: dict(object, float)
+        :type solverSettings: vote.solver.settings.SolverSettings
+        '''
+        return Lottery(choiceValues, solverSettings)
+
     def getAgentCount(self):
         return len(self.getAgents())
 
@@ -288,6 +554,117 @@ class Vote(object):
                          for agent in sorted(self.getAgents(), key=lambda x: x.getName())])
 
 
+class PreferenceMatrix(object):
+    '''
+    Compact, array-backed form of a vote. Preferences are stored as an
+    agents x choices matrix of ranks, where rank 0 is the most preferred
+    class of an agent and tied choices share their rank. Ranks of an agent
+    need not be consecutive.
+    '''
+
+    def __init__(self, ranks, agentIdentifiers=None, choiceObjects=None):
+        '''
+        Constructor
+
+        :param ranks: The rank matrix of shape (agents, choices)
+        :param agentIdentifiers: The identifiers of all agents, by row
+        :param choiceObjects: The objects of all choices, by column
+
+        :type ranks: numpy.ndarray
+        :type agentIdentifiers: list(collections.Hashable)
+        :type choiceObjects: list(collections.Hashable)
+        '''
+        ranks = numpy.asarray(ranks)
+        if ranks.ndim != 2:
+            raise ValueError("Rank matrix must be two-dimensional")
+        if ranks.size and ranks.min() < 0:
+            raise ValueError("Ranks must be nonnegative")
+        (agentCount, choiceCount) = ranks.shape
+        if agentIdentifiers is None:
+            agentIdentifiers = range(1, agentCount + 1)
+        if choiceObjects is None:
+            choiceObjects = range(choiceCount)
+        agentIdentifiers = tuple(agentIdentifiers)
+        choiceObjects = tuple(choiceObjects)
+        if len(agentIdentifiers) != agentCount:
+            raise ValueError("Expected " + str(agentCount) + " agents, " +
+                             str(len(agentIdentifiers)) + " given")
+        if len(choiceObjects) != choiceCount:
+            raise ValueError("Expected " + str(choiceCount) + " choices, " +
+                             str(len(choiceObjects)) + " given")
+        if len(set(agentIdentifiers)) != agentCount:
+            raise ValueError("Duplicate agent identifiers")
+        if len(set(choiceObjects)) != choiceCount:
+            raise ValueError("Duplicate choices")
+        self.ranks = ranks.astype(numpy.int16)
+        if not numpy.array_equal(self.ranks, ranks):
+            raise ValueError("Ranks exceed " + str(numpy.iinfo(numpy.int16).max))
+        self.ranks.setflags(write=False)
+        self.agentIdentifiers = agentIdentifiers
+        self.choiceObjects = choiceObjects
+
+    def getRanks(self):
+        '''
+        Returns the (read-only) rank matrix
+
+        :rtype: numpy.ndarray
+        '''
+        return self.ranks
+
+    def getAgentIdentifiers(self):
+        return self.agentIdentifiers
+
+    def getChoiceObjects(self):
+        return self.choiceObjects
+
+    def getAgentCount(self):
+        return self.ranks.shape[0]
+
+    def getChoiceCount(self):
+        return self.ranks.shape[1]
+
+    def toVote(self):
+        '''
+        Converts this matrix into the object model. Agents with identical
+        rows share their preference object.
+
+        :rtype: Vote
+        '''
+        interner = Interner()
+        choices = [interner.getChoice(choiceObject)
+                   for choiceObject in self.choiceObjects]
+        (rows, inverse) = numpy.unique(self.ranks, axis=0, return_inverse=True)
+        classIndices = inverse.reshape(-1)
+        preferences = []
+        for row in rows:
+            preferences.append(Preference([
+                interner.getClass([choices[column] for column
+                                   in numpy.flatnonzero(row == rank)])
+                for rank in numpy.unique(row)]))
+        return Vote([Agent(identifier, preferences[classIndices[position]])
+                     for position, identifier
+                     in enumerate(self.agentIdentifiers)])
+
+    def __str__(self):
+        return "PreferenceMatrix[" + str(self.getAgentCount()) + " agents, " + \
+            str(self.getChoiceCount()) + " choices]"
+
+
+def toVote(vote):
+    '''
+    Returns the object model of the given vote, converting preference
+    matrices if necessary
+
+    :type vote: Vote|PreferenceMatrix
+    :rtype: Vote
+    '''
+    if isinstance(vote, Vote):
+        return vote
+    if isinstance(vote, PreferenceMatrix):
+        return vote.toVote()
+    raise TypeError(repr(vote) + " is not a vote")
+
+
 class Lottery(object):
     '''
     This class represents a probability distribution
@@ -321,11 +698,16 @@ class Lottery(object):
 
 
 class Assignment(object):
+    '''
+    Immutable assignment of objects to agents
+    '''
+    __slots__ = ("assignment", "hash")
 
     def __init__(self, assignment):
         for agent in assignment.keys():
             assert isinstance(agent, Agent)
-        self.assignment = assignment
+        self.assignment = dict(assignment)
+        self.hash = hash(frozenset(self.assignment.items()))
 
     def __eq__(self, other):
         if isinstance(other, Assignment):
@@ -333,7 +715,15 @@ class Assignment(object):
         return False
 
     def __hash__(self):
-        return hash(frozenset(self.assignment.items()))
+        return self.hash
+
+    def __getstate__(self):
+        # Agents are hashed by identity, which differs after unpickling
+        return (self.assignment,)
+
+    def __setstate__(self, state):
+        (self.assignment,) = state
+        self.hash = hash(frozenset(self.assignment.items()))
 
     def __len__(self):
         return len(self.assignment)
@@ -368,10 +758,95 @@ class Assignment(object):
         return self.assignment.items()
 
 
+class AssignmentVote(Vote):
+    '''
+    Assignment vote in matrix form. Its choices are the cells (agent, object)
+    of a fractional assignment matrix, every class of an agent consists of
+    the cells of this agent with the objects of the class. By the
+    Birkhoff-von Neumann theorem, every doubly substochastic matrix is
+    dominated by a lottery over assignments, thus the distributions are the
+    rows and columns of the matrix and no assignment is ever listed.
+    '''
+
+    def __init__(self, agents, assignedAgents, objects, name=None):
+        '''
+        Constructor
+
+        :param agents: The agents with preferences over cells
+        :param assignedAgents: The agents of the original vote
+        :param objects: All objects to be assigned
+
+        :type agents: list(Agent)
+        :type assignedAgents: collections.Iterable(Agent)
+        :type objects: collections.Iterable(collections.Hashable)
+        '''
+        Vote.__init__(self, agents, name)
+        self.assignedAgents = {agent.getIdentifier(): agent
+                               for agent in assignedAgents}
+        self.objects = frozenset(objects)
+        if len(self.objects) < len(self.assignedAgents):
+            raise ValueError("Fewer objects than agents")
+        rows = collections.defaultdict(set)
+        columns = collections.defaultdict(set)
+        for cell in self.getChoices():
+            (identifier, obj) = cell.getObject()
+            if identifier not in self.assignedAgents or obj not in self.objects:
+                raise ValueError(repr(cell) + " is no cell of this vote")
+            rows[identifier].add(cell)
+            columns[obj].add(cell)
+        self.distributions = [frozenset(cells) for cells
+                              in chain(rows.values(), columns.values())]
+
+    def getObjects(self):
+        return self.objects
+
+    def getAssignedAgents(self):
+        return self.assignedAgents.values()
+
+    def _getCellClass(self, choiceClass):
+        identifiers = set()
+        objects = set()
+        for cell in choiceClass:
+            (identifier, obj) = cell.getObject()
+            identifiers.add(identifier)
+            objects.add(obj)
+        if len(identifiers) != 1:
+            raise ValueError(repr(choiceClass) + " spans several agents")
+        return (identifiers.pop(), objects)
+
+    def isSubclass(self, subclass, choiceClass):
+        (identifier, objects) = self._getCellClass(subclass)
+        (otherIdentifier, otherObjects) = self._getCellClass(choiceClass)
+        if identifier == otherIdentifier:
+            return objects.issubset(otherObjects)
+        # The other agent may receive any object except the one assigned to
+        # the first agent
+        missing = self.objects.difference(otherObjects)
+        return not missing or (len(missing) == 1 and objects == missing)
+
+    def getDistributions(self):
+        return self.distributions
+
+    def createLottery(self, choiceValues, solverSettings):
+        '''
+        Returns the assignment lottery of the given cell probabilities
+
+        :type choiceValues: dict(tuple(collections.Hashable, collections.Hashable), float)
+        :rtype: AssignmentLottery
+        '''
+        distributions = {agent: dict() for agent in self.getAssignedAgents()}
+        for (identifier, obj), value in choiceValues.items():
+            distributions[self.assignedAgents[identifier]][obj] = value
+        return AssignmentLottery(distributions, solverSettings)
+
+
 class AssignmentLottery(object):
 
     def __init__(self, assignments, solverSettings):
-        if isinstance(assignments, Lottery):
+        if isinstance(assignments, dict):
+            self.lotteries = {agent: Lottery(distribution, solverSettings)
+                              for agent, distribution in assignments.items()}
+        elif isinstance(assignments, Lottery):
             agentLotteries = dict()
             objects = set()
             agents = set()
@@ -392,6 +867,9 @@ class AssignmentLottery(object):
         else:
             raise TypeError("Can't process " + repr(assignments))
 
+    def getAgents(self):
+        return self.lotteries.keys()
+
     def getProbability(self, agent, obj):
         return self.lotteries[agent][obj]
 
@@ -0,0 +1,298 @@
+'''
+This module solves many independent votes on a pool of worker processes.
+Every worker imports the solvers and creates its solver settings once and
+then handles chunks of votes until the batch is done.
+
+Usage: python -m vote.solver.batch [options] votes.json
+
+The file contains one vote per line, either as dict of the form accepted by
+vote.parser.parseVoteFromDict or as {"name": <name>, "vote": <dict>}. The
+results are written as one JSON object per line.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.parser import parseVoteFromDict
+from vote.society import toVote, Lottery, AssignmentLottery
+from vote.solver.settings import SolverSettings
+from vote.solver.sr import solveVoteESR, solveVotePSR, solveVoteSPSR
+from vote.solver.ssr import solveVoteSSR
+from vote.solver.simplex import SimplexBackend
+from pulp.solvers import PULP_CBC_CMD
+import argparse
+import json
+import multiprocessing
+import signal
+import sys
+import time
+
+RULES = {
+    "ESR": solveVoteESR,
+    "PSR": solveVotePSR,
+    "SPSR": solveVoteSPSR,
+    "SSR": solveVoteSSR,
+}
+
+
+def createDefaultSettings():
+    '''
+    Returns the settings used by workers if no factory is given
+
+    :rtype: vote.solver.settings.SolverSettings
+    '''
+    return SolverSettings(solver=PULP_CBC_CMD(msg=False))
+
+
+def createSimplexSettings():
+    '''
+    Returns settings solving all programs in process, which allows timeouts
+
+    :rtype: vote.solver.settings.SolverSettings
+    '''
+    return SolverSettings(SimplexBackend())
+
+
+SETTINGS = {
+    "cbc": createDefaultSettings,
+    "simplex": createSimplexSettings,
+}
+
+
+class BatchTimeout(Exception):
+    pass
+
+
+class BatchResult(object):
+    '''
+    Result of solving one vote with one rule. Exactly one of lottery and
+    error is set.
+    '''
+
+    def __init__(self, index, name, rule, lottery=None, error=None, seconds=0.0):
+        self.index = index
+        self.name = name
+        self.rule = rule
+        self.lottery = lottery
+        self.error = error
+        self.seconds = seconds
+
+    def getIndex(self):
+        '''
+        Returns the position of the vote in the batch
+        '''
+        return self.index
+
+    def getName(self):
+        return self.name
+
+    def getRule(self):
+        return self.rule
+
+    def getLottery(self):
+        '''
+        @rtype: vote.society.Lottery|vote.society.AssignmentLottery
+        '''
+        return self.lottery
+
+    def getError(self):
+        return self.error
+
+    def isSuccessful(self):
+        return self.error is None
+
+    def getSeconds(self):
+        return self.seconds
+
+    def toDict(self):
+        '''
+        Returns a JSON serialisable representation of this result
+        '''
+        result = {"index": self.index, "name": self.name, "rule": self.rule,
+                  "seconds": self.seconds}
+        if self.error is not None:
+            result["error"] = self.error
+        elif isinstance(self.lottery, AssignmentLottery):
+            result["lottery"] = {
+                agent.getName(): {str(obj): value for obj, value
+                                  in self.lottery.getAgentDistribution(agent)}
+                for agent in self.lottery.getAgents()}
+        elif isinstance(self.lottery, Lottery):
+            result["lottery"] = {str(obj): value for obj, value
+                                 in self.lottery.getDistribution()}
+        return result
+
+    def __str__(self):
+        if self.error is not None:
+            return str(self.name) + "/" + self.rule + ": " + self.error
+        return str(self.name) + "/" + self.rule + ":\n" + str(self.lottery)
+
+
+_workerSettings = None
+
+
+def _initialiseWorker(settingsFactory):
+    global _workerSettings
+    # Interrupts are handled by the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _workerSettings = settingsFactory()
+
+
+def _raiseTimeout(signum, frame):
+    raise BatchTimeout()
+
+
+def _solveTask(task):
+    (index, name, vote, rule, timeout) = task
+    start = time.time()
+    if timeout is not None:
+        signal.signal(signal.SIGALRM, _raiseTimeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if isinstance(vote, dict):
+            vote = parseVoteFromDict(vote)
+        lottery = RULES[rule](toVote(vote), _workerSettings)
+        return BatchResult(index, name, rule, lottery=lottery,
+                           seconds=time.time() - start)
+    except BatchTimeout:
+        return BatchResult(index, name, rule,
+                           error="Timeout after " + str(timeout) + "s",
+                           seconds=time.time() - start)
+    except Exception as e:
+        return BatchResult(index, name, rule, error=repr(e),
+                           seconds=time.time() - start)
+    finally:
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _createTasks(votes, rules, timeout):
+    for index, vote in enumerate(votes):
+        name = index
+        if isinstance(vote, tuple):
+            (name, vote) = vote
+        for rule in rules:
+            yield (index, name, vote, rule, timeout)
+
+
+def solveBatch(votes, rules=("ESR",), processes=None, chunkSize=1,
+               timeout=None, ordered=True,
+               settingsFactory=createDefaultSettings):
+    '''
+    Solves all votes with all given rules on a pool of worker processes and
+    yields a BatchResult for every pair of vote and rule. Failing votes do
+    not stop the batch, their results carry the error instead.
+
+    :param votes: The votes, each either a Vote, a PreferenceMatrix, a dict
+        as accepted by vote.parser.parseVoteFromDict or a tuple (name, vote)
+    :param rules: The names of the rules, see RULES
+    :param processes: The number of workers, by default the number of CPUs
+    :param chunkSize: The number of tasks sent to a worker at once
+    :param timeout: The maximal number of seconds spent on a single task.
+        Only available on platforms supporting SIGALRM and for settings
+        solving all programs in process without executor, as the alarm can
+        not stop solver processes or other threads.
+    :param ordered: Whether results are yielded in the order of the votes or
+        as soon as they are available
+    :param settingsFactory: Picklable function creating the solver settings,
+        called once per worker
+
+    :type votes: collections.Iterable
+    :type rules: collections.Iterable(str)
+    :type processes: int
+    :type chunkSize: int
+    :type timeout: float
+    :type ordered: bool
+    :rtype: collections.Iterable(BatchResult)
+    '''
+    rules = list(rules)
+    for rule in rules:
+        if rule not in RULES:
+            raise ValueError("Unknown rule " + repr(rule))
+    if chunkSize < 1:
+        raise ValueError("Chunk size must be positive")
+    if timeout is not None:
+        if not hasattr(signal, "setitimer"):
+            raise ValueError("Timeouts are not supported on this platform")
+        settings = settingsFactory()
+        if settings.getBackend().isExternal() or \
+                settings.getExecutor() is not None:
+            raise ValueError("Timeouts need settings solving in process " +
+                             "without executor")
+    return _streamResults(_createTasks(votes, rules, timeout), processes,
+                          chunkSize, ordered, settingsFactory)
+
+
+def _streamResults(tasks, processes, chunkSize, ordered, settingsFactory):
+    pool = multiprocessing.Pool(processes, _initialiseWorker,
+                                (settingsFactory,))
+    try:
+        if ordered:
+            results = pool.imap(_solveTask, tasks, chunkSize)
+        else:
+            results = pool.imap_unordered(_solveTask, tasks, chunkSize)
+        for result in results:
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def readVotes(lines):
+    '''
+    Reads votes from JSON lines as described in the module documentation and
+    yields tuples (name, choice dict)
+
+    :type lines: collections.Iterable(str)
+    :rtype: collections.Iterable(tuple(object, dict))
+    '''
+    for number, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        data = json.loads(line)
+        if not isinstance(data, dict):
+            raise ValueError("Line " + str(number + 1) + " is no vote")
+        if "vote" in data:
+            yield (data.get("name", number), data["vote"])
+        else:
+            yield (number, data)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Solves all votes of a file on a pool of processes")
+    parser.add_argument("votes", help="File of votes, one JSON object per " +
+                        "line, - for standard input")
+    parser.add_argument("--rules", default="ESR",
+                        help="Comma separated rules out of " +
+                        ",".join(sorted(RULES.keys())))
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1)
+    parser.add_argument("--solver", default="cbc", choices=sorted(SETTINGS))
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Maximal seconds per vote and rule, needs " +
+                        "--solver simplex")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Write results as soon as they are available")
+    options = parser.parse_args(arguments)
+    if options.timeout is not None and options.solver == "cbc":
+        parser.error("--timeout needs --solver simplex")
+
+    votes = sys.stdin if options.votes == "-" else open(options.votes)
+    try:
+        results = solveBatch(readVotes(votes), options.rules.split(","),
+                             options.processes, options.chunk_size,
+                             options.timeout, not options.unordered,
+                             SETTINGS[options.solver])
+        for result in results:
+            sys.stdout.write(json.dumps(result.toDict(), sort_keys=True) + "\n")
+            sys.stdout.flush()
+    finally:
+        if votes is not sys.stdin:
+            votes.close()
+
+
+if __name__ == '__main__':
+    main()
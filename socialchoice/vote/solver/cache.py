@@ -0,0 +1,226 @@
+'''
+This module provides a cache of solved lotteries for votes which only differ
+by the names of agents and choices. All rules are anonymous and neutral, so
+a lottery of one vote, carried over along a relabelling, is a lottery of the
+rule for every other vote with the same canonical form.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.society import Vote, Assignment, Lottery, toVote
+import collections
+import hashlib
+import shelve
+
+
+class _LeafLimitExceeded(Exception):
+    pass
+
+
+def _refineColors(colors, preferences):
+    '''
+    Refines the given coloring of the choices until it is stable. The color
+    of a choice is split by the positions, sizes and member colors of the
+    classes containing it, i.e. only by data independent of labels.
+    '''
+    while True:
+        signatures = dict()
+        for choice, color in colors.items():
+            signatures[choice] = [color]
+        for (choiceClasses, multiplicity) in preferences:
+            for position, choiceClass in enumerate(choiceClasses):
+                memberColors = tuple(sorted(colors[choice]
+                                            for choice in choiceClass))
+                for choice in choiceClass:
+                    signatures[choice].append((multiplicity, position,
+                                               memberColors))
+        signatures = {choice: (signature[0], tuple(sorted(signature[1:])))
+                      for choice, signature in signatures.items()}
+        newColors = {signature: color for color, signature
+                     in enumerate(sorted(set(signatures.values())))}
+        refined = {choice: newColors[signature]
+                   for choice, signature in signatures.items()}
+        if len(newColors) == len(set(colors.values())):
+            return refined
+        colors = refined
+
+
+def _encode(order, preferences):
+    positions = {choice: position for position, choice in enumerate(order)}
+    return tuple(sorted((tuple(tuple(sorted(positions[choice]
+                                            for choice in choiceClass))
+                               for choiceClass in choiceClasses),
+                         multiplicity)
+                        for (choiceClasses, multiplicity) in preferences))
+
+
+def _getTwins(preferences):
+    '''
+    Returns the classes of every choice in all preferences. Choices with the
+    same classes are twins, swapping them does not change the vote.
+    '''
+    twins = collections.defaultdict(list)
+    for index, (choiceClasses, _) in enumerate(preferences):
+        for position, choiceClass in enumerate(choiceClasses):
+            for choice in choiceClass:
+                twins[choice].append((index, position))
+    return {choice: tuple(memberships) for choice, memberships in twins.items()}
+
+
+def _search(colors, preferences, twins, best, leaves):
+    '''
+    Individualises the members of the first ambiguous color one after
+    another and keeps the smallest encoding of all resulting orders. Of
+    several twins, only one needs to be individualised.
+    '''
+    colors = _refineColors(colors, preferences)
+    cells = collections.defaultdict(list)
+    for choice, color in colors.items():
+        cells[color].append(choice)
+    ambiguous = [color for color, cell in cells.items() if len(cell) > 1]
+    if not ambiguous:
+        leaves[0] -= 1
+        if leaves[0] < 0:
+            raise _LeafLimitExceeded()
+        order = sorted(colors.keys(), key=colors.get)
+        encoding = _encode(order, preferences)
+        if best[0] is None or encoding < best[0]:
+            best[0] = encoding
+            best[1] = order
+        return
+    color = min(ambiguous)
+    individualisedTwins = set()
+    for choice in cells[color]:
+        if twins[choice] in individualisedTwins:
+            continue
+        individualisedTwins.add(twins[choice])
+        individualised = {other: 2 * value for other, value in colors.items()}
+        individualised[choice] = 2 * color - 1
+        _search(individualised, preferences, twins, best, leaves)
+
+
+def getCanonicalForm(vote, maximumLeaves=1000):
+    '''
+    Returns the canonical form of the given vote together with its choices
+    in canonical order, or None if the vote is not supported or too
+    symmetric to be canonicalised within maximumLeaves orders. The form is
+    the sorted multiset of all preferences, with choices replaced by their
+    canonical positions. Two votes have the same form iff one is obtained
+    from the other by renaming agents and choices.
+
+    Assignment votes are not supported, as their rules depend on the
+    structure of the choices and not only on the preferences.
+
+    :type vote: vote.society.Vote|vote.society.PreferenceMatrix
+    :type maximumLeaves: int
+    :rtype: tuple(tuple, list(vote.society.Choice))
+    '''
+    vote = toVote(vote)
+    if type(vote) is not Vote or any(isinstance(choice.getObject(), Assignment)
+                                     for choice in vote.getChoices()):
+        return None
+    preferences = [(agent.getChoiceClasses(), multiplicity) for agent, multiplicity
+                   in vote.getAgentMultiplicities().items()]
+    best = [None, None]
+    try:
+        _search(dict.fromkeys(vote.getChoices(), 0), preferences,
+                _getTwins(preferences), best, [maximumLeaves])
+    except _LeafLimitExceeded:
+        return None
+    return (best[0], best[1])
+
+
+class LotteryCache(object):
+    '''
+    Cache of lotteries, indexed by rule and canonical form of the vote. The
+    most recently used entries are kept in memory, optionally backed by a
+    shelve on disk, which also outlives the process. Lotteries are stored by
+    canonical position and mapped back to the choices of the caller.
+
+    Lotteries are cached independently of the solver settings, so a cache
+    should only be shared by settings with equal tolerances.
+    '''
+
+    def __init__(self, capacity=1024, path=None, maximumLeaves=1000):
+        '''
+        :param capacity: The number of entries kept in memory
+        :param path: The file of the on-disk store, if any
+        :param maximumLeaves: See getCanonicalForm
+
+        :type capacity: int
+        :type path: str
+        :type maximumLeaves: int
+        '''
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.maximumLeaves = maximumLeaves
+        self.entries = collections.OrderedDict()
+        self.store = None if path is None else shelve.open(path, protocol=2)
+        self.hits = 0
+        self.misses = 0
+
+    def getHits(self):
+        return self.hits
+
+    def getMisses(self):
+        return self.misses
+
+    def _getStoreKey(self, key):
+        return hashlib.sha1(repr(key)).hexdigest()
+
+    def _get(self, key):
+        values = self.entries.pop(key, None)
+        if values is None and self.store is not None:
+            stored = self.store.get(self._getStoreKey(key), None)
+            # The full key guards against collisions of the hash
+            if stored is not None and stored[0] == key:
+                values = stored[1]
+        if values is not None:
+            self.entries[key] = values
+        return values
+
+    def _put(self, key, values):
+        self.entries.pop(key, None)
+        self.entries[key] = values
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        if self.store is not None:
+            self.store[self._getStoreKey(key)] = (key, values)
+
+    def solve(self, solveVote, vote, solverSettings):
+        '''
+        Returns the lottery of the given rule, e.g.
+        vote.solver.sr.solveVoteESR, for the given vote, solving it only if
+        no vote of the same canonical form has been solved by this rule.
+        Unsupported votes are always solved.
+
+        :type solveVote: function
+        :type vote: vote.society.Vote|vote.society.PreferenceMatrix
+        :type solverSettings: vote.solver.settings.SolverSettings
+        :rtype: vote.society.Lottery
+        '''
+        vote = toVote(vote)
+        canonicalForm = getCanonicalForm(vote, self.maximumLeaves)
+        if canonicalForm is None:
+            return solveVote(vote, solverSettings)
+        (form, order) = canonicalForm
+        key = (solveVote.__name__, form)
+        values = self._get(key)
+        if values is not None:
+            self.hits += 1
+            return Lottery({choice.getObject(): value
+                            for choice, value in zip(order, values)},
+                           solverSettings)
+        self.misses += 1
+        lottery = solveVote(vote, solverSettings)
+        distribution = dict(lottery.getDistribution())
+        self._put(key, tuple(distribution.get(choice.getObject(), 0.0)
+                             for choice in order))
+        return lottery
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
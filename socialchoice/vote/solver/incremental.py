@@ -0,0 +1,177 @@
+'''
+This module provides ESR for votes which are edited one preference at a
+time. The trajectory of an agent up to leaving a class only depends on the
+classes it visited so far, so after a preference change, all events before
+the changed agent reaches the first changed class are still valid. The
+solve resumes from the last of them instead of starting at time 0.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.society import Agent, Preference, Vote, AssignmentVote, toVote
+from vote.solver.settings import SolverSettings
+from vote.solver.serial import solveStrictAssignmentVote
+from vote.solver.sr import ArraySRState, walkTrajectory
+
+
+def _getCommonPrefixLength(preference, other):
+    length = 0
+    for choiceClass, otherClass in zip(preference, other):
+        if choiceClass != otherClass:
+            break
+        length += 1
+    return length
+
+
+class Snapshot(object):
+    '''
+    State of an ESR run before an event, given by the heights of all classes
+    and the position and height of every agent, indexed by identifier
+    '''
+
+    def __init__(self, state, members):
+        '''
+        :param members: The identifiers of all agents represented by every
+            tracked agent of the state
+
+        :type state: vote.solver.sr.ArraySRState
+        :type members: dict(vote.society.Agent, list(collections.Hashable))
+        '''
+        self.classHeights = state.getCurrentClassHeights()
+        self.agents = dict()
+        for agent in state.getAgents():
+            data = (state.getAgentClassIndex(agent), state.getAgentHeight(agent))
+            for identifier in members[agent]:
+                self.agents[identifier] = data
+
+    def getClassIndex(self, identifier):
+        return self.agents[identifier][0]
+
+    def restore(self, state):
+        '''
+        Sets the given fresh state of an edited vote to this snapshot
+
+        :type state: vote.solver.sr.ArraySRState
+        '''
+        for choiceClass, height in self.classHeights.items():
+            state.setClassHeight(choiceClass, height)
+        for agent in state.getAgents():
+            (classIndex, height) = self.agents[agent.getIdentifier()]
+            state.setAgentClassIndex(agent, classIndex)
+            state.setAgentHeight(agent, height)
+
+
+class IncrementalESR(object):
+    '''
+    Keeps the trajectory of the last ESR solve of a vote as one snapshot per
+    event. Changing the preference of a single agent resumes from the last
+    snapshot before the agent reached its first changed class.
+    '''
+
+    def __init__(self, vote, solverSettings):
+        '''
+        :type vote: vote.society.Vote|vote.society.PreferenceMatrix
+        :type solverSettings: vote.solver.settings.SolverSettings
+        '''
+        if not isinstance(solverSettings, SolverSettings):
+            raise TypeError(repr(solverSettings) + " is not a settings instance")
+        self.settings = solverSettings
+        self.vote = None
+        self.snapshots = []
+        self.lottery = None
+        self.resumedEvent = 0
+        self._solve(toVote(vote), 0)
+
+    def getVote(self):
+        '''
+        @rtype: vote.society.Vote
+        '''
+        return self.vote
+
+    def getLottery(self):
+        '''
+        @rtype: vote.society.Lottery|vote.society.AssignmentLottery
+        '''
+        return self.lottery
+
+    def getEventCount(self):
+        '''
+        Returns the number of events of the last solve
+        '''
+        return len(self.snapshots)
+
+    def getResumedEvent(self):
+        '''
+        Returns the number of events the last solve reused
+        '''
+        return self.resumedEvent
+
+    def _getMembers(self, vote):
+        members = dict()
+        representatives = {agent.getChoiceClasses(): agent for agent
+                           in vote.getAgentMultiplicities().keys()}
+        for agent in vote.getAgents():
+            members.setdefault(representatives[agent.getChoiceClasses()],
+                               []).append(agent.getIdentifier())
+        return members
+
+    def _solve(self, vote, event):
+        self.vote = vote
+        self.resumedEvent = event
+        with self.settings.measure("ESR"):
+            with self.settings.measure("serial"):
+                lottery = solveStrictAssignmentVote(vote, self.settings)
+            if lottery is not None:
+                self.snapshots = []
+                self.resumedEvent = 0
+                self.lottery = lottery
+                return lottery
+            with self.settings.measure("setup"):
+                state = ArraySRState(vote, self.settings)
+                if event > 0:
+                    self.snapshots[event].restore(state)
+                del self.snapshots[event:]
+                members = self._getMembers(vote)
+            walkTrajectory(state, lambda current: self.snapshots.append(
+                Snapshot(current, members)))
+            self.lottery = state.findLottery()
+            return self.lottery
+
+    def setPreference(self, identifier, preference):
+        '''
+        Changes the preference of the agent with the given identifier and
+        returns the new lottery
+
+        :type identifier: collections.Hashable
+        :type preference: vote.society.Preference
+        :rtype: vote.society.Lottery|vote.society.AssignmentLottery
+        '''
+        if not isinstance(preference, Preference):
+            raise TypeError(repr(preference) + " is not a preference")
+        agents = []
+        changedAgent = None
+        for agent in self.vote.getAgents():
+            if agent.getIdentifier() == identifier:
+                changedAgent = agent
+            else:
+                agents.append(agent)
+        if changedAgent is None:
+            raise ValueError("Agent " + repr(identifier) + " not known")
+        agents.append(Agent(identifier, preference, changedAgent.getName()))
+        if isinstance(self.vote, AssignmentVote):
+            vote = AssignmentVote(agents, self.vote.getAssignedAgents(),
+                                  self.vote.getObjects())
+        else:
+            vote = Vote(agents)
+
+        prefixLength = _getCommonPrefixLength(changedAgent.getPreference(),
+                                              preference)
+        if vote.getChoices() != self.vote.getChoices() or not self.snapshots:
+            # Other choices change the distribution constraints of all events
+            return self._solve(vote, 0)
+        event = len(self.snapshots) - 1
+        while event > 0 and \
+                self.snapshots[event].getClassIndex(identifier) >= prefixLength:
+            event -= 1
+        return self._solve(vote, event)
@@ -0,0 +1,300 @@
+'''
+This module provides a combinatorial replacement of the lambda problem for
+votes whose preference classes form a laminar family, i.e. every two classes
+are either disjoint or one contains the other. This holds for all strict
+profiles and for dichotomous profiles with nested or disjoint approval sets.
+On such families, the minimal probability needed inside a class is a
+maximum of its own requirement and the needs of its maximal subclasses, so
+event times and bounces follow without solving linear programs.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+import math
+
+
+def isLaminar(masks):
+    '''
+    Determines whether the given classes, encoded as bitmasks, form a laminar
+    family
+
+    :type masks: collections.Iterable(int)
+    :rtype: bool
+    '''
+    masks = list(masks)
+    for position, mask in enumerate(masks):
+        for other in masks[position + 1:]:
+            common = mask & other
+            if common and common != mask and common != other:
+                return False
+    return True
+
+
+def createLaminarProblem(vote, solverSettings, maximumTime=1.0):
+    '''
+    Returns a laminar problem for the given vote if its preference classes
+    form a laminar family over a single distribution, None otherwise
+
+    :type vote: vote.society.Vote
+    :type solverSettings: vote.solver.settings.SolverSettings
+    :type maximumTime: float
+    :rtype: LaminarProblem
+    '''
+    if vote.getDistributions() != [vote.getChoices()]:
+        return None
+    choiceIndex = vote.getChoiceIndex()
+    masks = set()
+    for agent in vote.getAgentMultiplicities().keys():
+        for choiceClass in agent.getChoiceClasses():
+            masks.add(choiceIndex.getClassMask(choiceClass))
+    if not isLaminar(masks):
+        return None
+    return LaminarProblem(choiceIndex, masks, solverSettings, maximumTime)
+
+
+class LaminarProblem(object):
+    '''
+    Drop-in replacement of vote.solver.util.LambdaProblem for a laminar family
+    of classes and a single distribution over all choices. Rows on classes
+    outside of the family are only allowed if they are implied by the rows of
+    the family, see isExact.
+
+    The family is kept as a forest: the parent of each class is the smallest
+    class strictly containing it. With r[C] the largest row requirement on C,
+    the minimal probability of C is m[C] = max(r[C], sum of m over the
+    children of C) and the rows are satisfiable iff the m of all roots sum up
+    to at most 1.
+    '''
+
+    def __init__(self, choiceIndex, masks, solverSettings, maximumTime=1.0):
+        '''
+        :type choiceIndex: vote.society.ChoiceIndex
+        :type masks: collections.Iterable(int)
+        :type solverSettings: vote.solver.settings.SolverSettings
+        :type maximumTime: float
+        '''
+        self.choiceIndex = choiceIndex
+        self.settings = solverSettings
+        self.maximumTime = maximumTime
+        # Larger classes first, so that parents precede their children
+        self.masks = sorted(set(masks), key=lambda mask: (-bin(mask).count("1"),
+                                                          mask))
+        self.parents = dict()
+        self.children = {mask: [] for mask in self.masks}
+        self.roots = []
+        for position, mask in enumerate(self.masks):
+            parent = None
+            for other in reversed(self.masks[:position]):
+                if other & mask == mask:
+                    parent = other
+                    break
+            self.parents[mask] = parent
+            if parent is None:
+                self.roots.append(mask)
+            else:
+                self.children[parent].append(mask)
+        self.rows = dict()
+
+    def getSettings(self):
+        return self.settings
+
+    def setMaximumTime(self, maximumTime):
+        self.maximumTime = maximumTime
+
+    def hasRow(self, key):
+        return key in self.rows
+
+    def getRowKeys(self):
+        return self.rows.keys()
+
+    def setRow(self, key, choiceClass, height, speed=0):
+        '''
+        Adds the row identified by key or updates its data
+
+        @type choiceClass: vote.society.ChoiceClass
+        @type height: float
+        @type speed: float
+        '''
+        self.rows[key] = (self.choiceIndex.getClassMask(choiceClass), height,
+                          speed)
+
+    def removeRow(self, key):
+        del self.rows[key]
+
+    def _getRequirements(self, rows, lambdaValue):
+        '''
+        Returns the largest requirement on every class of the family together
+        with the smallest slope among the rows attaining it
+        '''
+        requirements = dict()
+        for (mask, height, speed) in rows:
+            if mask not in self.children:
+                continue
+            value = height + lambdaValue * speed
+            current = requirements.get(mask, None)
+            if current is None:
+                requirements[mask] = (value, speed)
+            elif self.settings.isClose(value, current[0]):
+                requirements[mask] = (max(value, current[0]),
+                                      min(speed, current[1]))
+            elif value > current[0]:
+                requirements[mask] = (value, speed)
+        return requirements
+
+    def _getMasses(self, rows, lambdaValue):
+        '''
+        Returns the minimal probability of every class of the family together
+        with its left derivative in l
+        '''
+        requirements = self._getRequirements(rows, lambdaValue)
+        masses = dict()
+        for mask in reversed(self.masks):
+            childMass = math.fsum(masses[child][0]
+                                  for child in self.children[mask])
+            childSlope = sum(masses[child][1] for child in self.children[mask])
+            (requirement, slope) = requirements.get(mask, (None, None))
+            if requirement is None:
+                masses[mask] = (childMass, childSlope)
+            elif self.settings.isClose(requirement, childMass):
+                masses[mask] = (max(requirement, childMass),
+                                min(slope, childSlope))
+            elif requirement > childMass:
+                masses[mask] = (requirement, slope)
+            else:
+                masses[mask] = (childMass, childSlope)
+        return masses
+
+    def _getTotalMass(self, masses):
+        return (math.fsum(masses[root][0] for root in self.roots),
+                sum(masses[root][1] for root in self.roots))
+
+    def isExact(self):
+        '''
+        Determines whether every row on a class outside of the family is
+        implied by the maximal classes of the family inside of it. As rows
+        outside of the family never grow while the ones of the family never
+        shrink, this stays true once it holds.
+
+        @rtype: bool
+        '''
+        return self._isImplied(self.rows.values())
+
+    def _isImplied(self, rows):
+        masses = self._getMasses(rows, 0.0)
+        for (mask, height, _) in rows:
+            if mask in self.children:
+                continue
+            if not self.settings.isNonnegative(
+                    self._getInnerMass(masses, mask) - height):
+                return False
+        return True
+
+    def _getInnerMass(self, masses, mask):
+        '''
+        Returns the total minimal probability of all maximal classes of the
+        family contained in the given class
+        '''
+        innerMass = []
+        candidates = list(self.roots)
+        while candidates:
+            candidate = candidates.pop()
+            common = candidate & mask
+            if common == candidate:
+                innerMass.append(masses[candidate][0])
+            elif common:
+                candidates.extend(self.children[candidate])
+        return math.fsum(innerMass)
+
+    def maximiseLambda(self):
+        '''
+        Returns the maximal value of l such that all rows are satisfiable. As
+        the total minimal probability is convex and piecewise linear in l,
+        Newton steps from the right reach the maximum after finitely many
+        pieces.
+
+        @rtype: float
+        '''
+        lambdaValue = self.maximumTime
+        while True:
+            (totalMass, slope) = self._getTotalMass(
+                self._getMasses(self.rows.values(), lambdaValue))
+            if totalMass <= 1 or self.settings.isClose(totalMass, 1):
+                return lambdaValue
+            if slope <= 0 or lambdaValue <= 0:
+                raise ValueError("Infeasible")
+            lambdaValue = max(lambdaValue - (totalMass - 1) / slope, 0.0)
+
+    def _getMaximalMass(self, masses, totalMass, mask):
+        '''
+        Returns the maximal probability of the given class, i.e. 1 minus the
+        minimal probability needed outside of it. Rows on classes containing
+        it are satisfied by the class itself.
+        '''
+        (inner, outer) = (0.0, masses[mask][0])
+        parent = self.parents[mask]
+        while parent is not None:
+            childMass = math.fsum(masses[child][0]
+                                  for child in self.children[parent])
+            (inner, outer) = (childMass - outer + inner, masses[parent][0])
+            mask = parent
+            parent = self.parents[mask]
+        return 1.0 - (totalMass - outer + inner)
+
+    def findTightRows(self, keys, lambdaValue):
+        '''
+        Returns the rows out of keys which can not have any slack if l is
+        fixed to lambdaValue
+
+        @rtype: list
+        '''
+        masses = self._getMasses(self.rows.values(), lambdaValue)
+        (totalMass, _) = self._getTotalMass(masses)
+        tightRows = []
+        for key in keys:
+            (mask, height, speed) = self.rows[key]
+            value = height + lambdaValue * speed
+            maximalMass = self._getMaximalMass(masses, totalMass, mask)
+            if maximalMass < value or self.settings.isClose(maximalMass, value):
+                tightRows.append(key)
+        return tightRows
+
+    def getCertificate(self):
+        return None
+
+    def findSolution(self, classHeights):
+        '''
+        Returns probabilities of all choices satisfying all given class
+        heights. The probability of every class beyond the needs of its
+        children is spread evenly over the choices in no child, or over the
+        children if there are none.
+
+        @type classHeights: dict(vote.society.ChoiceClass, float)
+        @rtype: dict(vote.society.Choice, float)
+        @raise ValueError: If the heights are not satisfiable
+        '''
+        rows = [(self.choiceIndex.getClassMask(choiceClass), height, 0)
+                for choiceClass, height in classHeights.items()]
+        masses = self._getMasses(rows, 0.0)
+        if not self._isImplied(rows) or not self.settings.isNonnegative(
+                1 - self._getTotalMass(masses)[0]):
+            raise ValueError("Infeasible")
+        values = dict.fromkeys(self.choiceIndex.getChoices(), 0.0)
+        fullMask = self.choiceIndex.getFullMask()
+        pending = [(fullMask, 1.0, self.roots)]
+        while pending:
+            (mask, mass, children) = pending.pop()
+            childMass = math.fsum(masses[child][0] for child in children)
+            extra = max(mass - childMass, 0.0)
+            freeMask = mask
+            for child in children:
+                freeMask &= ~child
+            freeChoices = self.choiceIndex.getMaskChoices(freeMask)
+            if freeChoices:
+                for choice in freeChoices:
+                    values[choice] += extra / len(freeChoices)
+                extra = 0.0
+            for child in children:
+                pending.append((child, masses[child][0] + extra / len(children),
+                                self.children[child]))
+        return values
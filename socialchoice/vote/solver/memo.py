@@ -0,0 +1,81 @@
+'''
+This module provides a memo of solved linear programs. Within a run, the
+detection of tight rows solves identical programs whenever several rows
+share their class, e.g. agents currently in the same class or towers of
+equal class and height. Across runs, the same happens for votes sharing
+parts of their trajectory.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+import collections
+
+
+class ProgramMemo(object):
+    '''
+    Memo of the solutions of linear programs, indexed by the fingerprint of
+    their data, see vote.solver.program.LinearProgram.getFingerprint. Only
+    the most recently used solutions are kept. Solutions are shared between
+    all programs of equal fingerprint and must not be modified. Programs
+    are solved through the memo by
+    vote.solver.settings.SolverSettings.solveProgram.
+    '''
+
+    def __init__(self, capacity=4096):
+        '''
+        :param capacity: The number of solutions kept
+
+        :type capacity: int
+        '''
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.solutions = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def getHits(self):
+        return self.hits
+
+    def getMisses(self):
+        return self.misses
+
+    def clear(self):
+        self.solutions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, program):
+        '''
+        Sets the memoised solution of the given program and returns its
+        status, or None if the program has not been solved yet. Together with
+        the status, the fingerprint of the program is returned, which can be
+        passed to store.
+
+        @type program: vote.solver.program.LinearProgram
+        @rtype: tuple(int, tuple)
+        '''
+        fingerprint = program.getFingerprint()
+        solution = self.solutions.pop(fingerprint, None)
+        if solution is None:
+            self.misses += 1
+            return (None, fingerprint)
+        self.solutions[fingerprint] = solution
+        self.hits += 1
+        program.setSolution(*solution)
+        return (solution[0], fingerprint)
+
+    def store(self, program, fingerprint=None):
+        '''
+        Memoises the current solution of the given program
+
+        @type program: vote.solver.program.LinearProgram
+        @type fingerprint: tuple
+        '''
+        if fingerprint is None:
+            fingerprint = program.getFingerprint()
+        self.solutions.pop(fingerprint, None)
+        self.solutions[fingerprint] = program.getSolution()
+        while len(self.solutions) > self.capacity:
+            self.solutions.popitem(last=False)
@@ -0,0 +1,117 @@
+'''
+This module provides an executor solving independent linear programs
+concurrently, e.g. the slack maximisations of the individual detection of
+tight rows, which all share the same fixed l.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from multiprocessing.pool import ThreadPool
+import multiprocessing
+
+WORKERS_AUTOMATIC = "automatic"
+WORKERS_THREADS = "threads"
+WORKERS_PROCESSES = "processes"
+
+WORKER_KINDS = (WORKERS_AUTOMATIC, WORKERS_THREADS, WORKERS_PROCESSES)
+
+
+def solveProgram(task):
+    '''
+    Solves the given program with the given backend and returns its solution
+    as given by vote.solver.program.LinearProgram.getSolution
+
+    :type task: tuple(vote.solver.program.LinearProgram, vote.solver.settings.LpBackend)
+    :rtype: tuple(int, numpy.ndarray, numpy.ndarray)
+    '''
+    (program, backend) = task
+    backend.solve(program)
+    return program.getSolution()
+
+
+class SubproblemExecutor(object):
+    '''
+    Solves batches of independent programs on a pool of workers. Backends
+    running an external solver process mostly wait, so they are served by
+    threads. In-process backends hold the interpreter lock and are served by
+    processes instead, which requires picklable programs and backends.
+    Results are always returned in the order of the programs, so the outcome
+    does not depend on scheduling. The pools are created on first use and
+    kept until close is called.
+    '''
+
+    def __init__(self, workers=None, kind=WORKERS_AUTOMATIC):
+        '''
+        :param workers: The number of workers, by default the number of CPUs
+        :param kind: Whether to use threads, processes or decide based on
+            the backend
+
+        :type workers: int
+        :type kind: str
+        '''
+        if workers is not None and workers < 1:
+            raise ValueError("Number of workers must be positive")
+        if kind not in WORKER_KINDS:
+            raise ValueError(repr(kind) + " is not a kind of workers")
+        self.workers = workers
+        self.kind = kind
+        self.pools = dict()
+
+    def getWorkers(self):
+        return self.workers
+
+    def getKind(self):
+        return self.kind
+
+    def _getKind(self, backend):
+        kind = self.kind
+        if kind == WORKERS_AUTOMATIC:
+            kind = WORKERS_THREADS if backend.isExternal() else WORKERS_PROCESSES
+        # Daemonic processes, e.g. workers of vote.solver.batch, must not
+        # have children
+        if kind == WORKERS_PROCESSES and multiprocessing.current_process().daemon:
+            kind = WORKERS_THREADS
+        return kind
+
+    def _getPool(self, kind):
+        pool = self.pools.get(kind, None)
+        if pool is None:
+            if kind == WORKERS_THREADS:
+                pool = ThreadPool(self.workers)
+            else:
+                pool = multiprocessing.Pool(self.workers)
+            self.pools[kind] = pool
+        return pool
+
+    def solvePrograms(self, programs, backend):
+        '''
+        Solves all programs with the given backend, stores the solutions in
+        the programs and returns their status, in the order of the programs
+
+        :type programs: list(vote.solver.program.LinearProgram)
+        :type backend: vote.solver.settings.LpBackend
+        :rtype: list(int)
+        '''
+        tasks = [(program, backend) for program in programs]
+        if len(tasks) < 2:
+            solutions = map(solveProgram, tasks)
+        else:
+            solutions = self._getPool(self._getKind(backend)).map(solveProgram,
+                                                                  tasks)
+        # Programs solved by other processes are copies
+        for program, solution in zip(programs, solutions):
+            program.setSolution(*solution)
+        return [solution[0] for solution in solutions]
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+            pool.join()
+        self.pools = dict()
+
+    def __getstate__(self):
+        # Pools can not be transferred to other processes
+        state = dict(self.__dict__)
+        state["pools"] = dict()
+        return state
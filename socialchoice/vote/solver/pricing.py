@@ -0,0 +1,197 @@
+'''
+This module provides pricing oracles for the column generation solve mode,
+in which linear programs only contain variables for a small set of choices
+and further choices are added on demand
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.society import Choice, Assignment, AssignmentVote
+import collections
+import math
+import numpy
+
+
+class Pricer(object):
+    '''
+    Base class of all pricing oracles. Given nonnegative weights of choice
+    classes, a pricer determines a choice maximising the total weight of all
+    classes containing it.
+    '''
+
+    def getInitialChoices(self, choices):
+        '''
+        Returns the choices the linear programs initially contain
+
+        :type choices: collections.Iterable(vote.society.Choice)
+        :rtype: list(vote.society.Choice)
+        '''
+        return [next(iter(choices))]
+
+    def price(self, choices, classWeights):
+        '''
+        Returns a choice of maximal total weight together with this weight
+
+        :type choices: collections.Iterable(vote.society.Choice)
+        :type classWeights: dict(vote.society.ChoiceClass, float)
+        :rtype: tuple(vote.society.Choice, float)
+        '''
+        raise NotImplementedError()
+
+
+class EnumerationPricer(Pricer):
+    '''
+    Prices by accumulating the weights of all classes choice by choice. This
+    only keeps the linear programs small, the work per pricing is linear in
+    the size of the weighted classes.
+    '''
+
+    def price(self, choices, classWeights):
+        choiceWeights = collections.defaultdict(list)
+        for choiceClass, weight in classWeights.items():
+            if weight <= 0:
+                continue
+            for choice in choiceClass:
+                choiceWeights[choice].append(weight)
+        if not choiceWeights:
+            return (next(iter(choices)), 0.0)
+        return max(((choice, math.fsum(weights))
+                    for choice, weights in choiceWeights.items()),
+                   key=lambda (choice, weight): weight)
+
+
+def maximumWeightAssignment(weights):
+    '''
+    Returns a perfect assignment of maximal weight for the given square weight
+    matrix, given as the column of every row, using the Hungarian algorithm
+
+    :type weights: numpy.ndarray
+    :rtype: list(int)
+    '''
+    size = weights.shape[0]
+    # Potentials and matching are 1-indexed, column 0 is a virtual one
+    rowPotentials = numpy.zeros(size + 1)
+    columnPotentials = numpy.zeros(size + 1)
+    columnRows = numpy.zeros(size + 1, dtype=int)
+    costs = -numpy.asarray(weights, dtype=float)
+    for row in range(1, size + 1):
+        columnRows[0] = row
+        column = 0
+        minimalSlack = numpy.full(size + 1, numpy.inf)
+        predecessors = numpy.zeros(size + 1, dtype=int)
+        used = numpy.zeros(size + 1, dtype=bool)
+        while True:
+            used[column] = True
+            currentRow = columnRows[column]
+            slack = costs[currentRow - 1] - rowPotentials[currentRow] - \
+                columnPotentials[1:]
+            free = ~used[1:]
+            improved = free & (slack < minimalSlack[1:])
+            minimalSlack[1:][improved] = slack[improved]
+            predecessors[1:][improved] = column
+            candidates = numpy.flatnonzero(free)
+            nextColumn = candidates[numpy.argmin(minimalSlack[1:][candidates])] + 1
+            delta = minimalSlack[nextColumn]
+            rowPotentials[columnRows[used]] += delta
+            columnPotentials[used] -= delta
+            minimalSlack[~used] -= delta
+            column = nextColumn
+            if columnRows[column] == 0:
+                break
+        while column != 0:
+            previousColumn = predecessors[column]
+            columnRows[column] = columnRows[previousColumn]
+            column = previousColumn
+    assignment = [0] * size
+    for column in range(1, size + 1):
+        assignment[columnRows[column] - 1] = column - 1
+    return assignment
+
+
+class AssignmentPricer(EnumerationPricer):
+    '''
+    Pricer for votes over perfect assignments, as created by
+    vote.parser.toAssignmentVote. The agents and objects are taken from the
+    assignment vote of the same vote, see vote.parser.toAssignmentMatrixVote,
+    so no assignment is listed for pricing. If every weighted class consists
+    of all assignments giving one agent an object out of some set, the weight
+    of an assignment is the sum of its agent-object weights and the pricing
+    problem is solved by the Hungarian algorithm on this matrix in polynomial
+    time. Otherwise, this pricer falls back to enumeration.
+    '''
+
+    def __init__(self, vote):
+        '''
+        :type vote: vote.society.AssignmentVote
+        '''
+        if not isinstance(vote, AssignmentVote):
+            raise TypeError(repr(vote) + " is not an assignment vote")
+        self.agents = {agent.getIdentifier(): agent
+                       for agent in vote.getAssignedAgents()}
+        self.identifiers = list(self.agents.keys())
+        self.objects = list(vote.getObjects())
+        self.agentIndices = {identifier: index for index, identifier
+                             in enumerate(self.identifiers)}
+        self.objectIndices = {obj: index for index, obj
+                              in enumerate(self.objects)}
+        # Number of assignments giving one agent a fixed object
+        self.completions = math.factorial(len(self.objects) - 1) // \
+            math.factorial(len(self.objects) - len(self.identifiers))
+        self.cellClasses = dict()
+
+    def _createChoice(self, columns):
+        return Choice(Assignment({self.agents[identifier]: self.objects[column]
+                                  for identifier, column
+                                  in zip(self.identifiers, columns)}))
+
+    def _getCellClass(self, choiceClass):
+        '''
+        Returns (agent identifier, objects) if the class consists of all
+        assignments giving the agent one of the objects, None otherwise
+        '''
+        if choiceClass in self.cellClasses:
+            return self.cellClasses[choiceClass]
+        agentObjects = collections.defaultdict(set)
+        for choice in choiceClass:
+            assignment = choice.getObject()
+            if not isinstance(assignment, Assignment):
+                raise TypeError(repr(assignment) + " is not an assignment")
+            for agent, obj in assignment.getAgentObjectPairs():
+                # Assignments compare their agents by identity
+                self.agents[agent.getIdentifier()] = agent
+                agentObjects[agent.getIdentifier()].add(obj)
+        cellClass = None
+        if agentObjects:
+            (identifier, objects) = min(
+                agentObjects.items(),
+                key=lambda (identifier, objects): len(objects))
+            if len(choiceClass) == len(objects) * self.completions:
+                cellClass = (identifier, frozenset(objects))
+        self.cellClasses[choiceClass] = cellClass
+        return cellClass
+
+    def getInitialChoices(self, choices):
+        return [self._createChoice(range(len(self.identifiers)))]
+
+    def price(self, choices, classWeights):
+        cellWeights = []
+        for choiceClass, weight in classWeights.items():
+            if weight <= 0:
+                continue
+            cellClass = self._getCellClass(choiceClass)
+            if cellClass is None:
+                return EnumerationPricer.price(self, choices, classWeights)
+            cellWeights.append((cellClass, weight))
+        if not cellWeights:
+            return (self.getInitialChoices(choices)[0], 0.0)
+        # Rows of missing agents stay zero, so the matrix is square
+        weights = numpy.zeros((len(self.objects), len(self.objects)))
+        for (identifier, cellObjects), weight in cellWeights:
+            for obj in cellObjects:
+                weights[self.agentIndices[identifier],
+                        self.objectIndices[obj]] += weight
+        columns = maximumWeightAssignment(weights)[:len(self.identifiers)]
+        return (self._createChoice(columns),
+                math.fsum(weights[index, column]
+                          for index, column in enumerate(columns)))
@@ -0,0 +1,167 @@
+'''
+This module provides a profiler the solvers report into, see
+vote.solver.settings.SolverSettings.setProfiler. Solvers time nested phases,
+e.g. building the lambda problem, solving programs, detecting bounces and
+advancing the state, count what they do and report every event. Programs
+answered by the memo are timed as phase memo and counted as memo hits, only
+programs actually solved are timed as phase lp and counted as solves.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+import collections
+import time
+
+
+class _NullPhase(object):
+    '''
+    Phase measuring nothing, used while no profiler is set
+    '''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+class _Phase(object):
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter(self.name)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.profiler._exit()
+        return False
+
+
+class Profiler(object):
+    '''
+    Collects the time spent in nested phases and counters of a sequence of
+    solves. The time of every phase is attributed to its stack of enclosing
+    phases, excluding the time of nested phases, which yields the collapsed
+    stacks read by flame graph tools. Every phase without enclosing phase,
+    e.g. a whole run of a rule, is a solve and gets its own summary.
+
+    Profilers are not thread safe.
+    '''
+
+    def __init__(self, clock=time.time):
+        '''
+        :param clock: Function returning the current time in seconds
+
+        :type clock: function
+        '''
+        self.clock = clock
+        self.listeners = []
+        self.reset()
+
+    def reset(self):
+        '''
+        Forgets all times, counters and summaries, but keeps the listeners
+        '''
+        # Entries [name, start, seconds of nested phases]
+        self.stack = []
+        self.times = collections.defaultdict(float)
+        self.counters = collections.Counter()
+        self.summaries = []
+        self.solveTimes = None
+        self.solveCounters = None
+
+    def measure(self, name):
+        '''
+        Returns a context manager measuring the phase of the given name
+
+        :type name: str
+        '''
+        return _Phase(self, name)
+
+    def _enter(self, name):
+        if not self.stack:
+            self.solveTimes = collections.defaultdict(float)
+            self.solveCounters = collections.Counter()
+        self.stack.append([name, self.clock(), 0.0])
+
+    def _exit(self):
+        key = ";".join(entry[0] for entry in self.stack)
+        (name, start, nestedSeconds) = self.stack.pop()
+        seconds = self.clock() - start
+        self.times[key] += seconds - nestedSeconds
+        self.solveTimes[key] += seconds - nestedSeconds
+        if self.stack:
+            self.stack[-1][2] += seconds
+        else:
+            self.summaries.append({"name": name, "seconds": seconds,
+                                   "phases": dict(self.solveTimes),
+                                   "counters": dict(self.solveCounters)})
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+        if self.stack:
+            self.solveCounters[name] += amount
+
+    def addEventListener(self, listener):
+        '''
+        Adds a function called with the state before every event
+
+        :type listener: function
+        '''
+        self.listeners.append(listener)
+
+    def removeEventListener(self, listener):
+        self.listeners.remove(listener)
+
+    def reportEvent(self, state):
+        '''
+        Counts an event and passes the state to all listeners
+
+        :type state: vote.solver.sr.SRState|vote.solver.ssr.SSRState
+        '''
+        self.count("events")
+        for listener in self.listeners:
+            listener(state)
+
+    def getTimes(self):
+        '''
+        Returns the seconds spent in every stack of phases, excluding nested
+        phases. Stacks are given as names separated by semicolons.
+
+        :rtype: dict(str, float)
+        '''
+        return dict(self.times)
+
+    def getCounters(self):
+        '''
+        :rtype: dict(str, int)
+        '''
+        return dict(self.counters)
+
+    def getSummaries(self):
+        '''
+        Returns a summary of every solve, i.e. of every phase without
+        enclosing phase, as dict holding its name, its seconds and the times
+        and counters within it
+
+        :rtype: list(dict)
+        '''
+        return list(self.summaries)
+
+    def writeCollapsedStacks(self, stream, unit=10 ** -6):
+        '''
+        Writes the times of all stacks in the collapsed stack format read by
+        flame graph tools, i.e. one line "<stack> <count>" per stack, with
+        times given as integral multiples of unit
+
+        :type unit: float
+        '''
+        for key, seconds in sorted(self.times.items()):
+            stream.write(key + " " + str(int(round(seconds / unit))) + "\n")
@@ -0,0 +1,220 @@
+'''
+This module provides an index based representation of sparse linear
+programs, which backends assemble into matrices directly
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from pulp.constants import LpConstraintLE, LpConstraintGE, LpConstraintEQ
+import math
+import numpy
+
+SENSE_LE = LpConstraintLE
+SENSE_GE = LpConstraintGE
+SENSE_EQ = LpConstraintEQ
+
+
+class LinearProgram(object):
+    '''
+    Linear program maximising an objective over bounded variables subject to
+    sparse rows. Variables (columns) and rows are identified by consecutive
+    integers, every row is stored as dict {column: coefficient}. After a
+    backend solved the program, the status (given as PuLP status), the
+    values and, if the backend provides them, the duals of all rows are
+    available. Duals follow the PuLP convention, i.e. they are the change of
+    the optimal value per unit increase of the right hand side.
+    '''
+
+    def __init__(self):
+        self.lowBounds = []
+        self.upBounds = []
+        self.rows = []
+        self.senses = []
+        self.rightHandSides = []
+        self.objective = dict()
+        self.status = None
+        self.values = None
+        self.duals = None
+
+    def copy(self):
+        '''
+        Returns an independent copy of this program without its solution
+
+        @rtype: LinearProgram
+        '''
+        program = LinearProgram()
+        program.lowBounds = list(self.lowBounds)
+        program.upBounds = list(self.upBounds)
+        program.rows = [dict(row) for row in self.rows]
+        program.senses = list(self.senses)
+        program.rightHandSides = list(self.rightHandSides)
+        program.objective = dict(self.objective)
+        return program
+
+    def getFingerprint(self):
+        '''
+        Returns a hashable representation of all data of this program, equal
+        for two programs iff they have the same solutions
+
+        @rtype: tuple
+        '''
+        return (tuple(self.lowBounds), tuple(self.upBounds),
+                tuple(tuple(sorted(row.items())) for row in self.rows),
+                tuple(self.senses), tuple(self.rightHandSides),
+                tuple(sorted(self.objective.items())))
+
+    def addVariable(self, lowBound=0.0, upBound=None):
+        '''
+        Adds a variable and returns its column
+
+        @type lowBound: float
+        @type upBound: float
+        @rtype: int
+        '''
+        self.lowBounds.append(lowBound)
+        self.upBounds.append(upBound)
+        return len(self.lowBounds) - 1
+
+    def getVariableCount(self):
+        return len(self.lowBounds)
+
+    def setBounds(self, column, lowBound, upBound):
+        self.lowBounds[column] = lowBound
+        self.upBounds[column] = upBound
+
+    def getBounds(self, column):
+        return (self.lowBounds[column], self.upBounds[column])
+
+    def addRow(self, coefficients, sense, rightHandSide):
+        '''
+        Adds the row sum(coefficients[c] * x[c]) <sense> rightHandSide and
+        returns its index
+
+        @type coefficients: dict(int, float)
+        @type sense: int
+        @type rightHandSide: float
+        @rtype: int
+        '''
+        if sense not in (SENSE_LE, SENSE_GE, SENSE_EQ):
+            raise ValueError(repr(sense) + " is not a sense")
+        self.rows.append(dict(coefficients))
+        self.senses.append(sense)
+        self.rightHandSides.append(rightHandSide)
+        return len(self.rows) - 1
+
+    def getRowCount(self):
+        return len(self.rows)
+
+    def getRow(self, row):
+        '''
+        @rtype: dict(int, float)
+        '''
+        return self.rows[row]
+
+    def getSense(self, row):
+        return self.senses[row]
+
+    def setCoefficient(self, row, column, coefficient):
+        if coefficient == 0:
+            self.rows[row].pop(column, None)
+        else:
+            self.rows[row][column] = coefficient
+
+    def getCoefficient(self, row, column):
+        return self.rows[row].get(column, 0)
+
+    def setRightHandSide(self, row, rightHandSide):
+        self.rightHandSides[row] = rightHandSide
+
+    def getRightHandSide(self, row):
+        return self.rightHandSides[row]
+
+    def setObjective(self, coefficients):
+        '''
+        @type coefficients: dict(int, float)
+        '''
+        self.objective = dict(coefficients)
+
+    def setObjectiveCoefficient(self, column, coefficient):
+        if coefficient == 0:
+            self.objective.pop(column, None)
+        else:
+            self.objective[column] = coefficient
+
+    def getObjective(self):
+        return self.objective
+
+    def getObjectiveVector(self):
+        '''
+        @rtype: numpy.ndarray
+        '''
+        objective = numpy.zeros(self.getVariableCount())
+        for column, coefficient in self.objective.items():
+            objective[column] = coefficient
+        return objective
+
+    def getCoordinates(self):
+        '''
+        Returns the constraint matrix in coordinate form, i.e. as arrays of
+        row indices, column indices and coefficients
+
+        @rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        '''
+        size = sum(len(row) for row in self.rows)
+        rowIndices = numpy.empty(size, dtype=int)
+        columnIndices = numpy.empty(size, dtype=int)
+        coefficients = numpy.empty(size)
+        position = 0
+        for index, row in enumerate(self.rows):
+            length = len(row)
+            rowIndices[position:position + length] = index
+            columnIndices[position:position + length] = row.keys()
+            coefficients[position:position + length] = row.values()
+            position += length
+        return (rowIndices, columnIndices, coefficients)
+
+    def getSenses(self):
+        return self.senses
+
+    def getRightHandSides(self):
+        return self.rightHandSides
+
+    def setSolution(self, status, values=None, duals=None):
+        '''
+        Stores the result of a solve
+
+        @type status: int
+        @type values: numpy.ndarray
+        @type duals: numpy.ndarray
+        '''
+        self.status = status
+        self.values = values
+        self.duals = duals
+
+    def getSolution(self):
+        '''
+        Returns the status, the values and the duals of the last solve, as
+        accepted by setSolution
+
+        @rtype: tuple(int, numpy.ndarray, numpy.ndarray)
+        '''
+        return (self.status, self.values, self.duals)
+
+    def getStatus(self):
+        return self.status
+
+    def getValue(self, column):
+        return self.values[column]
+
+    def getDual(self, row):
+        '''
+        Returns the dual of the given row, or None if it is not available
+        '''
+        if self.duals is None:
+            return None
+        return self.duals[row]
+
+    def getObjectiveValue(self):
+        return math.fsum(coefficient * self.values[column]
+                         for column, coefficient in self.objective.items())
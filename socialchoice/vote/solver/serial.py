@@ -0,0 +1,163 @@
+'''
+This module provides the probabilistic serial rule (eating algorithm) for
+assignment votes with strict preferences over objects. On such votes, ESR
+coincides with probabilistic serial, which only needs simple arithmetic
+instead of linear programs.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from vote.society import Assignment, AssignmentVote, AssignmentLottery
+import math
+
+
+def eatObjects(rankings, objects, solverSettings):
+    '''
+    Runs the eating algorithm: All agents simultaneously eat their most
+    preferred remaining object at speed 1 until time 1. Returns the eaten
+    amounts of the form {agent: {object: probability}}.
+
+    :type rankings: dict(collections.Hashable, list(collections.Hashable))
+    :type objects: collections.Iterable(collections.Hashable)
+    :type solverSettings: vote.solver.settings.SolverSettings
+    :rtype: dict(collections.Hashable, dict(collections.Hashable, float))
+    '''
+    supplies = {obj: 1.0 for obj in objects}
+    amounts = {agent: {obj: 0.0 for obj in supplies} for agent in rankings}
+    positions = {agent: 0 for agent in rankings}
+    time = 0.0
+    while True:
+        eaters = dict()
+        for agent, ranking in rankings.items():
+            position = positions[agent]
+            while position < len(ranking) and supplies[ranking[position]] == 0:
+                position += 1
+            positions[agent] = position
+            if position < len(ranking):
+                eaters.setdefault(ranking[position], []).append(agent)
+        if not eaters or solverSettings.isClose(time, 1.0):
+            return amounts
+        step = min(min(supplies[obj] / len(agents)
+                       for obj, agents in eaters.items()), 1.0 - time)
+        for obj, agents in eaters.items():
+            for agent in agents:
+                amounts[agent][obj] += step
+            if solverSettings.isClose(supplies[obj] / len(agents), step):
+                supplies[obj] = 0
+            else:
+                supplies[obj] -= step * len(agents)
+        time += step
+
+
+def _getRanking(choiceClasses, getObject):
+    '''
+    Returns the objects of the given classes in order if every class contains
+    a single object, None otherwise
+    '''
+    ranking = []
+    for choiceClass in choiceClasses:
+        objects = set(getObject(choice) for choice in choiceClass)
+        if len(objects) != 1:
+            return None
+        ranking.append(objects.pop())
+    if len(set(ranking)) != len(ranking):
+        return None
+    return ranking
+
+
+def _getMatrixRankings(vote):
+    '''
+    Returns the rankings of an assignment vote in matrix form, indexed by
+    agent identifiers, or None if some preference is not strict
+    '''
+    objects = vote.getObjects()
+    identifiers = set(agent.getIdentifier()
+                      for agent in vote.getAssignedAgents())
+    rankings = dict()
+    for agent in vote.getAgents():
+        ranking = _getRanking(agent.getChoiceClasses(),
+                              lambda cell: cell.getObject())
+        if ranking is None or len(ranking) != len(objects) or \
+                set(cell[0] for cell in ranking) != set([agent.getIdentifier()]):
+            return None
+        rankings[agent.getIdentifier()] = [obj for (_, obj) in ranking]
+    if set(rankings.keys()) != identifiers:
+        return None
+    return rankings
+
+
+def _getAssignmentRankings(vote):
+    '''
+    Returns the rankings of a vote over all assignments, as created by
+    vote.parser.toAssignmentVote, indexed by the assigned agents, together
+    with all objects. Returns None if the vote is of a different form or some
+    preference is not strict.
+    '''
+    assignments = [choice.getObject() for choice in vote.getChoices()]
+    if not assignments or \
+            not all(isinstance(assignment, Assignment)
+                    for assignment in assignments):
+        return None
+    assignedAgents = {agent.getIdentifier(): agent
+                      for agent in assignments[0].getAgents()}
+    objects = set()
+    for assignment in assignments:
+        if len(assignment) != len(assignedAgents) or \
+                len(set(assignment.getObjects())) != len(assignment) or \
+                any(assignedAgents.get(agent.getIdentifier(), None) is not agent
+                    for agent in assignment.getAgents()):
+            return None
+        objects.update(assignment.getObjects())
+    (agentCount, objectCount) = (len(assignedAgents), len(objects))
+    # All distinct injective assignments are present iff their number matches
+    if len(assignments) != math.factorial(objectCount) / \
+            math.factorial(objectCount - agentCount):
+        return None
+    classSize = math.factorial(objectCount - 1) / \
+        math.factorial(objectCount - agentCount)
+
+    rankings = dict()
+    for agent in vote.getAgents():
+        assignedAgent = assignedAgents.get(agent.getIdentifier(), None)
+        if assignedAgent is None:
+            return None
+        choiceClasses = agent.getChoiceClasses()
+        if any(len(choiceClass) != classSize for choiceClass in choiceClasses):
+            return None
+        ranking = _getRanking(choiceClasses, lambda choice:
+                              choice.getObject().getAssignment(assignedAgent))
+        if ranking is None or len(ranking) != objectCount:
+            return None
+        rankings[assignedAgent] = ranking
+    if len(rankings) != agentCount:
+        return None
+    return (rankings, objects)
+
+
+def solveStrictAssignmentVote(vote, solverSettings):
+    '''
+    Returns the probabilistic serial lottery if the vote is an assignment
+    vote with strict preferences over objects, None otherwise. Both the
+    matrix form of vote.parser.toAssignmentMatrixVote and the votes over all
+    assignments of vote.parser.toAssignmentVote are recognised.
+
+    :type vote: vote.society.Vote
+    :type solverSettings: vote.solver.settings.SolverSettings
+    :rtype: vote.society.AssignmentLottery
+    '''
+    if isinstance(vote, AssignmentVote):
+        rankings = _getMatrixRankings(vote)
+        if rankings is None:
+            return None
+        amounts = eatObjects(rankings, vote.getObjects(), solverSettings)
+        return vote.createLottery({(identifier, obj): value
+                                   for identifier, agentAmounts in amounts.items()
+                                   for obj, value in agentAmounts.items()},
+                                  solverSettings)
+    result = _getAssignmentRankings(vote)
+    if result is None:
+        return None
+    (rankings, objects) = result
+    return AssignmentLottery(eatObjects(rankings, objects, solverSettings),
+                             solverSettings)
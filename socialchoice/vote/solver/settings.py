@@ -3,18 +3,95 @@ Created on 9 Sep 2015
 
 @author: Tobias Meggendorfer
 '''
+import numbers
 import numpy
+from pulp.pulp import LpProblem, LpVariable, LpConstraint, LpAffineExpression
 from pulp.solvers import LpSolver
+from pulp.constants import LpStatusOptimal, LpStatusInfeasible,\
+    LpStatusUnbounded, LpStatusUndefined, LpStatusNotSolved, LpMaximize
+from vote.solver.pricing import Pricer
+from vote.solver.program import SENSE_GE, SENSE_EQ
+from vote.solver.parallel import SubproblemExecutor
+from vote.solver.memo import ProgramMemo
+from vote.solver.profiling import Profiler, NULL_PHASE
+try:
+    from scipy import sparse
+    from scipy.optimize import linprog
+except ImportError:
+    linprog = None
 
+# Determine tight rows (bouncing agents, freezing towers) with a few batched
+# solves
+DETECTION_BATCHED = "batched"
+# Determine tight rows with one solve per row
+DETECTION_INDIVIDUAL = "individual"
+# Use the batched detection and verify it with the individual one
+DETECTION_VERIFY = "verify"
 
-class SolverSettings(object):
+DETECTION_MODES = (DETECTION_BATCHED, DETECTION_INDIVIDUAL, DETECTION_VERIFY)
 
-    def __init__(self, solver, absoluteTolerance=10 ** -5, relativeTolerance=10 ** -5):
-        self.setAbsoluteTolerance(absoluteTolerance)
-        self.setRelativeTolerance(relativeTolerance)
-        self.setSolver(solver)
+# Return the last solution of the lambda problem, completed to a lottery
+LOTTERY_REUSE = "reuse"
+# Like LOTTERY_REUSE, but reduce the support of the lottery afterwards
+LOTTERY_SPARSE = "sparse"
+# Always solve a separate program for the lottery
+LOTTERY_SOLVE = "solve"
 
-    def setSolver(self, solver):
+LOTTERY_MODES = (LOTTERY_REUSE, LOTTERY_SPARSE, LOTTERY_SOLVE)
+
+# Methods of linprog only accepting dense constraint matrices
+DENSE_METHODS = frozenset(["simplex", "revised simplex"])
+
+# PuLP status of every status of linprog
+LINPROG_STATUSES = {0: LpStatusOptimal, 1: LpStatusNotSolved,
+                    2: LpStatusInfeasible, 3: LpStatusUnbounded,
+                    4: LpStatusUndefined}
+
+
+class LpBackend(object):
+    '''
+    Interface of all backends solving linear programs. After solving, the
+    backend stores the status, the values of all variables and, if possible,
+    the duals of all rows in the program.
+    '''
+
+    def solve(self, program):
+        '''
+        Solves the given program and returns its PuLP status
+
+        @type program: vote.solver.program.LinearProgram
+        @rtype: int
+        '''
+        raise NotImplementedError()
+
+    def resolve(self, program):
+        '''
+        Solves the given program again after only right hand sides changed
+        '''
+        return self.solve(program)
+
+    def isExternal(self):
+        '''
+        Returns whether programs are solved by an external process, i.e.
+        whether concurrent solves may share the interpreter
+        '''
+        return False
+
+    def providesDuals(self):
+        '''
+        Returns whether solutions carry the duals of all rows. Column
+        generation needs them, without them tightness certificates carry no
+        multipliers, see vote.solver.util.LambdaProblem.findTightRows.
+        '''
+        return True
+
+
+class PulpBackend(LpBackend):
+    '''
+    Backend translating programs into PuLP problems, solved by a PuLP solver
+    '''
+
+    def __init__(self, solver):
         if not isinstance(solver, LpSolver):
             raise ValueError(repr(solver) + " is not a LpSolver")
         self.solver = solver
@@ -22,6 +99,306 @@ class SolverSettings(object):
     def getSolver(self):
         return self.solver
 
+    def isExternal(self):
+        return True
+
+    def solve(self, program):
+        variables = [LpVariable("x" + str(column), *program.getBounds(column))
+                     for column in range(program.getVariableCount())]
+        problem = LpProblem("Program", LpMaximize)
+        constraints = []
+        for row in range(program.getRowCount()):
+            constraint = LpConstraint(
+                LpAffineExpression((variables[column], coefficient)
+                                   for column, coefficient
+                                   in program.getRow(row).items()),
+                program.getSense(row), "r" + str(row),
+                program.getRightHandSide(row))
+            problem += constraint
+            constraints.append(constraint)
+        problem.setObjective(LpAffineExpression(
+            (variables[column], coefficient)
+            for column, coefficient in program.getObjective().items()))
+        status = problem.solve(self.solver)
+        # Variables occurring nowhere are not passed to the solver
+        values = numpy.array([variable.value() or 0.0
+                              for variable in variables])
+        duals = [constraint.pi for constraint in constraints]
+        if None in duals:
+            duals = None
+        else:
+            duals = numpy.array(duals)
+        program.setSolution(status, values, duals)
+        return status
+
+
+class ScipyBackend(LpBackend):
+    '''
+    In-process backend assembling the sparse constraint matrix of a program
+    directly and solving it with scipy.optimize.linprog, without any files or
+    processes. The matrix is passed on as sparse matrix to the methods
+    accepting one, only the simplex methods of SciPy need a dense one. Duals
+    are only available with methods providing marginals, i.e. HiGHS on
+    recent SciPy versions, see providesDuals.
+    '''
+
+    def __init__(self, method=None):
+        '''
+        :param method: The method of linprog, by default HiGHS if the
+            installed SciPy provides it and the simplex method otherwise
+
+        :type method: str
+        '''
+        if linprog is None:
+            raise ValueError("SciPy is not available")
+        if method is None:
+            method = "highs" if _solveTrivialProgram("highs") is not None \
+                else "simplex"
+        result = _solveTrivialProgram(method)
+        if result is None:
+            raise ValueError("Method " + repr(method) + " is not provided " +
+                             "by the installed SciPy")
+        if result.status != 0 or not numpy.allclose(result.x, [0.0, 1.0]):
+            raise ValueError("Method " + repr(method) + " fails on a " +
+                             "trivial program: " + result.message)
+        self.method = method
+        self.duals = _getMarginals(result, "ineqlin") is not None
+
+    def getMethod(self):
+        return self.method
+
+    def providesDuals(self):
+        return self.duals
+
+    def solve(self, program):
+        (rowIndices, columnIndices, coefficients) = program.getCoordinates()
+        senses = numpy.array(program.getSenses(), dtype=int)
+        # Greater equal rows are negated into lower equal ones
+        factors = numpy.where(senses == SENSE_GE, -1.0, 1.0)
+        matrix = sparse.csr_matrix(
+            (coefficients * factors[rowIndices], (rowIndices, columnIndices)),
+            shape=(program.getRowCount(), program.getVariableCount()))
+        rightHandSides = numpy.array(program.getRightHandSides()) * factors
+        inequalities = numpy.flatnonzero(senses != SENSE_EQ)
+        equalities = numpy.flatnonzero(senses == SENSE_EQ)
+        options = dict()
+        if self.method == "interior-point":
+            options["sparse"] = True
+        arguments = dict()
+        for (name, rows) in (("ub", inequalities), ("eq", equalities)):
+            if rows.size:
+                rowMatrix = matrix[rows]
+                if self.method in DENSE_METHODS:
+                    rowMatrix = rowMatrix.toarray()
+                arguments["A_" + name] = rowMatrix
+                arguments["b_" + name] = rightHandSides[rows]
+
+        result = linprog(-program.getObjectiveVector(),
+                         bounds=[program.getBounds(column) for column
+                                 in range(program.getVariableCount())],
+                         method=self.method, options=options, **arguments)
+        status = LINPROG_STATUSES.get(result.status, LpStatusUndefined)
+        if status != LpStatusOptimal:
+            program.setSolution(status)
+            return status
+        duals = None
+        if self.duals:
+            duals = numpy.zeros(program.getRowCount())
+            for (name, rows) in (("ineqlin", inequalities),
+                                 ("eqlin", equalities)):
+                if rows.size:
+                    # The program is maximised, linprog minimises the
+                    # negation
+                    duals[rows] = -factors[rows] * _getMarginals(result, name)
+        program.setSolution(status, numpy.array(result.x), duals)
+        return status
+
+
+def _solveTrivialProgram(method):
+    '''
+    Maximises x + 2y subject to x + y <= 1 and x - y <= 0.5 with the given
+    method of linprog and returns the result, or None if the installed SciPy
+    lacks the method. Presolve alone does not solve this program, so the
+    method is actually run.
+    '''
+    try:
+        return linprog([-1.0, -2.0], A_ub=[[1.0, 1.0], [1.0, -1.0]],
+                       b_ub=[1.0, 0.5], bounds=[(0.0, None)] * 2,
+                       method=method)
+    except ValueError:
+        return None
+
+
+def _getMarginals(result, name):
+    try:
+        return numpy.asarray(result[name].marginals)
+    except (KeyError, AttributeError):
+        return None
+
+
+class SolverSettings(object):
+
+    def __init__(self, solver, absoluteTolerance=10 ** -5, relativeTolerance=10 ** -5,
+                 detectionMode=DETECTION_BATCHED, pricer=None, executor=None,
+                 memo=None, lotteryMode=LOTTERY_REUSE, profiler=None):
+        self.setAbsoluteTolerance(absoluteTolerance)
+        self.setRelativeTolerance(relativeTolerance)
+        self.setSolver(solver)
+        self.setDetectionMode(detectionMode)
+        self.setPricer(pricer)
+        self.setExecutor(executor)
+        self.setMemo(memo)
+        self.setLotteryMode(lotteryMode)
+        self.setProfiler(profiler)
+
+    def setSolver(self, solver):
+        '''
+        Sets the backend solving all linear programs. PuLP solvers are
+        wrapped into a PulpBackend.
+
+        @type solver: pulp.solvers.LpSolver|LpBackend
+        '''
+        if isinstance(solver, LpSolver):
+            solver = PulpBackend(solver)
+        if not isinstance(solver, LpBackend):
+            raise ValueError(repr(solver) + " is neither a LpSolver nor " +
+                             "a LpBackend")
+        self.backend = solver
+
+    def getBackend(self):
+        '''
+        @rtype: LpBackend
+        '''
+        return self.backend
+
+    def setDetectionMode(self, mode):
+        if mode not in DETECTION_MODES:
+            raise ValueError(repr(mode) + " is not a detection mode")
+        self.detectionMode = mode
+
+    def getDetectionMode(self):
+        return self.detectionMode
+
+    def setPricer(self, pricer):
+        '''
+        Sets the pricing oracle used for column generation. If it is None,
+        linear programs contain a variable for every choice.
+
+        @type pricer: vote.solver.pricing.Pricer
+        '''
+        if pricer is not None and not isinstance(pricer, Pricer):
+            raise ValueError(repr(pricer) + " is not a Pricer")
+        self.pricer = pricer
+
+    def getPricer(self):
+        return self.pricer
+
+    def setExecutor(self, executor):
+        '''
+        Sets the executor solving independent linear programs, e.g. the ones
+        of the individual detection of tight rows, concurrently. If it is
+        None, they are solved one after another.
+
+        @type executor: vote.solver.parallel.SubproblemExecutor
+        '''
+        if executor is not None and not isinstance(executor, SubproblemExecutor):
+            raise ValueError(repr(executor) + " is not a SubproblemExecutor")
+        self.executor = executor
+
+    def getExecutor(self):
+        return self.executor
+
+    def setMemo(self, memo):
+        '''
+        Sets the memo returning the solutions of programs solved before. It
+        may be shared by several runs. If it is None, every program is
+        solved.
+
+        @type memo: vote.solver.memo.ProgramMemo
+        '''
+        if memo is not None and not isinstance(memo, ProgramMemo):
+            raise ValueError(repr(memo) + " is not a ProgramMemo")
+        self.memo = memo
+
+    def getMemo(self):
+        return self.memo
+
+    def setLotteryMode(self, mode):
+        '''
+        Sets how the final lottery of a rule is found, see LOTTERY_MODES. The
+        separate program is still solved whenever the reused solution does
+        not satisfy the final heights.
+
+        @type mode: str
+        '''
+        if mode not in LOTTERY_MODES:
+            raise ValueError(repr(mode) + " is not a lottery mode")
+        self.lotteryMode = mode
+
+    def getLotteryMode(self):
+        return self.lotteryMode
+
+    def setProfiler(self, profiler):
+        '''
+        Sets the profiler the solvers report their phases, counters and
+        events to. If it is None, nothing is recorded.
+
+        @type profiler: vote.solver.profiling.Profiler
+        '''
+        if profiler is not None and not isinstance(profiler, Profiler):
+            raise ValueError(repr(profiler) + " is not a Profiler")
+        self.profiler = profiler
+
+    def getProfiler(self):
+        return self.profiler
+
+    def measure(self, name):
+        '''
+        Returns a context manager measuring the phase of the given name with
+        the profiler, if any
+
+        @type name: str
+        '''
+        if self.profiler is None:
+            return NULL_PHASE
+        return self.profiler.measure(name)
+
+    def count(self, name, amount=1):
+        if self.profiler is not None:
+            self.profiler.count(name, amount)
+
+    def reportEvent(self, state):
+        if self.profiler is not None:
+            self.profiler.reportEvent(state)
+
+    def solveProgram(self, program, resolve=False):
+        '''
+        Solves the given program with the backend, unless the memo knows its
+        solution, and returns its status. Only programs actually solved are
+        counted as solves, memoised ones as memo hits.
+
+        @type program: vote.solver.program.LinearProgram
+        @param resolve: Whether only right hand sides changed since the last
+            solve of the program
+        @rtype: int
+        '''
+        if self.memo is not None:
+            with self.measure("memo"):
+                (status, fingerprint) = self.memo.lookup(program)
+            if status is not None:
+                self.count("memo hits")
+                return status
+        self.count("solves")
+        with self.measure("lp"):
+            if resolve:
+                status = self.backend.resolve(program)
+            else:
+                status = self.backend.solve(program)
+        if self.memo is not None:
+            with self.measure("memo"):
+                self.memo.store(program, fingerprint)
+        return status
+
     def setAbsoluteTolerance(self, tolerance):
         if tolerance <= 0:
             raise ValueError("Tolerance must be positive")
@@ -51,8 +428,25 @@ class SolverSettings(object):
         raise ValueError("Negative value")
 
     def isClose(self, a, b):
+        if isinstance(a, numbers.Real) and isinstance(b, numbers.Real):
+            # Same test as numpy.isclose without its overhead on scalars
+            return a == b or abs(a - b) <= self.getAbsoluteTolerance() + \
+                self.getRelativeTolerance() * abs(b)
         return numpy.isclose(a, b, self.getRelativeTolerance(), self.getAbsoluteTolerance())
 
+    def getIntervalMask(self, values, a, b):
+        '''
+        Vectorised isInInterval: Returns which of the given values lie in the
+        interval [a, b] up to tolerance
+
+        @type values: numpy.ndarray
+        @rtype: numpy.ndarray
+        '''
+        if a > b:
+            raise ValueError("a must be smaller than b")
+        return ((values >= a) | self.isClose(values, a)) & \
+            ((values <= b) | self.isClose(values, b))
+
     def isInInterval(self, value, a, b):
         if a > b:
             raise ValueError("a must be smaller than b")
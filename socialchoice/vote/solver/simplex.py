@@ -0,0 +1,264 @@
+'''
+This module provides an in-process bounded simplex method which keeps the
+basis of every program between solves. The SR rules solve one persistent
+lambda problem per run whose data only changes locally at events, so every
+solve starts from the vertex of the previous one and walks the trajectory
+by a few pivots instead of solving from scratch.
+
+Created on 16 Oct 2026
+
+@author: Tobias Meggendorfer
+'''
+from pulp.constants import LpStatusOptimal, LpStatusInfeasible,\
+    LpStatusUnbounded, LpStatusUndefined
+from vote.solver.settings import LpBackend
+from vote.solver.program import SENSE_LE, SENSE_GE
+import numpy
+import weakref
+
+
+class SimplexBackend(LpBackend):
+    '''
+    Backend solving programs with a dense bounded primal simplex method. Every
+    row gets a slack variable, nonbasic variables rest at one of their bounds,
+    free ones at 0.
+    Infeasible starting bases, e.g. after heights changed, are repaired by
+    minimising the total bound violation first. The last basis of every
+    program is kept and reused by the next solve of the same program, rows
+    and columns added meanwhile start with basic slacks and at their lower
+    bound, respectively.
+    '''
+
+    def __init__(self, tolerance=10 ** -9, refactorInterval=50):
+        '''
+        :param tolerance: Feasibility and optimality tolerance
+        :param refactorInterval: Number of pivots after which the basis
+            inverse is recomputed from scratch
+
+        :type tolerance: float
+        :type refactorInterval: int
+        '''
+        self.tolerance = tolerance
+        self.refactorInterval = refactorInterval
+        self.bases = weakref.WeakKeyDictionary()
+
+    def __getstate__(self):
+        # Bases are kept per program of this process only
+        state = dict(self.__dict__)
+        del state["bases"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.bases = weakref.WeakKeyDictionary()
+
+    def _getBounds(self, program):
+        columnCount = program.getVariableCount()
+        rowCount = program.getRowCount()
+        lower = numpy.empty(columnCount + rowCount)
+        upper = numpy.empty(columnCount + rowCount)
+        for column in range(columnCount):
+            (lowBound, upBound) = program.getBounds(column)
+            lower[column] = -numpy.inf if lowBound is None else lowBound
+            upper[column] = numpy.inf if upBound is None else upBound
+        # The slack of row i is b[i] - a[i] * x
+        for row, sense in enumerate(program.getSenses()):
+            if sense == SENSE_LE:
+                (lower[columnCount + row], upper[columnCount + row]) = (0.0, numpy.inf)
+            elif sense == SENSE_GE:
+                (lower[columnCount + row], upper[columnCount + row]) = (-numpy.inf, 0.0)
+            else:
+                (lower[columnCount + row], upper[columnCount + row]) = (0.0, 0.0)
+        return (lower, upper)
+
+    def _getInitialBasis(self, program, lower, upper):
+        '''
+        Returns the basic variables and the nonbasic variables at their upper
+        bound, reusing the last basis of the program if possible
+        '''
+        columnCount = program.getVariableCount()
+        rowCount = program.getRowCount()
+        basic = numpy.arange(columnCount, columnCount + rowCount)
+        atUpper = numpy.zeros(columnCount + rowCount, dtype=bool)
+        previous = self.bases.get(program, None)
+        if previous is not None:
+            (previousBasic, previousAtUpper, previousColumns) = previous
+            # Slacks are numbered after the columns, which may have grown
+            shift = columnCount - previousColumns
+            mapped = numpy.where(previousBasic < previousColumns,
+                                 previousBasic, previousBasic + shift)
+            basic[:len(mapped)] = mapped
+            atUpper[:previousColumns] = previousAtUpper[:previousColumns]
+            atUpper[columnCount:columnCount + len(previousAtUpper) -
+                    previousColumns] = previousAtUpper[previousColumns:]
+        atUpper &= numpy.isfinite(upper)
+        atUpper |= ~numpy.isfinite(lower)
+        return (basic, atUpper)
+
+    def solve(self, program):
+        columnCount = program.getVariableCount()
+        rowCount = program.getRowCount()
+        size = columnCount + rowCount
+        matrix = numpy.zeros((rowCount, size))
+        (rowIndices, columnIndices, coefficients) = program.getCoordinates()
+        matrix[rowIndices, columnIndices] = coefficients
+        matrix[:, columnCount:] = numpy.eye(rowCount)
+        rightHandSides = numpy.array(program.getRightHandSides(), dtype=float)
+        costs = numpy.zeros(size)
+        costs[:columnCount] = program.getObjectiveVector()
+        (lower, upper) = self._getBounds(program)
+
+        (basic, atUpper) = self._getInitialBasis(program, lower, upper)
+        inverse = self._invert(matrix, basic)
+        if inverse is None:
+            (basic, atUpper, inverse) = self._getSlackBasis(columnCount,
+                                                            rowCount, lower)
+
+        tolerance = self.tolerance
+        isBasic = numpy.zeros(size, dtype=bool)
+        isBasic[basic] = True
+        movable = lower < upper
+        # Free nonbasic variables may enter in either direction
+        free = ~numpy.isfinite(lower) & ~numpy.isfinite(upper)
+        values = self._getRestingValues(atUpper, lower, upper)
+        degenerateSteps = 0
+        pivots = 0
+        status = LpStatusUndefined
+        for _ in xrange(100 * (size + 1)):
+            if pivots >= self.refactorInterval:
+                inverse = self._invert(matrix, basic)
+                if inverse is None:
+                    (basic, atUpper, inverse) = self._getSlackBasis(
+                        columnCount, rowCount, lower)
+                    isBasic[:] = False
+                    isBasic[basic] = True
+                pivots = 0
+            values[~isBasic] = self._getRestingValues(atUpper, lower, upper)[~isBasic]
+            values[basic] = 0.0
+            values[basic] = inverse.dot(rightHandSides - matrix.dot(values))
+            basicValues = values[basic]
+            below = basicValues < lower[basic] - tolerance
+            above = basicValues > upper[basic] + tolerance
+            phaseOne = below.any() or above.any()
+            if phaseOne:
+                # Minimise the total bound violation of the basic variables
+                basicCosts = below.astype(float) - above.astype(float)
+                reducedCosts = -basicCosts.dot(inverse).dot(matrix)
+            else:
+                basicCosts = costs[basic]
+                reducedCosts = costs - basicCosts.dot(inverse).dot(matrix)
+            improving = ~isBasic & movable & (
+                (free & (numpy.abs(reducedCosts) > tolerance)) |
+                (~free & ~atUpper & (reducedCosts > tolerance)) |
+                (~free & atUpper & (reducedCosts < -tolerance)))
+            candidates = numpy.flatnonzero(improving)
+            if not candidates.size:
+                status = LpStatusInfeasible if phaseOne else LpStatusOptimal
+                break
+            if degenerateSteps > 20:
+                # Bland's rule prevents cycling
+                entering = candidates[0]
+            else:
+                entering = candidates[numpy.argmax(
+                    numpy.abs(reducedCosts[candidates]))]
+            if free[entering]:
+                direction = 1.0 if reducedCosts[entering] > 0 else -1.0
+            else:
+                direction = -1.0 if atUpper[entering] else 1.0
+            changes = -direction * inverse.dot(matrix[:, entering])
+
+            limits = numpy.full(rowCount, numpy.inf)
+            leavesAtUpper = numpy.zeros(rowCount, dtype=bool)
+            feasible = ~below & ~above
+            increasing = changes > tolerance
+            decreasing = changes < -tolerance
+            rising = increasing & feasible
+            limits[rising] = (upper[basic] - basicValues)[rising] / changes[rising]
+            leavesAtUpper[rising] = True
+            falling = decreasing & feasible
+            limits[falling] = (lower[basic] - basicValues)[falling] / changes[falling]
+            # Infeasible variables stop as soon as they become feasible
+            repaired = increasing & below
+            limits[repaired] = (lower[basic] - basicValues)[repaired] / \
+                changes[repaired]
+            repaired = decreasing & above
+            limits[repaired] = (upper[basic] - basicValues)[repaired] / \
+                changes[repaired]
+            leavesAtUpper[repaired] = True
+            limits = numpy.maximum(limits, 0.0)
+
+            step = upper[entering] - lower[entering]
+            leaving = None
+            if rowCount:
+                # Among the first blocking variables, prefer the largest pivot
+                ties = numpy.flatnonzero(limits <= limits.min() + tolerance)
+                if degenerateSteps > 20:
+                    leaving = ties[numpy.argmin(basic[ties])]
+                else:
+                    leaving = ties[numpy.argmax(numpy.abs(changes[ties]))]
+            if leaving is not None and limits[leaving] < step:
+                step = limits[leaving]
+            else:
+                leaving = None
+            if numpy.isinf(step):
+                status = LpStatusUndefined if phaseOne else LpStatusUnbounded
+                break
+            degenerateSteps = degenerateSteps + 1 if step <= tolerance else 0
+            if leaving is None:
+                atUpper[entering] = not atUpper[entering]
+                continue
+            leavingVariable = basic[leaving]
+            atUpper[leavingVariable] = leavesAtUpper[leaving]
+            isBasic[leavingVariable] = False
+            isBasic[entering] = True
+            basic[leaving] = entering
+            pivotRow = inverse[leaving] / changes[leaving] * -direction
+            inverse -= numpy.outer(-direction * changes, pivotRow)
+            inverse[leaving] = pivotRow
+            pivots += 1
+
+        if status != LpStatusOptimal:
+            self.bases.pop(program, None)
+            program.setSolution(status)
+            return status
+        inverse = self._invert(matrix, basic) if pivots else inverse
+        if inverse is None:
+            self.bases.pop(program, None)
+            program.setSolution(LpStatusUndefined)
+            return LpStatusUndefined
+        self.bases[program] = (basic.copy(), atUpper.copy(), columnCount)
+        values[~isBasic] = self._getRestingValues(atUpper, lower, upper)[~isBasic]
+        values[basic] = 0.0
+        values[basic] = inverse.dot(rightHandSides - matrix.dot(values))
+        # The duals are the change of the optimum per unit of right hand side
+        duals = costs[basic].dot(inverse)
+        program.setSolution(status, values[:columnCount], duals)
+        return status
+
+    def _getSlackBasis(self, columnCount, rowCount, lower):
+        basic = numpy.arange(columnCount, columnCount + rowCount)
+        atUpper = ~numpy.isfinite(lower)
+        return (basic, atUpper, numpy.eye(rowCount))
+
+    def _getRestingValues(self, atUpper, lower, upper):
+        '''
+        Returns the values of all variables if they were nonbasic, free
+        variables rest at 0
+        '''
+        values = numpy.where(atUpper, upper, lower)
+        values[~numpy.isfinite(values)] = 0.0
+        return values
+
+    def _invert(self, matrix, basic):
+        basis = matrix[:, basic]
+        try:
+            inverse = numpy.linalg.inv(basis)
+        except numpy.linalg.LinAlgError:
+            return None
+        # Nearly singular bases, e.g. reused ones after coefficients changed,
+        # are rejected
+        if not numpy.isfinite(inverse).all() or \
+                not numpy.allclose(basis.dot(inverse), numpy.eye(len(basic)),
+                                   rtol=0, atol=self.tolerance):
+            return None
+        return inverse
@@ -3,19 +3,22 @@ Created on 9 Sep 2015
 
 @author: Tobias Meggendorfer
 '''
-from vote.society import ChoiceClass, Agent
+from vote.society import ChoiceClass, Agent, toVote, AssignmentVote
 from vote.solver import SolverSettings
 from itertools import ifilter
-from pulp.pulp import LpProblem, LpVariable, lpSum
-from pulp.constants import LpMaximize
-from vote.solver.util import createLpSum, getUniqueNames, findLottery,\
-    getAllSubsets, checkPulpStatus
+import collections
+import numpy
+from vote.solver.util import findLottery, getConnectedUnionWeights, \
+    LambdaProblem, UnsupportedVoteError
+from vote.solver.serial import solveStrictAssignmentVote
+from vote.solver.laminar import LaminarProblem, createLaminarProblem
 
 
 class Tower(object):
     '''
     Basic tower class for use in SR-like algorithms
     '''
+    __slots__ = ("name", "choiceClass", "height")
 
     def __init__(self, choiceClass, name=None):
         if not isinstance(choiceClass, ChoiceClass):
@@ -61,15 +64,23 @@ class AgentData(object):
     '''
     This class keeps track of agents' basic data used in SR-like algorithms
     '''
+    __slots__ = ("agent", "multiplicity", "classIndex", "currentChoiceClass",
+                 "speed", "height")
 
-    def __init__(self, agent, speed=1):
+    def __init__(self, agent, speed=1, multiplicity=1):
+        '''
+        :param multiplicity: The number of agents with identical preferences
+            represented by this agent
+        '''
         if not isinstance(agent, Agent):
             raise ValueError(repr(agent) + " is not an agent")
         self.agent = agent
-        self._choiceClassIter = iter(agent.getChoiceClasses())
-        self.currentChoiceClass = next(self._choiceClassIter)
+        self.multiplicity = multiplicity
+        self.setClassIndex(0)
         self.setSpeed(speed)
-        self.setHeight(0)
+
+    def getMultiplicity(self):
+        return self.multiplicity
 
     def setSpeed(self, speed):
         if speed < 0:
@@ -85,11 +96,29 @@ class AgentData(object):
     def getCurrentChoiceClass(self):
         return self.currentChoiceClass
 
+    def getClassIndex(self):
+        '''
+        Returns the position of the current class in the agent's preference
+        '''
+        return self.classIndex
+
+    def setClassIndex(self, classIndex):
+        '''
+        Moves the agent to the class at the given position of its preference,
+        at height 0. Positions beyond the preference finish the agent.
+        '''
+        choiceClasses = self.agent.getChoiceClasses()
+        self.classIndex = min(classIndex, len(choiceClasses))
+        if self.classIndex < len(choiceClasses):
+            self.currentChoiceClass = choiceClasses[self.classIndex]
+        else:
+            self.currentChoiceClass = None
+        self.setHeight(0)
+
     def advanceCurrentChoiceClass(self):
         if self.isFinished():
             return None
-        self.currentChoiceClass = next(self._choiceClassIter, None)
-        self.setHeight(0)
+        self.setClassIndex(self.classIndex + 1)
         return self.currentChoiceClass
 
     def isFinished(self):
@@ -120,7 +149,9 @@ class AgentData(object):
 
 class SRState(object):
     '''
-    This class gathers all data occuring over an invocation of SR and performs low level tasks like climbing towers
+    This class gathers all data occuring over an invocation of SR and performs low level tasks like climbing towers.
+    Agents with identical preferences climb in lockstep, hence only one of them is tracked together with the number of
+    agents it represents.
     '''
 
     def __init__(self, vote, settings):
@@ -131,8 +162,9 @@ class SRState(object):
         self.vote = vote
         self.towers = dict()
         self.agents = dict()
-        for agent in vote.getAgents():
-            self.agents[agent] = AgentData(agent, 1)
+        self.lambdaProblem = None
+        for agent, multiplicity in vote.getAgentMultiplicities().items():
+            self.agents[agent] = AgentData(agent, 1, multiplicity)
 
     def getTower(self, choiceClass):
         tower = self.towers.get(choiceClass, None)
@@ -195,11 +227,28 @@ class SRState(object):
             raise TypeError("Invalid argument " + repr(agent))
         data.setHeight(self.getSettings().bound(height, 0, 1))
 
+    def getAgentClassIndex(self, agent):
+        return self._getAgentData(agent).getClassIndex()
+
+    def setAgentClassIndex(self, agent, classIndex):
+        '''
+        Moves the agent to the class at the given position of its preference,
+        at height 0
+        '''
+        self._getAgentData(agent).setClassIndex(classIndex)
+
     def setAgentSpeed(self, agent, speed):
         self._getAgentData(agent).setSpeed(speed)
 
     def getAgents(self):
-        return self.vote.getAgents()
+        '''
+        Returns the tracked agents, i.e. one agent of every group with
+        identical preferences
+        '''
+        return self.agents.keys()
+
+    def getAgentMultiplicity(self, agent):
+        return self._getAgentData(agent).getMultiplicity()
 
     def getActiveAgents(self):
         return map(lambda data: data.getAgent(), self._getActiveAgentData())
@@ -249,6 +298,57 @@ class SRState(object):
                 return False
         return True
 
+    def getLambdaProblem(self, maximumTime=1.0):
+        '''
+        Returns the lambda problem of this run, updated to the current state
+
+        @rtype: vote.solver.util.LambdaProblem|vote.solver.laminar.LaminarProblem
+        '''
+        if self.lambdaProblem is None:
+            # Laminar classes are handled combinatorially, as long as all other
+            # towers are implied by them
+            problem = createLaminarProblem(self.vote, self.getSettings(),
+                                           maximumTime)
+            if problem is None or \
+                    not self._updateLambdaProblem(problem, maximumTime).isExact():
+                problem = LambdaProblem(self.getChoices(), self.getSettings(),
+                                        maximumTime, self.vote.getDistributions())
+            self.lambdaProblem = problem
+        return self._updateLambdaProblem(self.lambdaProblem, maximumTime)
+
+    def _updateLambdaProblem(self, problem, maximumTime):
+        problem.setMaximumTime(maximumTime)
+        for tower in self.towers.values():
+            if tower.getHeight() > 0:
+                problem.setRow(tower, tower.getChoiceClass(),
+                               tower.getHeight())
+        for agentData in self.agents.values():
+            agent = agentData.getAgent()
+            if not agentData.isFinished():
+                problem.setRow(agent, agentData.getCurrentChoiceClass(),
+                               agentData.getHeight(), agentData.getSpeed())
+            elif problem.hasRow(agent):
+                problem.removeRow(agent)
+        return problem
+
+    def findLottery(self):
+        '''
+        Returns a lottery satisfying the current heights of all classes
+
+        @rtype: vote.society.Lottery|vote.society.AssignmentLottery
+        '''
+        settings = self.getSettings()
+        with settings.measure("lottery"):
+            classHeights = self.getCurrentClassHeights()
+            settings.count("towers", len(classHeights))
+            # The last solve of the lambda problem satisfies all final heights
+            solution = None
+            if isinstance(self.lambdaProblem, LaminarProblem):
+                solution = self.lambdaProblem.findSolution(classHeights)
+            elif self.lambdaProblem is not None:
+                solution = self.lambdaProblem.getSolution()
+            return findLottery(self.vote, classHeights, settings, solution)
+
     def __str__(self):
         return "Agents: " + ",".join(map(str, sorted(self.agents.values(),
                                                      key=lambda data: data.getAgent().getName()))) + "\n" + \
@@ -256,116 +356,345 @@ class SRState(object):
                                                    key=lambda tower: tower.getChoiceClass())))
 
 
+class ArraySRState(SRState):
+    '''
+    SR state keeping the heights, speeds and current classes of all tracked
+    agents and the heights of all towers in arrays. Classes are numbered as
+    they appear, an event climbs all active agents and their towers at once.
+    For debugging, toSRState returns an object-based copy of the state.
+    '''
+
+    def __init__(self, vote, settings):
+        if not isinstance(settings, SolverSettings):
+            raise TypeError(repr(settings) + " is not a settings instance")
+        self.time = 0
+        self.settings = settings
+        self.vote = vote
+        self.lambdaProblem = None
+        multiplicities = vote.getAgentMultiplicities()
+        self.agentList = sorted(multiplicities.keys(),
+                                key=lambda agent: agent.getName())
+        self.agentPositions = {agent: position for position, agent
+                               in enumerate(self.agentList)}
+        agentCount = len(self.agentList)
+        self.multiplicities = numpy.array(
+            [multiplicities[agent] for agent in self.agentList], dtype=int)
+        self.heights = numpy.zeros(agentCount)
+        self.speeds = numpy.ones(agentCount)
+        self.classIndices = numpy.zeros(agentCount, dtype=int)
+        self.currentClassIds = numpy.full(agentCount, -1, dtype=int)
+        self.active = numpy.zeros(agentCount, dtype=bool)
+        self.activeAgents = None
+        # Towers by class id, the array grows by doubling
+        self.classes = []
+        self.classIds = dict()
+        self.towerHeights = numpy.zeros(max(agentCount, 1))
+        self.agentClassIds = [[self._getClassId(choiceClass)
+                               for choiceClass in agent.getChoiceClasses()]
+                              for agent in self.agentList]
+        for position in range(agentCount):
+            self._setClassIndex(position, 0)
+
+    def _getClassId(self, choiceClass):
+        classId = self.classIds.get(choiceClass, None)
+        if classId is None:
+            classId = len(self.classes)
+            self.classIds[choiceClass] = classId
+            self.classes.append(choiceClass)
+            if classId >= len(self.towerHeights):
+                self.towerHeights = numpy.concatenate(
+                    (self.towerHeights, numpy.zeros(len(self.towerHeights))))
+        return classId
+
+    def _getPosition(self, agent):
+        position = self.agentPositions.get(agent, None)
+        if position is None:
+            raise ValueError("Agent " + repr(agent) + " not known")
+        return position
+
+    def _setClassIndex(self, position, classIndex):
+        classIds = self.agentClassIds[position]
+        classIndex = min(classIndex, len(classIds))
+        self.classIndices[position] = classIndex
+        if classIndex < len(classIds):
+            self.currentClassIds[position] = classIds[classIndex]
+        else:
+            self.currentClassIds[position] = -1
+        self.active[position] = classIndex < len(classIds)
+        self.heights[position] = 0.0
+        self.activeAgents = None
+
+    def getTower(self, choiceClass):
+        '''
+        Returns a copy of the tower of the given class, for debugging
+
+        @rtype: Tower
+        '''
+        tower = Tower(choiceClass)
+        tower.setHeight(self.getClassHeight(choiceClass))
+        return tower
+
+    def advance(self, climbingTime, bouncingAgents):
+        positions = numpy.flatnonzero(self.active)
+        climbedHeights = self.heights[positions] + \
+            climbingTime * self.speeds[positions]
+        valid = self.settings.getIntervalMask(climbedHeights, 0, 1)
+        if not valid.all():
+            position = positions[numpy.argmin(valid)]
+            raise ValueError(str(self.agentList[position]) + " wants to push " +
+                             str(self.classes[self.currentClassIds[position]]) +
+                             " to height " + str(self.heights[position] +
+                                                 climbingTime * self.speeds[position]))
+        climbedHeights = numpy.clip(climbedHeights, 0, 1)
+        numpy.maximum.at(self.towerHeights, self.currentClassIds[positions],
+                         climbedHeights)
+        self.heights[positions] = climbedHeights
+        for agent in bouncingAgents:
+            position = self.agentPositions[agent]
+            if self.active[position]:
+                self._setClassIndex(position, self.classIndices[position] + 1)
+
+    def getAgentSpeeds(self):
+        return {self.agentList[position]: self.speeds[position]
+                for position in numpy.flatnonzero(self.active)}
+
+    def setClassHeight(self, choiceClass, height):
+        if height < 0 or 1 < height:
+            raise ValueError("Height must be between 0 and 1, " +
+                             str(height) + " given")
+        # The tower array may grow while numbering the class
+        classId = self._getClassId(choiceClass)
+        self.towerHeights[classId] = height
+
+    def setAgentHeight(self, agent, height):
+        if not self.settings.isInInterval(height, 0, 1):
+            raise ValueError(
+                "Height must be between 0 and 1 (" + str(height) + " given)")
+        self.heights[self._getPosition(agent)] = self.settings.bound(height, 0, 1)
+
+    def getAgentClassIndex(self, agent):
+        return int(self.classIndices[self._getPosition(agent)])
+
+    def setAgentClassIndex(self, agent, classIndex):
+        self._setClassIndex(self._getPosition(agent), classIndex)
+
+    def setAgentSpeed(self, agent, speed):
+        if speed < 0:
+            raise ValueError("Speed must be nonnegative")
+        self.speeds[self._getPosition(agent)] = speed
+
+    def getAgents(self):
+        return list(self.agentList)
+
+    def getAgentMultiplicity(self, agent):
+        return int(self.multiplicities[self._getPosition(agent)])
+
+    def getActiveAgents(self):
+        if self.activeAgents is None:
+            self.activeAgents = [self.agentList[position] for position
+                                 in numpy.flatnonzero(self.active)]
+        return list(self.activeAgents)
+
+    def getAgentHeight(self, agent):
+        return float(self.heights[self._getPosition(agent)])
+
+    def getAgentSpeed(self, agent):
+        return float(self.speeds[self._getPosition(agent)])
+
+    def getCurrentAgentChoiceClass(self, agent):
+        classId = self.currentClassIds[self._getPosition(agent)]
+        if classId < 0:
+            return None
+        return self.classes[classId]
+
+    def getCurrentAgentChoiceClasses(self):
+        return {self.agentList[position]:
+                self.classes[self.currentClassIds[position]]
+                for position in numpy.flatnonzero(self.active)}
+
+    def getCurrentClassHeights(self):
+        heights = self.towerHeights[:len(self.classes)]
+        return {self.classes[classId]: float(heights[classId])
+                for classId in numpy.flatnonzero(heights > 0)}
+
+    def getChoiceClasses(self):
+        return list(self.classes)
+
+    def getClassHeight(self, choiceClass):
+        classId = self.classIds.get(choiceClass, None)
+        if classId is None:
+            return 0
+        return float(self.towerHeights[classId])
+
+    def isFinished(self):
+        return not self.active.any()
+
+    def _updateLambdaProblem(self, problem, maximumTime):
+        problem.setMaximumTime(maximumTime)
+        for choiceClass, height in self.getCurrentClassHeights().items():
+            problem.setRow(choiceClass, choiceClass, height)
+        for agent, active, classId, height, speed in zip(
+                self.agentList, self.active.tolist(),
+                self.currentClassIds.tolist(), self.heights.tolist(),
+                self.speeds.tolist()):
+            if active:
+                problem.setRow(agent, self.classes[classId], height, speed)
+            elif problem.hasRow(agent):
+                problem.removeRow(agent)
+        return problem
+
+    def toSRState(self):
+        '''
+        Returns an object-based copy of this state, for debugging
+
+        @rtype: SRState
+        '''
+        state = SRState(self.vote, self.settings)
+        for choiceClass, height in self.getCurrentClassHeights().items():
+            state.setClassHeight(choiceClass, height)
+        for agent in self.agentList:
+            state.setAgentClassIndex(agent, self.getAgentClassIndex(agent))
+            state.setAgentHeight(agent, self.getAgentHeight(agent))
+            state.setAgentSpeed(agent, self.getAgentSpeed(agent))
+        return state
+
+    def __str__(self):
+        return str(self.toSRState())
+
+
 def computeLambda(state, maximumTime=1.0):
-    activeAgents = state.getActiveAgents()
-    agentNames = getUniqueNames(activeAgents, prefix="Agent ")
-    classNames = getUniqueNames(state.getChoiceClasses(), prefix="Class ")
-    choiceNames = getUniqueNames(state.getChoices(), prefix="")
-
-    choiceVariables = LpVariable.dicts("p", choiceNames.values(), lowBound=0)
-    lambdaVariable = LpVariable("l", lowBound=0.0, upBound=maximumTime)
-
-    def createConstraints(problem, variable):
-        problem += lpSum(choiceVariables) <= 1, "Distribution"
-        for choiceClass, height in state.getCurrentClassHeights().items():
-            problem += createLpSum(choiceClass, choiceNames, choiceVariables) >= \
-                height, classNames[choiceClass] + " height"
-        for agent in state.getActiveAgents():
-            problem += createLpSum(state.getCurrentAgentChoiceClass(agent),
-                                   choiceNames, choiceVariables) >= \
-                state.getAgentHeight(agent) + variable * state.getAgentSpeed(agent), \
-                agentNames[agent] + " push"
-
-    problem = LpProblem("Lambda", LpMaximize)
-    createConstraints(problem, lambdaVariable)
-    problem.setObjective(lambdaVariable)
-    checkPulpStatus(problem.solve(state.getSettings().getSolver()))
-    lambdaOpt = lambdaVariable.value()
-
-    bouncingAgents = []
-    for currentAgent in activeAgents:
-        problem = LpProblem(agentNames[currentAgent], LpMaximize)
-        createConstraints(problem, lambdaOpt)
-        (choiceClass, height, speed) = state.getAgentData(currentAgent)
-        problem.setObjective(createLpSum(choiceClass, choiceNames, choiceVariables)
-                             - lambdaOpt * speed - height)
-        checkPulpStatus(problem.solve(state.getSettings().getSolver()))
-        value = problem.objective.value()
-        if not state.getSettings().isNonnegative(value):
-            raise ValueError(str(value) + " negative while determining bounce of " +
-                             repr(currentAgent) + " from " + repr(choiceClass) +
-                             "@" + str(height) + "/" + str(speed))
-        if state.getSettings().isClose(value, 0):
-            bouncingAgents.append(currentAgent)
+    settings = state.getSettings()
+    with settings.measure("model"):
+        problem = state.getLambdaProblem(maximumTime)
+    with settings.measure("lambda"):
+        lambdaOpt = problem.maximiseLambda()
+
+    with settings.measure("detection"):
+        bouncingAgents = problem.findTightRows(state.getActiveAgents(),
+                                               lambdaOpt)
+    settings.count("bounces", len(bouncingAgents))
     return (lambdaOpt, bouncingAgents)
 
 
+def walkTrajectory(state, recordEvent=None):
+    '''
+    Advances the state from event to event until all agents are finished.
+    All events are computed on the single lambda problem of the state, thus a
+    backend keeping its basis between solves, e.g.
+    vote.solver.simplex.SimplexBackend, pivots along the trajectory instead
+    of solving every event from scratch.
+
+    :param recordEvent: Function called with the state before every event
+
+    @type state: SRState
+    @type recordEvent: function
+    '''
+    settings = state.getSettings()
+    while not state.isFinished():
+        if recordEvent is not None:
+            recordEvent(state)
+        settings.reportEvent(state)
+        (climbTime, bouncingAgents) = computeLambda(state)
+        with settings.measure("advance"):
+            state.advance(climbTime, bouncingAgents)
+
+
 def solveVoteESR(vote, solverSettings):
     '''
-    @type vote: vote.society.Vote
+    @type vote: vote.society.Vote|vote.society.PreferenceMatrix
     @type solverSettings: vote.solver.SolverSettings
-    @rtype vote.society.Lottery
+    @rtype vote.society.Lottery|vote.society.AssignmentLottery
     '''
+    vote = toVote(vote)
+    if not isinstance(solverSettings, SolverSettings):
+        raise TypeError(repr(solverSettings) + " is not a settings instance")
 
-    state = SRState(vote, solverSettings)
+    with solverSettings.measure("ESR"):
+        # On strict assignment votes, ESR is probabilistic serial
+        with solverSettings.measure("serial"):
+            lottery = solveStrictAssignmentVote(vote, solverSettings)
+        if lottery is not None:
+            return lottery
 
-    while not state.isFinished():
-        (climbTime, bouncingAgents) = computeLambda(state)
-        state.advance(climbTime, bouncingAgents)
-    return findLottery(vote, state.getCurrentClassHeights(), state.getSettings())
+        with solverSettings.measure("setup"):
+            state = ArraySRState(vote, solverSettings)
+
+        walkTrajectory(state)
+        return state.findLottery()
 
 
 def solveVotePSR(vote, solverSettings):
     '''
-    @type vote: vote.society.Vote
+    @type vote: vote.society.Vote|vote.society.PreferenceMatrix
     @type solverSettings: vote.solver.SolverSettings
     @rtype vote.society.Lottery
     '''
-
-    state = SRState(vote, solverSettings)
-
-    agentChoiceClasses = state.getCurrentAgentChoiceClasses()
-    for agent, choiceClass in agentChoiceClasses.items():
-        speed = 0
-        for otherChoiceClass in agentChoiceClasses.values():
-            if otherChoiceClass.isSubsetOf(choiceClass):
-                speed += 1
-        state.setAgentSpeed(agent, speed)
-    # As shown, no freeze happens between 0 and 1/n, thus one can simply
-    # advance 1/n
-    state.advance(1.0 / vote.getAgentCount(), [])
-    for agent in state.getAgents():
-        state.setAgentSpeed(agent, 1)
-    while not state.isFinished():
-        (climbTime, bouncingAgents) = computeLambda(state)
-        state.advance(climbTime, bouncingAgents)
-    return findLottery(vote, state.getCurrentClassHeights(), state.getSettings())
+    vote = toVote(vote)
+    if not isinstance(solverSettings, SolverSettings):
+        raise TypeError(repr(solverSettings) + " is not a settings instance")
+
+    with solverSettings.measure("PSR"):
+        with solverSettings.measure("setup"):
+            state = ArraySRState(vote, solverSettings)
+
+            agentChoiceClasses = state.getCurrentAgentChoiceClasses()
+            classCounts = collections.Counter()
+            for agent, choiceClass in agentChoiceClasses.items():
+                classCounts[choiceClass] += state.getAgentMultiplicity(agent)
+            for agent, choiceClass in agentChoiceClasses.items():
+                speed = sum(classCounts[subclass]
+                            for subclass in vote.getSubclasses(choiceClass))
+                state.setAgentSpeed(agent, speed)
+        # As shown, no freeze happens between 0 and 1/n, thus one can simply
+        # advance 1/n
+        with solverSettings.measure("advance"):
+            state.advance(1.0 / vote.getAgentCount(), [])
+        for agent in state.getAgents():
+            state.setAgentSpeed(agent, 1)
+        walkTrajectory(state)
+        return state.findLottery()
 
 
 def solveVoteSPSR(vote, solverSettings):
     '''
-    @type vote: vote.society.Vote
+    @type vote: vote.society.Vote|vote.society.PreferenceMatrix
     @type solverSettings: vote.solver.SolverSettings
     @rtype vote.society.Lottery
     '''
-
-    state = SRState(vote, solverSettings)
-
-    for choiceClass in map(lambda choices: ChoiceClass(choices),
-                           getAllSubsets(vote.getChoices())):
-        height = 0.0
-        agents = []
-        for agent, agentChoiceClass in state.getCurrentAgentChoiceClasses().items():
-            if agentChoiceClass.isSubsetOf(choiceClass):
-                height += 1
-            if agentChoiceClass == choiceClass:
-                agents.append(agent)
-        height /= vote.getAgentCount()
-        state.setClassHeight(choiceClass, height)
-        for agent in agents:
-            state.setAgentHeight(agent, height)
-
-    while not state.isFinished():
-        (climbTime, bouncingAgents) = computeLambda(state)
-        state.advance(climbTime, bouncingAgents)
-    return findLottery(vote, state.getCurrentClassHeights(), state.getSettings())
+    vote = toVote(vote)
+    if isinstance(vote, AssignmentVote):
+        raise UnsupportedVoteError("SPSR classes span several agents, which " +
+                                   "is not expressible on assignment " +
+                                   "matrices")
+
+    if not isinstance(solverSettings, SolverSettings):
+        raise TypeError(repr(solverSettings) + " is not a settings instance")
+
+    with solverSettings.measure("SPSR"):
+        with solverSettings.measure("setup"):
+            state = ArraySRState(vote, solverSettings)
+
+            # Every class starts at the share of agents whose first class it
+            # contains. Only connected unions of first classes need a tower,
+            # all other rows are implied by them. The full set of choices is
+            # left out, its row is implied by the distribution constraint.
+            choiceIndex = vote.getChoiceIndex()
+            agentChoiceClasses = state.getCurrentAgentChoiceClasses()
+            weights = collections.Counter()
+            for agent, choiceClass in agentChoiceClasses.items():
+                weights[choiceIndex.getClassMask(choiceClass)] += \
+                    state.getAgentMultiplicity(agent)
+            unionWeights = getConnectedUnionWeights(weights)
+            unionWeights.pop(choiceIndex.getFullMask(), None)
+            for mask, weight in unionWeights.items():
+                state.setClassHeight(choiceIndex.createClass(mask),
+                                     float(weight) / vote.getAgentCount())
+            for agent, choiceClass in agentChoiceClasses.items():
+                weight = unionWeights.get(choiceIndex.getClassMask(choiceClass),
+                                          None)
+                if weight is not None:
+                    state.setAgentHeight(agent,
+                                         float(weight) / vote.getAgentCount())
+
+        walkTrajectory(state)
+        return state.findLottery()
@@ -3,16 +3,14 @@ Created on 10 Sep 2015
 
 @author: Tobias Meggendorfer
 '''
-from vote.society import ChoiceClass, Agent
+from vote.society import ChoiceClass, Agent, toVote, AssignmentVote
 from vote.solver.settings import SolverSettings
 from itertools import ifilter
-from vote.solver.util import getUniqueNames, createLpSum, findLottery,\
-    getAllSubsets, checkPulpStatus
-from pulp.pulp import LpVariable, LpProblem, lpSum
-from pulp.constants import LpMaximize
+from vote.solver.util import findLottery, LambdaProblem, UnsupportedVoteError
 
 
 class Tower(object):
+    __slots__ = ("frozen", "height", "choiceClass", "name", "speed")
 
     def __init__(self, choiceClass, name=None):
         if not isinstance(choiceClass, ChoiceClass):
@@ -89,17 +87,27 @@ class AgentData(object):
     '''
     This class keeps track of agents' basic data used in SR-like algorithms
     '''
+    __slots__ = ("agent", "multiplicity", "_choiceClassIter",
+                 "currentChoiceClass")
 
-    def __init__(self, agent, speed=1):
+    def __init__(self, agent, speed=1, multiplicity=1):
+        '''
+        :param multiplicity: The number of agents with identical preferences
+            represented by this agent
+        '''
         if not isinstance(agent, Agent):
             raise ValueError(repr(agent) + " is not an agent")
         self.agent = agent
+        self.multiplicity = multiplicity
         self._choiceClassIter = iter(agent.getChoiceClasses())
         self.currentChoiceClass = next(self._choiceClassIter)
 
     def getAgent(self):
         return self.agent
 
+    def getMultiplicity(self):
+        return self.multiplicity
+
     def getCurrentChoiceClass(self):
         return self.currentChoiceClass
 
@@ -126,6 +134,82 @@ class AgentData(object):
         return hash(self.getAgent())
 
 
+class TowerLattice(object):
+    '''
+    Lazy lattice of all choice sets which may carry a binding tower in SSR.
+
+    The atoms of the lattice are the choice classes agents have been on so
+    far. A tower whose choice set is no union of atoms climbs exactly like
+    the union of all atoms contained in it, so its constraint is implied by
+    the one of that union. Similarly, the tower of two parts which are not
+    connected by any atom carries the sum of both parts' constraints. Thus,
+    only unions of connected atoms are materialised.
+
+    This breaks down once a tower freezes while agents still climb towers
+    strictly inside of it: all its supersets keep climbing on their own. A
+    frozen set like this is called broken and it is extended by every
+    single choice, which dominate all other such supersets.
+    '''
+
+    def __init__(self, choices):
+        self.choices = frozenset(choices)
+        self.atoms = set()
+        self.unions = set()
+        self.broken = set()
+
+    def getAtoms(self):
+        return self.atoms
+
+    def isAtom(self, choiceSet):
+        return choiceSet in self.atoms
+
+    def isBroken(self, choiceSet):
+        return choiceSet in self.broken
+
+    def addAtom(self, atom):
+        '''
+        Adds the given atom and returns all sets newly added to the lattice
+
+        :type atom: frozenset(vote.society.Choice)
+        :rtype: list(frozenset(vote.society.Choice))
+        '''
+        if atom in self.atoms:
+            return []
+        self.atoms.add(atom)
+        return self._close([atom])
+
+    def breakSet(self, choiceSet):
+        '''
+        Marks the given set as broken and returns all sets newly added to the
+        lattice
+
+        :type choiceSet: frozenset(vote.society.Choice)
+        :rtype: list(frozenset(vote.society.Choice))
+        '''
+        if choiceSet in self.broken:
+            return []
+        self.broken.add(choiceSet)
+        return self._close([choiceSet.union([choice]) for choice
+                            in self.choices.difference(choiceSet)])
+
+    def _close(self, seeds):
+        added = []
+        queue = list(seeds)
+        while queue:
+            choiceSet = queue.pop()
+            if choiceSet in self.unions:
+                continue
+            self.unions.add(choiceSet)
+            added.append(choiceSet)
+            for atom in self.atoms:
+                if atom.issubset(choiceSet) or atom.isdisjoint(choiceSet):
+                    continue
+                union = choiceSet.union(atom)
+                if union not in self.unions:
+                    queue.append(union)
+        return added
+
+
 class SSRState(object):
 
     def __init__(self, vote, settings):
@@ -136,18 +220,46 @@ class SSRState(object):
         self.vote = vote
         self.towers = dict()
         self.agents = dict()
-        for agent in vote.getAgents():
-            self.agents[agent] = AgentData(agent)
+        self.lambdaProblem = None
+        self.lattice = TowerLattice(vote.getChoices())
+        # Accumulated climbing time of agents on each class, i.e. the height
+        # each class contributed to all of its supersets
+        self.classTimes = dict()
+        self.currentClassCounts = dict()
+        self.preferenceClasses = set()
+        # Agents with identical preferences move in lockstep
+        for agent, multiplicity in vote.getAgentMultiplicities().items():
+            self.agents[agent] = AgentData(agent, multiplicity=multiplicity)
+            self.preferenceClasses.update(agent.getChoiceClasses())
 
     def getChoices(self):
         return self.vote.getChoices()
 
+    def _contributesTo(self, choiceClass, choiceSet):
+        '''
+        Determines whether agents on the given class climb the tower of the
+        given set. The set of all choices only is climbed from classes
+        missing at most one choice.
+        '''
+        if not choiceClass.isSubsetOf(choiceSet):
+            return False
+        return len(choiceSet) < len(self.getChoices()) or \
+            len(choiceClass) + 1 >= len(choiceSet)
+
     def getTower(self, choiceClass):
         if not isinstance(choiceClass, ChoiceClass):
-            choiceClass = ChoiceClass(choiceClass)
+            choiceClass = self.vote.getChoiceIndex().createClass(choiceClass)
         tower = self.towers.get(choiceClass, None)
         if tower is None:
-            tower = Tower(ChoiceClass(choiceClass))
+            tower = Tower(choiceClass)
+            # The tower implicitly climbed along with all its subclasses. If
+            # it would have passed 1, it froze on the way, but then its
+            # constraint is implied by the full subclass anyway.
+            height = sum(time for subclass, time in self.classTimes.items()
+                         if self._contributesTo(subclass, choiceClass))
+            if not self.getSettings().isNonnegative(1 - height):
+                height = 1
+            tower.setHeight(self.getSettings().checkBound(height, 0, 1))
             self.towers[choiceClass] = tower
         return tower
 
@@ -163,17 +275,52 @@ class SSRState(object):
     def _getActiveAgentData(self):
         return ifilter(lambda data: not data.isFinished(), self.agents.values())
 
-    def adjustTowerSpeeds(self):
+    def _updateLattice(self):
+        '''
+        Materialises all towers of the lattice which may bind in the current
+        state
+        '''
+        choices = self.getChoices()
+        for choiceClass in self.currentClassCounts.keys():
+            if self.lattice.isAtom(choiceClass.getChoices()):
+                continue
+            for choiceSet in self.lattice.addAtom(choiceClass.getChoices()):
+                if len(choiceSet) < len(choices) or \
+                        len(choiceClass) + 1 >= len(choices):
+                    self.getTower(choiceSet)
+            # Preference classes may freeze before any agent gets there
+            for preferenceClass in self.preferenceClasses:
+                if choiceClass.isSubsetOf(preferenceClass):
+                    self.getTower(preferenceClass)
+            if len(choiceClass) + 1 == len(choices):
+                self.getTower(choices)
         for tower in self.getTowers():
-            tower.setSpeed(0)
+            choiceClass = tower.getChoiceClass()
+            if not tower.isFrozen() or \
+                    self.lattice.isBroken(choiceClass.getChoices()):
+                continue
+            for currentClass in self.currentClassCounts.keys():
+                if currentClass != choiceClass and \
+                        currentClass.isSubsetOf(choiceClass):
+                    for choiceSet in self.lattice.breakSet(choiceClass.getChoices()):
+                        if len(choiceSet) < len(choices):
+                            self.getTower(choiceSet)
+                    break
+
+    def adjustTowerSpeeds(self):
+        counts = dict()
         for agentData in self._getActiveAgentData():
             currentChoiceClass = agentData.getCurrentChoiceClass()
-            self.getTower(currentChoiceClass).addSpeed(1)
-            for subset in getAllSubsets(self.vote.getChoices(), len(currentChoiceClass) + 1):
-                if currentChoiceClass.isSubsetOf(subset):
-                    tower = self.getTower(subset)
-                    if not tower.isFrozen():
-                        tower.addSpeed(1)
+            counts[currentChoiceClass] = counts.get(currentChoiceClass, 0) + \
+                agentData.getMultiplicity()
+        self.currentClassCounts = counts
+        self._updateLattice()
+        for tower in self.getTowers():
+            if tower.isFrozen():
+                continue
+            choiceClass = tower.getChoiceClass()
+            tower.setSpeed(sum(count for currentClass, count in counts.items()
+                               if self._contributesTo(currentClass, choiceClass)))
 
     def isFinished(self):
         for agentData in self.agents.values():
@@ -182,6 +329,9 @@ class SSRState(object):
         return True
 
     def advance(self, climbingTime, freezingTowers):
+        for choiceClass, count in self.currentClassCounts.items():
+            self.classTimes[choiceClass] = self.classTimes.get(choiceClass, 0) + \
+                climbingTime * count
         for tower in self.getTowers():
             if tower.isFrozen():
                 continue
@@ -206,6 +356,40 @@ class SSRState(object):
     def getNonFrozenTowers(self):
         return ifilter(lambda tower: not tower.isFrozen(), self.towers.values())
 
+    def getLambdaProblem(self, maximumTime=1.0):
+        '''
+        Returns the lambda problem of this run, updated to the current state
+
+        @rtype: vote.solver.util.LambdaProblem
+        '''
+        if self.lambdaProblem is None:
+            self.lambdaProblem = LambdaProblem(self.getChoices(),
+                                               self.getSettings(), maximumTime,
+                                               self.vote.getDistributions())
+        problem = self.lambdaProblem
+        problem.setMaximumTime(maximumTime)
+        for tower in self.getTowers():
+            problem.setRow(tower, tower.getChoiceClass(), tower.getHeight(),
+                           tower.getSpeed())
+        return problem
+
+    def findLottery(self):
+        '''
+        Returns a lottery satisfying the current heights of all towers
+
+        @rtype: vote.society.Lottery
+        '''
+        settings = self.getSettings()
+        with settings.measure("lottery"):
+            classHeights = {tower.getChoiceClass(): tower.getHeight()
+                            for tower in self.getTowers()}
+            settings.count("towers", len(classHeights))
+            # The last solve of the lambda problem satisfies all final heights
+            solution = None
+            if self.lambdaProblem is not None:
+                solution = self.lambdaProblem.getSolution()
+            return findLottery(self.vote, classHeights, settings, solution)
+
     def __str__(self):
         return "Agents: " + ", ".join(map(str, sorted(self.agents.values(),
                                                       key=lambda data: data.getAgent()))) + "\n" + \
@@ -218,55 +402,39 @@ def computeLambda(state, maximumTime=1.0):
     @type state: SSRState
     @type maximumTime: float
     '''
-    towerNames = getUniqueNames(state.getTowers(), prefix="T")
-    choiceNames = getUniqueNames(state.getChoices(), prefix="")
-    choiceVariables = LpVariable.dicts("p", choiceNames.values(), lowBound=0.0)
-    lambdaVariable = LpVariable("l", lowBound=0.0, upBound=maximumTime)
-
-    def createConstraints(problem, variable):
-        problem += lpSum(choiceVariables) <= 1, "Distribution"
-        for tower, towerName in towerNames.items():
-            problem += createLpSum(tower.getChoiceClass(), choiceNames, choiceVariables) >= \
-                tower.getHeight() + variable * \
-                tower.getSpeed(), towerName
-
-    problem = LpProblem("Lambda", LpMaximize)
-    createConstraints(problem, lambdaVariable)
-    problem.setObjective(lambdaVariable)
-    checkPulpStatus(problem.solve(state.getSettings().getSolver()))
-    lambdaOpt = lambdaVariable.value()
-
-    freezingTowers = []
-    for currentTower, towerName in towerNames.items():
-        if currentTower.isFrozen():
-            continue
-        problem = LpProblem(towerName, LpMaximize)
-        createConstraints(problem, lambdaOpt)
-        problem.setObjective(createLpSum(currentTower.getChoiceClass(), choiceNames, choiceVariables)
-                             - lambdaOpt * currentTower.getSpeed() - currentTower.getHeight())
-        checkPulpStatus(problem.solve(state.getSettings().getSolver()))
-        value = problem.objective.value()
-        if not state.getSettings().isNonnegative(value):
-            raise ValueError(str(value) + " negative while determining frozen state of " +
-                             repr(currentTower))
-        if state.getSettings().isClose(problem.objective.value(), 0):
-            freezingTowers.append(currentTower)
-
+    settings = state.getSettings()
+    with settings.measure("model"):
+        problem = state.getLambdaProblem(maximumTime)
+    with settings.measure("lambda"):
+        lambdaOpt = problem.maximiseLambda()
+    with settings.measure("detection"):
+        freezingTowers = problem.findTightRows(
+            list(state.getNonFrozenTowers()), lambdaOpt)
+    settings.count("freezes", len(freezingTowers))
     return (lambdaOpt, frozenset(freezingTowers))
 
 
 def solveVoteSSR(vote, solverSettings):
     '''
-    @type vote: vote.society.Vote
+    @type vote: vote.society.Vote|vote.society.PreferenceMatrix
     @type solverSettings: vote.solver.SolverSettings
     @rtype vote.society.Lottery
     '''
-
-    state = SSRState(vote, solverSettings)
-    state.adjustTowerSpeeds()
-    while not state.isFinished():
-        (climbingTime, freezingTowers) = computeLambda(state)
-        state.advance(climbingTime, freezingTowers)
-    currentClassHeights = {tower.getChoiceClass(): tower.getHeight()
-                           for tower in state.getTowers()}
-    return findLottery(vote, currentClassHeights, state.getSettings())
+    vote = toVote(vote)
+    if isinstance(vote, AssignmentVote):
+        raise UnsupportedVoteError("SSR towers span several agents, which " +
+                                   "is not expressible on assignment " +
+                                   "matrices")
+    if not isinstance(solverSettings, SolverSettings):
+        raise TypeError(repr(solverSettings) + " is not a settings instance")
+
+    with solverSettings.measure("SSR"):
+        with solverSettings.measure("setup"):
+            state = SSRState(vote, solverSettings)
+            state.adjustTowerSpeeds()
+        while not state.isFinished():
+            solverSettings.reportEvent(state)
+            (climbingTime, freezingTowers) = computeLambda(state)
+            with solverSettings.measure("advance"):
+                state.advance(climbingTime, freezingTowers)
+        return state.findLottery()
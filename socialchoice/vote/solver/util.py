@@ -6,15 +6,21 @@ Created on 8 Sep 2015
 @author: Tobias Meggendorfer
 '''
 
-from pulp.pulp import lpSum, LpProblem, LpVariable
-from pulp.constants import LpMaximize, LpStatusOptimal, LpStatusInfeasible,\
+from pulp.constants import LpStatusOptimal, LpStatusInfeasible,\
     LpStatusUnbounded, LpStatusUndefined, LpStatusNotSolved
-from vote.society import Lottery
+from vote.solver.settings import DETECTION_INDIVIDUAL, DETECTION_VERIFY, \
+    LOTTERY_SPARSE, LOTTERY_SOLVE
+from vote.solver.program import LinearProgram, SENSE_LE, SENSE_GE, SENSE_EQ
 from itertools import chain, combinations
+import collections
+import math
 
 
-def createLpSum(choiceClass, choiceNames, choiceVariables):
-    return lpSum(choiceVariables[choiceNames[choice]] for choice in choiceClass)
+class UnsupportedVoteError(ValueError):
+    '''
+    Raised by rules which can not express a vote, e.g. SPSR on assignment
+    matrices
+    '''
 
 
 def checkPulpStatus(status,
@@ -50,6 +56,33 @@ def getAllSubsets(elements, startSize=1):
                                for i in range(startSize, len(elements)))
 
 
+def getConnectedUnionWeights(weights):
+    '''
+    Returns the total weight of all given sets contained in U for every
+    connected union U of the given sets, i.e. the subset-sum (zeta) transform
+    of the weights restricted to the unions which can not be split into two
+    disjoint unions. The weight of any other union is the sum of the weights
+    of its connected parts. Sets are given as bitmasks.
+
+    :type weights: dict(int, float)
+    :rtype: dict(int, float)
+    '''
+    masks = [mask for mask, weight in weights.items() if weight]
+    unions = set(masks)
+    pending = list(masks)
+    while pending:
+        union = pending.pop()
+        for mask in masks:
+            if mask & union:
+                extended = mask | union
+                if extended not in unions:
+                    unions.add(extended)
+                    pending.append(extended)
+    return {union: sum(weights[mask] for mask in masks
+                       if mask | union == union)
+            for union in unions}
+
+
 def getUniqueNames(objects, prefix="U_"):
     name = 0
     uniqueNames = dict()
@@ -59,31 +92,721 @@ def getUniqueNames(objects, prefix="U_"):
     return uniqueNames
 
 
-def findLottery(vote, classHeights, solverSettings):
+def getColumns(choiceClass, choiceColumns):
+    '''
+    Returns the columns of all choices of the class which have a column
+
+    @type choiceClass: collections.Iterable(vote.society.Choice)
+    @type choiceColumns: dict(vote.society.Choice, int)
+    @rtype: list(int)
+    '''
+    if len(choiceColumns) < len(choiceClass):
+        return [column for choice, column in choiceColumns.items()
+                if choice in choiceClass]
+    return [choiceColumns[choice] for choice in choiceClass
+            if choice in choiceColumns]
+
+
+def addDistributionRows(program, distributions, choiceColumns):
+    '''
+    Adds the row sum(p[c] for c in D) <= 1 for every distribution D to the
+    program and returns the indices of these rows
+
+    @type program: vote.solver.program.LinearProgram
+    @type distributions: list(frozenset(vote.society.Choice))
+    @type choiceColumns: dict(vote.society.Choice, int)
+    @rtype: list(int)
+    '''
+    return [program.addRow(dict.fromkeys(getColumns(distribution,
+                                                     choiceColumns), 1),
+                           SENSE_LE, 1.0)
+            for distribution in distributions]
+
+
+class TightnessCertificate(object):
+    '''
+    Certificate for the result of a batched tight row detection.
+
+    Every row found to be slack has a witness solution in which it is slack.
+    The tight rows are proven by nonnegative row multipliers y and
+    multipliers z[k] of the distribution constraints D[k] with y > 0 on every
+    tight row, sum(y[i] * a[i]) <= sum(z[k] * D[k]) componentwise and
+    sum(y[i] * b[i]) >= sum(z[k]). For every solution p this yields
+        sum(y[i] * b[i]) <= sum(y[i] * a[i] * p)
+                         <= sum(z[k] * sum(p[c] for c in D[k])) <= sum(z[k]),
+    so every row with positive multiplier is tight.
+    '''
+
+    def __init__(self, rows, distributions):
+        '''
+        :param rows: All rows of the problem, given as {key: (choice class, bound)}
+        :param distributions: The choices of every distribution constraint
+
+        :type rows: dict(object, tuple(vote.society.ChoiceClass, float))
+        :type distributions: list(frozenset(vote.society.Choice))
+        '''
+        self.rows = rows
+        self.distributions = distributions
+        self.tightRows = frozenset()
+        self.witnesses = dict()
+        self.multipliers = None
+        self.distributionMultipliers = None
+
+    def getTightRows(self):
+        return self.tightRows
+
+    def setTightRows(self, tightRows):
+        self.tightRows = frozenset(tightRows)
+
+    def addWitness(self, key, solution):
+        '''
+        :type solution: dict(vote.society.Choice, float)
+        '''
+        self.witnesses[key] = solution
+
+    def setMultipliers(self, multipliers, distributionMultipliers):
+        '''
+        :type multipliers: dict(object, float)
+        :type distributionMultipliers: list(float)
+        '''
+        self.multipliers = multipliers
+        self.distributionMultipliers = distributionMultipliers
+
+    def isComplete(self):
+        return not self.tightRows or self.multipliers is not None
+
+    def _getSlack(self, key, solution):
+        (choiceClass, bound) = self.rows[key]
+        return math.fsum(solution.get(choice, 0.0) for choice in choiceClass) - \
+            bound
+
+    def verify(self, solverSettings):
+        '''
+        Checks the certificate, raising a ValueError if it is invalid
+
+        @type solverSettings: vote.solver.settings.SolverSettings
+        '''
+        for key, solution in self.witnesses.items():
+            if key in self.tightRows:
+                raise ValueError("Witness given for tight row " + repr(key))
+            for value in solution.values():
+                solverSettings.nonnegativeFuzzyRound(value)
+            for distribution in self.distributions:
+                solverSettings.checkBound(
+                    math.fsum(solution.get(choice, 0.0)
+                              for choice in distribution), 0, 1)
+            for row in self.rows.keys():
+                if not solverSettings.isNonnegative(self._getSlack(row, solution)):
+                    raise ValueError("Witness of " + repr(key) +
+                                     " violates " + repr(row))
+            if solverSettings.isClose(self._getSlack(key, solution), 0):
+                raise ValueError("Witness of " + repr(key) + " is not slack")
+        if not self.tightRows:
+            return
+        if self.multipliers is None:
+            raise ValueError("No multipliers given for tight rows")
+        for multiplier in chain(self.multipliers.values(),
+                                self.distributionMultipliers):
+            solverSettings.nonnegativeFuzzyRound(multiplier)
+        for key in self.tightRows:
+            if solverSettings.isClose(self.multipliers.get(key, 0.0), 0):
+                raise ValueError("No positive multiplier for " + repr(key))
+        combination = collections.defaultdict(list)
+        for key, multiplier in self.multipliers.items():
+            for choice in self.rows[key][0]:
+                combination[choice].append(multiplier)
+        capacity = collections.defaultdict(list)
+        for distribution, multiplier in zip(self.distributions,
+                                            self.distributionMultipliers):
+            for choice in distribution:
+                capacity[choice].append(multiplier)
+        for choice, multipliers in combination.items():
+            if not solverSettings.isNonnegative(
+                    math.fsum(capacity[choice]) - math.fsum(multipliers)):
+                raise ValueError("Multipliers exceed distribution on " +
+                                 repr(choice))
+        bound = math.fsum(multiplier * self.rows[key][1]
+                          for key, multiplier in self.multipliers.items())
+        if not solverSettings.isNonnegative(
+                bound - math.fsum(self.distributionMultipliers)):
+            raise ValueError("Multipliers do not force tightness")
+
+
+class LambdaProblem(object):
+    '''
+    Persistent linear program of the form
+
+        maximise l
+        subject to sum(p[c] for c in D) <= 1 for every distribution D and
+            sum(p[c] for c in C) >= height + l * speed for every row
+
+    which is kept alive over a whole run of an SR-like algorithm. Rows are
+    identified by arbitrary hashable keys. Changing the height of a row only
+    changes its right hand side, everything else only touches the affected
+    row. If only right hand sides changed since the last solve, the problem
+    is resolved, allowing solvers which support it to warm start from the
+    previous basis.
+
+    Every row carries its own slack variable, which is fixed to zero except
+    while detecting tight rows. Removed rows are kept as trivial rows and
+    reused for the next added row, so the problem never contains variables
+    without any row.
+
+    If the settings provide a pricer, the problem only contains the columns
+    of a few choices. After every solve, the choice of maximal reduced cost
+    is added as long as this improves the solution (column generation).
+    '''
+
+    def __init__(self, choices, solverSettings, maximumTime=1.0,
+                 distributions=None):
+        '''
+        :param distributions: The choices of every distribution constraint,
+            by default a single one over all choices
+
+        @type choices: collections.Iterable(vote.society.Choice)
+        @type solverSettings: vote.solver.settings.SolverSettings
+        @type maximumTime: float
+        @type distributions: list(collections.Iterable(vote.society.Choice))
+        '''
+        self.settings = solverSettings
+        self.choices = choices
+        self.pricer = solverSettings.getPricer()
+        if self.pricer is not None:
+            if distributions is not None and len(distributions) > 1:
+                raise ValueError("Column generation needs a single " +
+                                 "distribution")
+            if not solverSettings.getBackend().providesDuals():
+                raise ValueError("Column generation needs a solver " +
+                                 "providing duals")
+            choices = self.pricer.getInitialChoices(choices)
+        self.program = LinearProgram()
+        self.choiceColumns = {choice: self.program.addVariable(0.0, None)
+                              for choice in choices}
+        self.lambdaColumn = self.program.addVariable(0.0, maximumTime)
+        if distributions is None:
+            distributions = [self.choices]
+        self.distributions = [frozenset(distribution)
+                              for distribution in distributions]
+        self.distributionRows = addDistributionRows(
+            self.program, self.distributions, self.choiceColumns)
+        self.program.setObjective({self.lambdaColumn: 1})
+        self.rows = dict()
+        self.unusedRows = []
+        self.certificate = None
+        self.objectiveClass = None
+        self.resolvable = False
+
+    def getSettings(self):
+        return self.settings
+
+    def setMaximumTime(self, maximumTime):
+        if self.program.getBounds(self.lambdaColumn)[1] != maximumTime:
+            self.program.setBounds(self.lambdaColumn, 0.0, maximumTime)
+            self.resolvable = False
+
+    def hasRow(self, key):
+        return key in self.rows
+
+    def getRowKeys(self):
+        return self.rows.keys()
+
+    def _createRow(self):
+        if self.unusedRows:
+            return self.unusedRows.pop()
+        slackColumn = self.program.addVariable(0.0, 0.0)
+        row = self.program.addRow({slackColumn: -1}, SENSE_GE, 0.0)
+        return [None, row, slackColumn]
+
+    def _setRowClass(self, row, choiceClass):
+        if row[0] is not None:
+            for column in getColumns(row[0], self.choiceColumns):
+                self.program.setCoefficient(row[1], column, 0)
+        if choiceClass is not None:
+            for column in getColumns(choiceClass, self.choiceColumns):
+                self.program.setCoefficient(row[1], column, 1)
+        row[0] = choiceClass
+        self.resolvable = False
+
+    def _addColumn(self, choice):
+        column = self.program.addVariable(0.0, None)
+        self.choiceColumns[choice] = column
+        for distribution, row in zip(self.distributions,
+                                     self.distributionRows):
+            if choice in distribution:
+                self.program.setCoefficient(row, column, 1)
+        for (choiceClass, row, _) in chain(self.rows.values(),
+                                           self.unusedRows):
+            if choiceClass is not None and choice in choiceClass:
+                self.program.setCoefficient(row, column, 1)
+        if self.objectiveClass is not None and choice in self.objectiveClass:
+            self.program.setObjectiveCoefficient(column, 1)
+        self.resolvable = False
+
+    def _priceColumn(self):
+        '''
+        Adds the column of maximal reduced cost to the problem, if it is
+        positive, and returns whether a column was added
+        '''
+        distributionMultiplier = self.program.getDual(self.distributionRows[0])
+        if distributionMultiplier is None:
+            raise ValueError("Column generation needs a solver providing duals")
+        classWeights = collections.defaultdict(float)
+        for (choiceClass, row, _) in self.rows.values():
+            dual = self.program.getDual(row)
+            if dual < 0:
+                classWeights[choiceClass] -= dual
+        if self.objectiveClass is not None:
+            classWeights[self.objectiveClass] += 1
+        (choice, weight) = self.pricer.price(self.choices, classWeights)
+        if choice in self.choiceColumns or \
+                self.getSettings().isNonnegative(distributionMultiplier - weight):
+            return False
+        self._addColumn(choice)
+        return True
+
+    def setRow(self, key, choiceClass, height, speed=0):
+        '''
+        Adds the row identified by key or updates its data
+
+        @type choiceClass: vote.society.ChoiceClass
+        @type height: float
+        @type speed: float
+        '''
+        row = self.rows.get(key, None)
+        if row is None:
+            row = self._createRow()
+            self.rows[key] = row
+        if row[0] != choiceClass:
+            self._setRowClass(row, choiceClass)
+        if self.program.getCoefficient(row[1], self.lambdaColumn) != -speed:
+            self.program.setCoefficient(row[1], self.lambdaColumn, -speed)
+            self.resolvable = False
+        self.program.setRightHandSide(row[1], height)
+
+    def removeRow(self, key):
+        row = self.rows.pop(key)
+        self._setRowClass(row, None)
+        self.program.setCoefficient(row[1], self.lambdaColumn, 0)
+        self.program.setRightHandSide(row[1], 0.0)
+        self.unusedRows.append(row)
+
+    def _solve(self):
+        while True:
+            status = self.getSettings().solveProgram(self.program,
+                                                     self.resolvable)
+            if self.pricer is not None and status == LpStatusInfeasible:
+                self._addFeasibleColumns()
+                continue
+            checkPulpStatus(status)
+            self.resolvable = True
+            if self.pricer is None or not self._priceColumn():
+                return
+
+    def _addFeasibleColumns(self):
+        '''
+        First phase of column generation: Adds columns until the heights of
+        all rows are satisfiable. To this end, l temporarily is the fraction
+        of the heights reached, starting from the feasible 0.
+        '''
+        bounds = self.program.getBounds(self.lambdaColumn)
+        (objective, objectiveClass) = (self.program.getObjective(),
+                                       self.objectiveClass)
+        rows = [row[1] for row in self.rows.values()]
+        rowData = [(self.program.getCoefficient(row, self.lambdaColumn),
+                    self.program.getRightHandSide(row)) for row in rows]
+        for row, (_, height) in zip(rows, rowData):
+            self.program.setCoefficient(row, self.lambdaColumn, -height)
+            self.program.setRightHandSide(row, 0.0)
+        self._releaseLambda(1.0)
+        try:
+            self._solve()
+            if not self.getSettings().isClose(
+                    self.program.getValue(self.lambdaColumn), 1.0):
+                raise ValueError("Infeasible")
+        finally:
+            for row, (coefficient, height) in zip(rows, rowData):
+                self.program.setCoefficient(row, self.lambdaColumn, coefficient)
+                self.program.setRightHandSide(row, height)
+            self.program.setBounds(self.lambdaColumn, *bounds)
+            self.program.setObjective(objective)
+            self.objectiveClass = objectiveClass
+            self.resolvable = False
+
+    def maximiseLambda(self):
+        '''
+        Returns the maximal value of l such that all rows are satisfiable
+
+        @rtype: float
+        '''
+        self._solve()
+        return self.program.getValue(self.lambdaColumn)
+
+    def _fixLambda(self, lambdaValue):
+        self.program.setBounds(self.lambdaColumn, lambdaValue, lambdaValue)
+        self.resolvable = False
+
+    def _releaseLambda(self, upBound):
+        self.program.setBounds(self.lambdaColumn, 0.0, upBound)
+        self.program.setObjective({self.lambdaColumn: 1})
+        self.objectiveClass = None
+        self.resolvable = False
+
+    def _getRowSlack(self, key, lambdaValue):
+        '''
+        Returns the slack of the given row in the current solution
+        '''
+        (choiceClass, row, _) = self.rows[key]
+        return sum(self.program.getValue(column) for column
+                   in getColumns(choiceClass, self.choiceColumns)) - \
+            self.program.getRightHandSide(row) + \
+            lambdaValue * self.program.getCoefficient(row, self.lambdaColumn)
+
+    def _getRowBound(self, row, lambdaValue):
+        return self.program.getRightHandSide(row) - \
+            lambdaValue * self.program.getCoefficient(row, self.lambdaColumn)
+
+    def maximiseSlack(self, key, lambdaValue):
+        '''
+        Returns the maximal slack of the given row if l is fixed to lambdaValue
+
+        @rtype: float
+        '''
+        (choiceClass, _, _) = self.rows[key]
+        upBound = self.program.getBounds(self.lambdaColumn)[1]
+        self._fixLambda(lambdaValue)
+        self.program.setObjective(dict.fromkeys(
+            getColumns(choiceClass, self.choiceColumns), 1))
+        self.objectiveClass = choiceClass
+        try:
+            self._solve()
+            return self._getRowSlack(key, lambdaValue)
+        finally:
+            self._releaseLambda(upBound)
+
+    def findTightRows(self, keys, lambdaValue):
+        '''
+        Returns all rows out of keys which are tight in every solution with l
+        fixed to lambdaValue, i.e. which can not be increased any further. The
+        method used is determined by the detection mode of the settings.
+        Expects that the problem has just been solved for lambdaValue.
+
+        @rtype: list
+        '''
+        mode = self.getSettings().getDetectionMode()
+        self.certificate = None
+        if mode == DETECTION_INDIVIDUAL:
+            return self._findTightRowsIndividually(keys, lambdaValue)
+        tightRows = self._findTightRowsBatched(keys, lambdaValue)
+        if mode == DETECTION_VERIFY:
+            if self.certificate is not None and self.certificate.isComplete():
+                self.certificate.verify(self.getSettings())
+            expected = self._findTightRowsIndividually(keys, lambdaValue)
+            if set(tightRows) != set(expected):
+                raise ValueError("Batched detection found " +
+                                 repr(tightRows) + ", expected " +
+                                 repr(expected))
+        return tightRows
+
+    def _findTightRowsIndividually(self, keys, lambdaValue):
+        executor = self.getSettings().getExecutor()
+        if executor is None or self.pricer is not None:
+            values = [self.maximiseSlack(key, lambdaValue) for key in keys]
+        else:
+            values = self._maximiseSlacksConcurrently(keys, lambdaValue,
+                                                      executor)
+        tightRows = []
+        for key, value in zip(keys, values):
+            if not self.getSettings().isNonnegative(value):
+                raise ValueError(str(value) + " negative while determining " +
+                                 "slack of " + repr(key))
+            if self.getSettings().isClose(value, 0):
+                tightRows.append(key)
+        return tightRows
+
+    def _maximiseSlacksConcurrently(self, keys, lambdaValue, executor):
+        '''
+        Returns the maximal slacks of the given rows like maximiseSlack, but
+        solves one copy of the program per row on the executor. Column
+        generation changes the program while solving, so it is not supported.
+
+        @type executor: vote.solver.parallel.SubproblemExecutor
+        @rtype: list(float)
+        '''
+        programs = []
+        for key in keys:
+            program = self.program.copy()
+            program.setBounds(self.lambdaColumn, lambdaValue, lambdaValue)
+            program.setObjective(dict.fromkeys(
+                getColumns(self.rows[key][0], self.choiceColumns), 1))
+            programs.append(program)
+        settings = self.getSettings()
+        memo = settings.getMemo()
+        fingerprints = [None] * len(programs)
+        unsolved = range(len(programs))
+        if memo is not None:
+            with settings.measure("memo"):
+                unsolved = []
+                for position, program in enumerate(programs):
+                    (status, fingerprints[position]) = memo.lookup(program)
+                    if status is None:
+                        unsolved.append(position)
+            settings.count("memo hits", len(keys) - len(unsolved))
+        settings.count("solves", len(unsolved))
+        with settings.measure("lp"):
+            executor.solvePrograms([programs[position]
+                                    for position in unsolved],
+                                   settings.getBackend())
+        if memo is not None:
+            with settings.measure("memo"):
+                for position in unsolved:
+                    memo.store(programs[position], fingerprints[position])
+        values = []
+        for key, program in zip(keys, programs):
+            checkPulpStatus(program.getStatus())
+            values.append(program.getObjectiveValue() -
+                          self._getRowBound(self.rows[key][1], lambdaValue))
+        return values
+
+    def getSolution(self):
+        '''
+        Returns the probabilities of all choices in the problem of the last
+        solve
+
+        @rtype: dict(vote.society.Choice, float)
+        '''
+        return {choice: self.program.getValue(column)
+                for choice, column in self.choiceColumns.items()}
+
+    def _findTightRowsBatched(self, keys, lambdaValue):
+        '''
+        Determines the tight rows by repeatedly maximising the sum of the
+        (bounded) slacks of all candidate rows. Every row with positive slack
+        in a solution is not tight, all remaining rows are tight once the
+        maximal total slack is zero. Usually, one or two solves suffice.
+        '''
+        settings = self.getSettings()
+        certificate = TightnessCertificate(
+            {key: (choiceClass, self._getRowBound(row, lambdaValue))
+             for key, (choiceClass, row, _) in self.rows.items()},
+            self.distributions)
+        self.certificate = certificate
+
+        solution = self.getSolution()
+        candidates = []
+        for key in keys:
+            if settings.isClose(self._getRowSlack(key, lambdaValue), 0):
+                candidates.append(key)
+            else:
+                certificate.addWitness(key, solution)
+        if not candidates:
+            return candidates
+        upBound = self.program.getBounds(self.lambdaColumn)[1]
+        self._fixLambda(lambdaValue)
+        try:
+            while candidates:
+                slackColumns = [self.rows[key][2] for key in candidates]
+                for slackColumn in slackColumns:
+                    self.program.setBounds(slackColumn, 0.0, 1.0)
+                self.program.setObjective(dict.fromkeys(slackColumns, 1))
+                try:
+                    self._solve()
+                finally:
+                    for slackColumn in slackColumns:
+                        self.program.setBounds(slackColumn, 0.0, 0.0)
+                    self.resolvable = False
+                solution = self.getSolution()
+                slackRows = set()
+                for key in candidates:
+                    if not settings.isClose(self._getRowSlack(key, lambdaValue), 0):
+                        slackRows.add(key)
+                        certificate.addWitness(key, solution)
+                if not slackRows:
+                    if not settings.isClose(self.program.getObjectiveValue(), 0):
+                        # Slack is spread too thin, decide individually
+                        self.certificate = None
+                        return self._findTightRowsIndividually(candidates,
+                                                               lambdaValue)
+                    break
+                candidates = [key for key in candidates
+                              if key not in slackRows]
+            certificate.setTightRows(candidates)
+            self._setMultipliers(certificate)
+            return candidates
+        finally:
+            self._releaseLambda(upBound)
+
+    def _setMultipliers(self, certificate):
+        '''
+        Reads the multipliers proving tightness from the duals of the last
+        solve, if the solver provides them. Otherwise the certificate only
+        holds the witnesses of the slack rows, see LpBackend.providesDuals.
+        '''
+        distributionMultipliers = []
+        for row in self.distributionRows:
+            multiplier = self.program.getDual(row)
+            if multiplier is None:
+                return
+            distributionMultipliers.append(multiplier)
+        multipliers = dict()
+        for key, (_, row, _) in self.rows.items():
+            multiplier = self.program.getDual(row)
+            if multiplier is None:
+                return
+            multipliers[key] = -multiplier
+        certificate.setMultipliers(multipliers, distributionMultipliers)
+
+    def getCertificate(self):
+        '''
+        Returns the certificate of the last batched detection, if any
+
+        @rtype: TightnessCertificate
+        '''
+        return self.certificate
+
+
+def findLottery(vote, classHeights, solverSettings, solution=None):
     '''
     Returns a Lottery satisfying all constraints specified by the classHeights parameter
 
+    :param solution: Probabilities of choices found before, e.g. the last
+        solution of the lambda problem. Unless the lottery mode of the
+        settings is LOTTERY_SOLVE, they are used if they satisfy all
+        constraints, otherwise a separate program is solved.
+
     @type vote: vote.society.Vote
     @type classHeights: dict(vote.society.ChoiceClass, float)
     @type solverSettings: vote.solver.settings.SolverSettings
-    @rtype: vote.society.Lottery
+    @type solution: dict(vote.society.Choice, float)
+    @rtype: vote.society.Lottery|vote.society.AssignmentLottery
     @raise ValueError: If the constraints are not satisfiable
     '''
-    classNames = getUniqueNames(classHeights.keys(), prefix="Class ")
-    choiceNames = getUniqueNames(vote.getChoices(), prefix="Choice ")
+    mode = solverSettings.getLotteryMode()
+    choiceValues = None
+    if solution is not None and mode != LOTTERY_SOLVE:
+        with solverSettings.measure("completion"):
+            choiceValues = _completeSolution(vote, classHeights, solution,
+                                             solverSettings)
+    if choiceValues is None:
+        solverSettings.count("lottery solves")
+        if solverSettings.getPricer() is not None:
+            choiceValues = _findValuesByColumns(vote, classHeights,
+                                                solverSettings)
+        else:
+            choiceValues = _findValues(vote, classHeights, solverSettings)
+    if mode == LOTTERY_SPARSE:
+        with solverSettings.measure("sparse"):
+            choiceValues = _reduceSupport(vote, classHeights, choiceValues,
+                                          solverSettings)
+    with solverSettings.measure("validation"):
+        return vote.createLottery({choice.getObject(): value for choice, value
+                                   in choiceValues.items()}, solverSettings)
+
+
+def _completeSolution(vote, classHeights, solution, solverSettings):
+    '''
+    Returns the given probabilities completed to a lottery, or None if they
+    violate a constraint. As all class constraints are lower bounds, a
+    single distribution is completed by scaling it up. Several distributions
+    must already be complete.
+    '''
+    values = dict()
+    for choice, value in solution.items():
+        if not solverSettings.isNonnegative(value):
+            return None
+        values[choice] = max(value, 0.0)
+    for choiceClass, height in classHeights.items():
+        if not solverSettings.isNonnegative(
+                math.fsum(values.get(choice, 0.0) for choice in choiceClass) -
+                height):
+            return None
+    distributions = vote.getDistributions()
+    totals = [math.fsum(values.get(choice, 0.0) for choice in distribution)
+              for distribution in distributions]
+    for total in totals:
+        if not solverSettings.isNonnegative(1 - total):
+            return None
+    if len(distributions) == 1:
+        if totals[0] <= 0 or not distributions[0].issuperset(values.keys()):
+            return None
+        return {choice: value / totals[0] for choice, value in values.items()}
+    for total in totals:
+        if not solverSettings.isClose(total, 1):
+            return None
+    return values
+
 
-    problem = LpProblem("Lambda", LpMaximize)
-    choiceVariables = LpVariable.dicts("p", choiceNames.values(), lowBound=0)
+def _findValues(vote, classHeights, solverSettings):
+    program = LinearProgram()
+    choiceColumns = {choice: program.addVariable(0.0, None)
+                     for choice in vote.getChoices()}
 
-    problem += lpSum(choiceVariables) <= 1, "Distribution"
+    addDistributionRows(program, vote.getDistributions(), choiceColumns)
     for choiceClass, height in classHeights.items():
-        problem += createLpSum(choiceClass, choiceNames, choiceVariables) >= \
-            height, classNames[choiceClass] + " height"
+        program.addRow(dict.fromkeys(getColumns(choiceClass, choiceColumns), 1),
+                       SENSE_GE, height)
+
+    program.setObjective(dict.fromkeys(choiceColumns.values(), 1))
+    checkPulpStatus(solverSettings.solveProgram(program))
 
-    problem.setObjective(lpSum(choiceVariables.values()))
-    checkPulpStatus(problem.solve(solverSettings.getSolver()))
+    return {choice: program.getValue(column)
+            for choice, column in choiceColumns.items()}
 
-    choiceValues = dict()
-    for choice, choiceName in choiceNames.items():
-        choiceValues[choice.getObject()] = choiceVariables[choiceName].value()
-    return Lottery(choiceValues, solverSettings)
+
+def _findValuesByColumns(vote, classHeights, solverSettings):
+    '''
+    Finds the lottery by column generation, the result only contains the
+    generated choices. As all constraints are lower bounds, the solution can
+    be scaled up to a distribution.
+    '''
+    problem = LambdaProblem(vote.getChoices(), solverSettings, 0.0,
+                            vote.getDistributions())
+    for choiceClass, height in classHeights.items():
+        problem.setRow(choiceClass, choiceClass, height)
+    problem.maximiseLambda()
+    solution = {choice: value for choice, value
+                in problem.getSolution().items() if value > 0}
+    total = math.fsum(solution.values())
+    if not solution:
+        solution = {next(iter(vote.getChoices())): 1.0}
+        total = 1.0
+    return {choice: value / total for choice, value in solution.items()}
+
+
+def _reduceSupport(vote, classHeights, choiceValues, solverSettings, rounds=3):
+    '''
+    Returns probabilities satisfying all class heights whose support is part
+    of the support of the given ones and usually much smaller. Finding the
+    smallest support is NP-hard, instead every round minimises the sum of
+    the probabilities weighted by their inverse previous value, restricted
+    to the previous support. The solution of every round is basic, so its
+    support is at most the number of classes plus one. Votes with several
+    distributions are returned unchanged.
+    '''
+    if len(vote.getDistributions()) != 1:
+        return choiceValues
+    choices = choiceValues.keys()
+    tolerance = solverSettings.getAbsoluteTolerance()
+    for _ in range(rounds):
+        program = LinearProgram()
+        choiceColumns = {choice: program.addVariable(0.0, None)
+                         for choice, value in choiceValues.items() if value > 0}
+        program.addRow(dict.fromkeys(choiceColumns.values(), 1), SENSE_EQ, 1.0)
+        for choiceClass, height in classHeights.items():
+            program.addRow(dict.fromkeys(getColumns(choiceClass,
+                                                    choiceColumns), 1),
+                           SENSE_GE, height)
+        program.setObjective({column: -1.0 / max(choiceValues[choice], tolerance)
+                              for choice, column in choiceColumns.items()})
+        if solverSettings.solveProgram(program) != LpStatusOptimal:
+            return choiceValues
+        values = {choice: program.getValue(column) for choice, column
+                  in choiceColumns.items()
+                  if not solverSettings.isClose(program.getValue(column), 0)}
+        total = math.fsum(values.values())
+        choiceValues = {choice: value / total
+                        for choice, value in values.items()}
+        if len(choiceValues) == len(choiceColumns):
+            break
+    values = dict.fromkeys(choices, 0.0)
+    values.update(choiceValues)
+    return values